@@ -0,0 +1 @@
+# Benchmarks for Datagroom MCP Server (run with python -m bench.<name>)
@@ -0,0 +1,132 @@
+"""
+Cold-start budget: times `import main` and building the app in fresh interpreters, lists the
+modules that cost the most (python -X importtime) and checks that heavy optional dependencies are
+not loaded before they are needed. Exits with status 1 when a stage is over its budget or loaded a
+forbidden module, so it can run as a check in CI.
+
+    python -m bench.import_time [--runs 5] [--import-budget-ms 800] [--app-budget-ms 4000]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from utils.json_codec import loads
+
+ROOT = Path(__file__).resolve().parent.parent
+# Heavy optional dependencies, loaded only by the code paths that use them
+LAZY_MODULES = ("pymongo", "pyarrow", "h2")
+
+# stage -> (statement timed in a fresh interpreter, modules that must not be loaded after it)
+STAGES = {
+    "import main": ("import main", ("fastmcp", "starlette", "uvicorn", *LAZY_MODULES)),
+    "build app": ("import main; main.app", LAZY_MODULES),
+}
+# Default median budgets (ms); tests/test_import_time.py holds `python -m pytest` to them too
+BUDGETS_MS = {"import main": 800.0, "build app": 4000.0}
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def _env() -> dict[str, str]:
+    # A token keeps config from falling back to reading ~/.cursor/mcp.json
+    return {**os.environ, "DATAGROOM_PAT_TOKEN": os.environ.get("DATAGROOM_PAT_TOKEN") or "bench"}
+
+
+def _probe(statement: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(statement=statement)],
+        cwd=ROOT,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return loads(out.strip().splitlines()[-1])
+
+
+def _import_times(statement: str) -> list[tuple[int, float, str]]:
+    """(nesting, cumulative ms, module) for each import -X importtime reports for the statement."""
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        rows.append(((len(name) - len(name.lstrip())) // 2, int(cumulative) / 1000, name.strip()))
+    return rows
+
+
+def _top_imports(statement: str, limit: int) -> list[tuple[float, str]]:
+    """Slowest imports made by the statement and by modules it imports directly."""
+    startup = {name for _, _, name in _import_times("pass")}
+    rows = [row for row in _import_times(statement) if row[2] not in startup]
+    if not rows:
+        return []
+    top = min(nesting for nesting, _, _ in rows)
+    ranked = sorted(
+        ((ms, name) for nesting, ms, name in rows if nesting <= top + 1 and name != "main"),
+        reverse=True,
+    )
+    return ranked[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per stage")
+    parser.add_argument("--top", type=int, default=8, help="slowest imports listed per stage")
+    parser.add_argument(
+        "--import-budget-ms",
+        type=float,
+        default=BUDGETS_MS["import main"],
+        help="median budget for `import main`",
+    )
+    parser.add_argument(
+        "--app-budget-ms",
+        type=float,
+        default=BUDGETS_MS["build app"],
+        help="median budget for building the app",
+    )
+    args = parser.parse_args()
+
+    budgets = {"import main": args.import_budget_ms, "build app": args.app_budget_ms}
+    failures = []
+    for stage, (statement, forbidden) in STAGES.items():
+        probes = [_probe(statement) for _ in range(args.runs)]
+        median_ms = statistics.median(p["seconds"] for p in probes) * 1000
+        loaded = [name for name in forbidden if any(name in p["modules"] for p in probes)]
+        over = median_ms > budgets[stage]
+        status = "FAIL" if over or loaded else "ok"
+        print(
+            f"{stage:12} median {median_ms:8.1f} ms  budget {budgets[stage]:8.1f} ms  "
+            f"({args.runs} runs)  {status}"
+        )
+        for ms, name in _top_imports(statement, args.top):
+            print(f"    {ms:8.1f} ms  {name}")
+        if over:
+            failures.append(f"{stage} took {median_ms:.1f} ms (budget {budgets[stage]:g} ms)")
+        if loaded:
+            failures.append(f"{stage} loaded {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""
+End-to-end load test: concurrent MCP clients call the /mcp/v1 tools with a weighted mix of
+operations and the report gives p50/p95/p99 and throughput per operation (and overall).
+By default a stub Gateway (bench/stub_gateway.py) and the server (main.py) are started as
+subprocesses on free ports and stopped afterwards; --url targets a server that is already running.
+
+    python -m bench.load [--clients 8] [--duration 20] [--warmup 3]
+    python -m bench.load --datasets orders=50000:10:40 --latency 0.02 \
+        --save-baseline bench/baselines/load.json
+    python -m bench.load --url http://localhost:3000 --baseline bench/baselines/load.json
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import httpx
+
+from bench.report import add_arguments, finish, summarize
+
+ROOT = Path(__file__).resolve().parent.parent
+STATUSES = ("ok", "fail", "pending")
+REGIONS = ("EU", "US", "APAC", "LATAM")
+
+# operation -> (weight, tool arguments for the dataset); a request picks one by weight
+OPERATIONS: dict[str, tuple[int, Callable[[random.Random, str], tuple[str, dict[str, Any]]]]] = {
+    "query_page": (
+        30,
+        lambda rng, ds: (
+            "datagroom_query_dataset",
+            {"dataset_name": ds, "max_rows": 50, "offset": 50 * rng.randrange(20)},
+        ),
+    ),
+    "query_filtered": (
+        20,
+        lambda rng, ds: (
+            "datagroom_query_dataset",
+            {
+                "dataset_name": ds,
+                "max_rows": 25,
+                "filters": [
+                    {"field": "status", "type": "eq", "value": rng.choice(STATUSES)},
+                    {"field": "region", "type": "eq", "value": rng.choice(REGIONS)},
+                ],
+                "sort": {"field": "amount", "direction": "desc"},
+            },
+        ),
+    ),
+    "count": (
+        15,
+        lambda rng, ds: (
+            "datagroom_aggregate_dataset",
+            {
+                "dataset_name": ds,
+                "aggregations": [{"operation": "count"}],
+                "filters": [{"field": "status", "type": "eq", "value": rng.choice(STATUSES)}],
+            },
+        ),
+    ),
+    "aggregate_grouped": (
+        10,
+        lambda rng, ds: (
+            "datagroom_aggregate_dataset",
+            {
+                "dataset_name": ds,
+                "aggregations": [{"operation": "avg", "field": "amount"}],
+                "group_by": rng.choice(("region", "status")),
+            },
+        ),
+    ),
+    "schema": (10, lambda rng, ds: ("datagroom_get_schema", {"dataset_name": ds})),
+    "sample": (
+        10,
+        lambda rng, ds: (
+            "datagroom_sample_dataset",
+            {"dataset_name": ds, "sample_size": 20, "seed": rng.randrange(1000)},
+        ),
+    ),
+    "list_datasets": (5, lambda rng, ds: ("datagroom_list_datasets", {})),
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_until_up(url: str, process: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"{' '.join(process.args)} exited with status {process.returncode}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise SystemExit(f"{url} did not come up within {timeout:g}s")
+
+
+@contextmanager
+def _spawned_server(args: argparse.Namespace) -> Iterator[str]:
+    """Start the stub Gateway and the server; yields the server's base URL."""
+    gateway_port, server_port = _free_port(), _free_port()
+    stub_cmd = [
+        sys.executable, "-m", "bench.stub_gateway",
+        "--port", str(gateway_port),
+        "--datasets", args.datasets,
+        "--latency", str(args.latency),
+        "--seed", "1",
+    ]
+    env = {
+        **os.environ,
+        "DATAGROOM_PAT_TOKEN": "bench",
+        "DATAGROOM_GATEWAY_URL": f"http://127.0.0.1:{gateway_port}",
+        "MCP_SERVER_PORT": str(server_port),
+    }
+    processes = []
+    log = open(args.log, "w") if args.log else subprocess.DEVNULL
+    try:
+        stub = subprocess.Popen(stub_cmd, cwd=ROOT, stdout=log, stderr=subprocess.STDOUT)
+        processes.append(stub)
+        _wait_until_up(f"http://127.0.0.1:{gateway_port}/_stats", stub)
+        server = subprocess.Popen(
+            [sys.executable, "main.py"], cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+        processes.append(server)
+        _wait_until_up(f"http://127.0.0.1:{server_port}/health", server)
+        yield f"http://127.0.0.1:{server_port}"
+    finally:
+        for process in reversed(processes):
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if log is not subprocess.DEVNULL:
+            log.close()
+
+
+async def _run_load(url: str, args: argparse.Namespace) -> dict[str, dict[str, Any]]:
+    from fastmcp import Client
+
+    names = list(OPERATIONS)
+    weights = [OPERATIONS[name][0] for name in names]
+    datasets = [item.partition("=")[0].strip() for item in args.datasets.split(",")]
+    samples: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    recording = False
+
+    async def _client(worker: int, stop_at: float) -> None:
+        rng = random.Random(worker)
+        async with Client(f"{url}/mcp/v1", timeout=args.timeout) as client:
+            while time.monotonic() < stop_at:
+                name = rng.choices(names, weights)[0]
+                tool, arguments = OPERATIONS[name][1](rng, rng.choice(datasets))
+                started = time.perf_counter()
+                try:
+                    await client.call_tool(tool, arguments)
+                    failed = False
+                except Exception:
+                    failed = True
+                elapsed = time.perf_counter() - started
+                if not recording:
+                    continue
+                if failed:
+                    errors[name] += 1
+                else:
+                    samples[name].append(elapsed)
+
+    if args.warmup > 0:
+        stop_at = time.monotonic() + args.warmup
+        await asyncio.gather(*(_client(w, stop_at) for w in range(args.clients)))
+    recording = True
+    started = time.perf_counter()
+    stop_at = time.monotonic() + args.duration
+    await asyncio.gather(*(_client(w + args.clients, stop_at) for w in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    results = {
+        name: summarize(samples[name], elapsed, errors[name])
+        for name in names
+        if samples[name] or errors[name]
+    }
+    every = [s for name in names for s in samples[name]]
+    results["all"] = summarize(every, elapsed, sum(errors.values()))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", help="server base URL (default: start stub Gateway and server)")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent MCP clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="unmeasured seconds first")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per-call timeout")
+    parser.add_argument(
+        "--datasets",
+        default="orders=20000:5:32,users=2000",
+        help="stub datasets, name=rows[:extra_columns[:text_width]],... (default: %(default)s)",
+    )
+    parser.add_argument("--latency", type=float, default=0.01, help="stub Gateway latency (s)")
+    parser.add_argument("--log", help="write stub Gateway and server output to this file")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients, {args.warmup:g}s warm-up + {args.duration:g}s measured, "
+        f"datasets {args.datasets}" + ("" if args.url else f", stub latency {args.latency:g}s")
+    )
+    if args.url:
+        results = asyncio.run(_run_load(args.url.rstrip("/"), args))
+    else:
+        with _spawned_server(args) as url:
+            results = asyncio.run(_run_load(url, args))
+    sys.exit(finish(args, "load", results))
+
+
+if __name__ == "__main__":
+    main()
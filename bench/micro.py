@@ -0,0 +1,83 @@
+"""
+Micro-benchmarks of the CPU-bound steps of a tool call: Gateway response parsing, filter
+conversion and markdown rendering, on rows from the stub Gateway's synthetic datasets.
+Each case is called repeatedly; latencies are per call (calls faster than SAMPLE_SECONDS are timed
+in batches and averaged).
+
+    python -m bench.micro [--rows 100] [--extra-columns 10] [--calls 500]
+    python -m bench.micro --save-baseline bench/baselines/micro.json
+    python -m bench.micro --baseline bench/baselines/micro.json
+"""
+
+import argparse
+import sys
+import time
+from typing import Any, Callable
+
+from bench.report import add_arguments, finish, summarize
+from bench.stub_gateway import make_rows
+from schemas import Filter
+from utils.filter_converter import convert_filters_to_mongo
+from utils.formatters import format_markdown_table, render_markdown_table
+from utils.json_codec import dumps, loads
+
+FILTERS = [
+    {"field": "status", "type": "eq", "value": "ok"},
+    {"field": "region", "type": "in", "value": ["EU", "US"]},
+    {"field": "amount", "type": "gte", "value": 10},
+    {"field": "amount", "type": "lt", "value": 5000},
+    {"field": "name", "type": "regex", "value": "^orders-1"},
+    {"field": "tags", "type": "nin", "value": ["bulk"]},
+]
+# Shortest timed sample; faster calls are repeated within one sample
+SAMPLE_SECONDS = 0.0005
+
+
+def _time_calls(fn: Callable[[], Any], calls: int) -> dict[str, Any]:
+    """Per-call stats; fast calls are timed in batches so timer overhead does not dominate."""
+    started = time.perf_counter()
+    fn()  # warm up
+    batch = max(1, int(SAMPLE_SECONDS / max(time.perf_counter() - started, 1e-9)))
+    samples = []
+    started = time.perf_counter()
+    for _ in range(calls):
+        sample_started = time.perf_counter()
+        for _ in range(batch):
+            fn()
+        samples.append((time.perf_counter() - sample_started) / batch)
+    result = summarize(samples, time.perf_counter() - started)
+    result["throughput"] *= batch
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100, help="rows per page / table")
+    parser.add_argument("--extra-columns", type=int, default=10)
+    parser.add_argument("--text-width", type=int, default=40)
+    parser.add_argument("--calls", type=int, default=500)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    rows = make_rows("orders", args.rows, args.extra_columns, args.text_width)
+    page = dumps({"total": args.rows * 100, "data": rows}).encode("utf-8")
+    filter_objs = [Filter(**f) for f in FILTERS]
+    cases = {
+        "parse_gateway_page": lambda: loads(page),
+        "build_filters": lambda: [Filter(**f) for f in FILTERS],
+        "convert_filters_to_mongo": lambda: convert_filters_to_mongo(filter_objs),
+        "format_markdown_table": lambda: format_markdown_table(rows),
+        "render_markdown_table_budget": lambda: render_markdown_table(
+            rows, max_bytes=16 * 1024, max_cell_chars=200
+        ),
+    }
+    print(
+        f"{args.rows} rows x {9 + args.extra_columns} columns "
+        f"({len(page):,} bytes per page), {args.calls} calls per case"
+    )
+    results = {name: _time_calls(fn, args.calls) for name, fn in cases.items()}
+    sys.exit(finish(args, "micro", results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Shared reporting for the benchmark suite: latency percentiles and throughput per case, stored
+baselines and comparison against them.
+A baseline is a JSON file written with --save-baseline; --baseline compares a run with it, marks
+cases whose p95 latency grew or whose throughput fell by more than --threshold, and makes the
+command exit with status 1 if any case regressed.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+from pathlib import Path
+from typing import Any
+
+from utils.json_codec import orjson
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+def summarize(samples: list[float], elapsed: float, errors: int = 0) -> dict[str, Any]:
+    """Stats for one case: samples are per-call seconds, elapsed the wall time of the case."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "errors": errors,
+        "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else 0.0,
+        "p50_ms": _percentile(ordered, 0.50) * 1000,
+        "p95_ms": _percentile(ordered, 0.95) * 1000,
+        "p99_ms": _percentile(ordered, 0.99) * 1000,
+        "throughput": len(ordered) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--baseline", type=Path, help="compare with this stored baseline")
+    parser.add_argument("--save-baseline", type=Path, help="store this run as a baseline")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="relative p95/throughput change counted as a regression (default: %(default)s)",
+    )
+
+
+def _change(now: float, before: float) -> float | None:
+    return (now - before) / before if before else None
+
+
+def _regressed(now: dict[str, Any], before: dict[str, Any], threshold: float) -> bool:
+    slower = _change(now["p95_ms"], before["p95_ms"])
+    fewer = _change(now["throughput"], before["throughput"])
+    return (slower is not None and slower > threshold) or (fewer is not None and -fewer > threshold)
+
+
+def print_report(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]] | None = None,
+    threshold: float = 0.10,
+) -> list[str]:
+    """Print one row per case (with changes against the baseline); returns the regressed cases."""
+    header = (
+        f"{'case':28} {'count':>7} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'ops/s':>9}"
+    )
+    if baseline is not None:
+        header += f" {'p95 vs base':>12} {'ops/s vs base':>14}"
+    print(header)
+    regressed = []
+    for name, r in results.items():
+        line = (
+            f"{name:28} {r['count']:7} {r['errors']:4} {r['p50_ms']:9.3f} {r['p95_ms']:9.3f} "
+            f"{r['p99_ms']:9.3f} {r['throughput']:9.1f}"
+        )
+        before = (baseline or {}).get(name)
+        if before is not None:
+            p95 = _change(r["p95_ms"], before["p95_ms"])
+            ops = _change(r["throughput"], before["throughput"])
+            line += f" {p95 * 100 if p95 is not None else 0.0:+11.1f}%"
+            line += f" {ops * 100 if ops is not None else 0.0:+13.1f}%"
+            if _regressed(r, before, threshold):
+                regressed.append(name)
+                line += "  REGRESSION"
+        elif baseline is not None:
+            line += f" {'(new)':>12}"
+        print(line)
+    return regressed
+
+
+def finish(args: argparse.Namespace, suite: str, results: dict[str, dict[str, Any]]) -> int:
+    """Report, compare with and/or store a baseline; returns the process exit status."""
+    baseline = None
+    if args.baseline is not None:
+        stored = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if stored.get("suite") != suite:
+            raise SystemExit(
+                f"{args.baseline} is a baseline for {stored.get('suite')}, not {suite}"
+            )
+        baseline = stored["results"]
+        print(f"baseline: {args.baseline} ({stored.get('created')}, {stored.get('machine')})")
+    regressed = print_report(results, baseline, args.threshold)
+    if args.save_baseline is not None:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.save_baseline.write_text(
+            json.dumps(
+                {
+                    "suite": suite,
+                    "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "machine": f"{platform.node()} {platform.machine()}",
+                    "python": platform.python_version(),
+                    "orjson": orjson is not None,
+                    "results": results,
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        print(f"baseline saved to {args.save_baseline}")
+    if regressed:
+        print(
+            f"{len(regressed)} case(s) regressed by more than {args.threshold:.0%}: "
+            f"{', '.join(regressed)}"
+        )
+        return 1
+    return 0
@@ -0,0 +1,129 @@
+"""
+Benchmark: Gateway resilience (utils/resilience.py) against the fault-injecting stub Gateway.
+Each scenario sends the same viewViaPost calls through the resilience layer in-process (no
+network) with the feature under test off and on, and reports success rate, latency percentiles
+and the layer's counters.
+
+    python -m bench.resilience [--calls 200] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from bench.stub_gateway import Faults, create_app
+from config import config
+from utils.error_handlers import GatewayUnavailableError
+from utils.gateway_client import close_gateway_client, open_gateway_client
+from utils.resilience import gateway_request, get_resilience_stats, reset_resilience
+
+ENDPOINT = "/ds/viewViaPost/orders/default/mcp"
+BODY = {"filters": [], "sorters": [], "page": 1, "per_page": 10}
+
+# (scenario, fault settings, config off, config on)
+SCENARIOS = [
+    (
+        "flaky (30% 503)",
+        {"error_rate": 0.3},
+        {"gateway_retries": 0},
+        {"gateway_retries": 2, "gateway_retry_backoff": 0.01},
+    ),
+    (
+        "throttled (30% 429, Retry-After 50ms)",
+        {"throttle_rate": 0.3, "retry_after": 0.05},
+        {"gateway_retries": 0},
+        {"gateway_retries": 2},
+    ),
+    (
+        "slow tail (5% +500ms)",
+        {"latency": 0.01, "slow_rate": 0.05, "slow_latency": 0.5},
+        {"gateway_hedge": False},
+        {"gateway_hedge": True, "gateway_hedge_min_delay": 0.02},
+    ),
+    (
+        "outage (100% 503)",
+        {"error_rate": 1.0},
+        {"gateway_breaker_failures": 10**9, "gateway_retries": 2, "gateway_retry_backoff": 0.05},
+        {"gateway_breaker_failures": 5, "gateway_retries": 2, "gateway_retry_backoff": 0.05},
+    ),
+]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)] if ordered else 0.0
+
+
+async def _run(faults: dict, settings: dict, calls: int, concurrency: int) -> dict:
+    config.update(settings)
+    reset_resilience()
+    app = create_app({"orders": 2000}, Faults(**faults), seed=1)
+    await close_gateway_client()
+    await open_gateway_client(httpx.ASGITransport(app=app))
+    slots = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    outcomes = {"ok": 0, "failed": 0, "fast_failed": 0}
+
+    async def _call() -> None:
+        async with slots:
+            started = time.perf_counter()
+            try:
+                response = await gateway_request("POST", ENDPOINT, json=BODY)
+                outcomes["ok" if response.is_success else "failed"] += 1
+            except GatewayUnavailableError:
+                outcomes["fast_failed"] += 1
+            except httpx.HTTPError:
+                outcomes["failed"] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(_call() for _ in range(calls)))
+    elapsed = time.perf_counter() - started
+    await close_gateway_client()
+    stats = get_resilience_stats()
+    return {
+        **outcomes,
+        "p50_ms": _percentile(latencies, 0.5) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+        "wall_s": elapsed,
+        "retries": stats["retries"],
+        "hedges": stats["hedges"],
+        "opens": stats["breaker"]["opens"],
+    }
+
+
+async def _main(calls: int, concurrency: int) -> None:
+    original = dict(config)
+    config["pat_token"] = config["pat_token"] or "bench"
+    print(f"{calls} calls per run, {concurrency} concurrent")
+    header = f"{'scenario':40} {'mode':4} {'ok':>5} {'fail':>5} {'fast':>5}"
+    print(f"{header} {'p50 ms':>8} {'p99 ms':>8} {'wall s':>7} {'retry':>6} {'hedge':>6} {'opens':>5}")
+    try:
+        for name, faults, off, on in SCENARIOS:
+            for mode, settings in (("off", off), ("on", on)):
+                config.clear()
+                config.update(original)
+                r = await _run(faults, settings, calls, concurrency)
+                print(
+                    f"{name:40} {mode:4} {r['ok']:5} {r['failed']:5} {r['fast_failed']:5} "
+                    f"{r['p50_ms']:8.1f} {r['p99_ms']:8.1f} {r['wall_s']:7.2f} "
+                    f"{r['retries']:6} {r['hedges']:6} {r['opens']:5}"
+                )
+    finally:
+        config.clear()
+        config.update(original)
+        reset_resilience()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(_main(args.calls, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
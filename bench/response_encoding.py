@@ -0,0 +1,98 @@
+"""
+Benchmark: CPU per call of the response pipeline before and after utils/json_codec.py.
+Compares, on synthetic Gateway pages, the standard-library path the tools used before with the
+current one, and checks that the text the tools return is byte-identical.
+
+    python -m bench.response_encoding [--rows 100] [--calls 200]
+"""
+
+import argparse
+import json
+import random
+import time
+
+from schemas import QueryResult
+from utils.formatters import render_markdown_table
+from utils.json_codec import dumps_pretty, loads, orjson
+
+
+def _rows(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "_id": f"{i:024x}",
+            "name": f"customer {i}",
+            "city": rng.choice(["Zürich", "São Paulo", "Paris", "東京", "Austin"]),
+            "status": rng.choice(["ok", "fail", "pending"]),
+            "amount": round(rng.uniform(0, 5000), 2),
+            "ratio": rng.random(),
+            "count": rng.randint(0, 10**6),
+            "active": rng.random() < 0.5,
+            "note": None if rng.random() < 0.3 else "line one\nline | two",
+            "tags": rng.sample(["a", "b", "c", "d"], 2),
+            "address": {"street": f"{i} Main St", "zip": f"{rng.randint(10000, 99999)}"},
+        }
+        for i in range(n)
+    ]
+
+
+def _cpu_us(fn, calls: int) -> float:
+    """Best-of-3 CPU microseconds per call."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.process_time()
+        for _ in range(calls):
+            fn()
+        best = min(best, time.process_time() - start)
+    return best / calls * 1e6
+
+
+def _result(data: list[dict]) -> dict:
+    return QueryResult(
+        dataset_name="bench",
+        query_summary="summary",
+        total_matching=len(data),
+        rows_returned=len(data),
+        offset=0,
+        has_more=False,
+        data=data,
+    ).model_dump()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    data = _rows(args.rows)
+    page = json.dumps({"total": len(data), "data": data}).encode()
+    assert loads(page) == json.loads(page)
+    assert dumps_pretty(data) == json.dumps(data, indent=2)
+
+    cases = [
+        # (case, before, after)
+        ("parse Gateway page", lambda: json.loads(page), lambda: loads(page)),
+        (
+            "sample text (indent=2)",
+            lambda: json.dumps(data, indent=2),
+            lambda: dumps_pretty(data),
+        ),
+        (
+            # response_format was ignored: the table was rendered for 'json' requests too; now
+            # the rows are only in structured_content
+            "query response_format=json",
+            lambda: (render_markdown_table(data), _result(data)),
+            lambda: _result(data),
+        ),
+    ]
+    print(f"{args.rows} rows/call, orjson {'available' if orjson else 'not installed'}")
+    print(f"{'case':34} {'before us':>10} {'after us':>10} {'speedup':>8}")
+    for name, before, after in cases:
+        b = _cpu_us(before, args.calls)
+        a = _cpu_us(after, args.calls)
+        print(f"{name:34} {b:10.1f} {a:10.1f} {b / a:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Local stub of the Datagroom Gateway with fault injection.
+Serves /ds/dsList, /ds/view/columns and /ds/viewViaPost for synthetic datasets (filters, sorters
+and fields are applied with the server's own utils/filter_compiler.py and utils/projection.py).
+Each dataset has a row count and, optionally, extra text columns of a given width
+("name=rows[:extra_columns[:text_width]]"). Faults are injected on request: fixed latency, a slow
+tail, 503 errors and 429 throttling with Retry-After.
+Faults can be changed while running (POST /_faults with a JSON object of fault settings);
+GET /_stats returns request and fault counters.
+
+    python -m bench.stub_gateway --port 8887 --datasets orders=50000,wide=5000:40:200 --latency 0.02
+    python -m bench.stub_gateway --port 8887 --error-rate 0.2 --slow-rate 0.05 --slow-latency 3
+
+In-process use (no network): httpx.ASGITransport(app=create_app(...)), e.g. passed to
+utils.gateway_client.open_gateway_client(transport).
+"""
+
+import argparse
+import asyncio
+import datetime
+import random
+from collections import Counter
+from typing import Any
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from utils.filter_compiler import compile_filters, sort_rows
+from utils.projection import project_rows
+
+DEFAULT_DATASETS = {"orders": 5000, "users": 1000}
+_STATUSES = ("ok", "ok", "ok", "fail", "pending")
+_REGIONS = ("EU", "US", "APAC", "LATAM")
+_TIERS = ("free", "pro", "enterprise")
+_ALPHABET = "abcdefghijklmnopqrstuvwxyz      "
+
+
+class DatasetSpec:
+    """Shape of a synthetic dataset: rows, plus extra_columns text columns of text_width chars."""
+
+    def __init__(self, rows: int, extra_columns: int = 0, text_width: int = 16):
+        self.rows = rows
+        self.extra_columns = extra_columns
+        self.text_width = text_width
+
+    @classmethod
+    def parse(cls, text: str) -> "DatasetSpec":
+        """Spec from "rows[:extra_columns[:text_width]]"."""
+        parts = [int(part) for part in text.split(":")]
+        if not 1 <= len(parts) <= 3:
+            raise ValueError(f"Invalid dataset spec: {text}")
+        return cls(*parts)
+
+
+def parse_datasets(text: str) -> dict[str, DatasetSpec]:
+    """Datasets from "name=rows[:extra_columns[:text_width]],..." (rows default to 1000)."""
+    datasets = {}
+    for item in text.split(","):
+        name, _, spec = item.partition("=")
+        if name.strip():
+            datasets[name.strip()] = DatasetSpec.parse(spec.strip() or "1000")
+    return datasets
+
+
+class Faults:
+    """Fault settings; rates are per-request probabilities."""
+
+    FIELDS = (
+        "latency",
+        "slow_rate",
+        "slow_latency",
+        "error_rate",
+        "error_status",
+        "throttle_rate",
+        "retry_after",
+    )
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        slow_rate: float = 0.0,
+        slow_latency: float = 2.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+    ):
+        self.latency = latency
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+
+    def update(self, values: dict[str, Any]) -> None:
+        for name, value in values.items():
+            if name not in self.FIELDS:
+                raise ValueError(f"Unknown fault setting: {name}")
+            setattr(self, name, type(getattr(self, name))(value))
+
+    def as_dict(self) -> dict[str, Any]:
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+def make_rows(
+    dataset_name: str, count: int, extra_columns: int = 0, text_width: int = 16
+) -> list[dict[str, Any]]:
+    """Deterministic synthetic rows for a dataset."""
+    rng = random.Random(dataset_name)
+    start = datetime.datetime(2024, 1, 1)
+    # Extra text values are slices of one random text, so wide datasets stay cheap to build
+    text_rng = random.Random(f"{dataset_name}:text")
+    text = ""
+    if extra_columns:
+        text = "".join(text_rng.choice(_ALPHABET) for _ in range(text_width + 1000))
+    rows = []
+    for i in range(count):
+        created = start + datetime.timedelta(minutes=rng.randrange(0, 60 * 24 * 365))
+        row = {
+            "_id": f"{rng.getrandbits(32):08x}{i:016x}",
+            "name": f"{dataset_name}-{i}",
+            "status": rng.choice(_STATUSES),
+            "region": rng.choice(_REGIONS),
+            "amount": round(rng.lognormvariate(4, 1), 2),
+            "quantity": rng.randint(1, 20),
+            "created_at": created.isoformat() + "Z",
+            "tags": rng.sample(["new", "vip", "promo", "returning", "bulk"], rng.randint(0, 2)),
+            "customer": {"id": rng.randrange(count // 4 + 1), "tier": rng.choice(_TIERS)},
+        }
+        for c in range(extra_columns):
+            offset = text_rng.randrange(1000)
+            row[f"text_{c}"] = text[offset : offset + text_width]
+        rows.append(row)
+    return rows
+
+
+def create_app(
+    datasets: dict[str, int | DatasetSpec | list[dict[str, Any]]] | None = None,
+    faults: Faults | None = None,
+    seed: int | None = None,
+) -> Starlette:
+    """Stub Gateway app over datasets ({name: row count, DatasetSpec or the rows themselves})."""
+    data = {}
+    for name, spec in (datasets or DEFAULT_DATASETS).items():
+        if isinstance(spec, list):
+            data[name] = spec
+            continue
+        if not isinstance(spec, DatasetSpec):
+            spec = DatasetSpec(spec)
+        data[name] = make_rows(name, spec.rows, spec.extra_columns, spec.text_width)
+    faults = faults or Faults()
+    rng = random.Random(seed)
+    counters: Counter[str] = Counter()
+
+    async def _inject(endpoint: str) -> JSONResponse | None:
+        """Apply latency and maybe answer with an injected error instead of the real response."""
+        counters[f"requests.{endpoint}"] += 1
+        delay = faults.latency
+        if faults.slow_rate and rng.random() < faults.slow_rate:
+            counters["faults.slow"] += 1
+            delay += faults.slow_latency
+        if delay:
+            await asyncio.sleep(delay)
+        if faults.throttle_rate and rng.random() < faults.throttle_rate:
+            counters["faults.throttled"] += 1
+            return JSONResponse(
+                {"error": "throttled"},
+                status_code=429,
+                headers={"Retry-After": f"{faults.retry_after:g}"},
+            )
+        if faults.error_rate and rng.random() < faults.error_rate:
+            counters["faults.errors"] += 1
+            return JSONResponse({"error": "injected failure"}, status_code=faults.error_status)
+        return None
+
+    def _rows(request: Request) -> list[dict[str, Any]] | None:
+        return data.get(request.path_params["dataset"])
+
+    async def ds_list(_request: Request) -> JSONResponse:
+        return await _inject("list") or JSONResponse(
+            {"dbList": [{"name": name} for name in data]}
+        )
+
+    async def columns(request: Request) -> JSONResponse:
+        injected = await _inject("columns")
+        if injected is not None:
+            return injected
+        rows = _rows(request)
+        if rows is None:
+            return JSONResponse({"error": "dataset not found"}, status_code=404)
+        names = list(dict.fromkeys(key for row in rows[:100] for key in row))
+        return JSONResponse({"columns": [{"field": name} for name in names]})
+
+    async def view(request: Request) -> JSONResponse:
+        injected = await _inject("view")
+        if injected is not None:
+            return injected
+        rows = _rows(request)
+        if rows is None:
+            return JSONResponse({"error": "dataset not found"}, status_code=404)
+        body = await request.json()
+        try:
+            matched = compile_filters(body.get("filters")).filter(rows)
+        except ValueError as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        if body.get("sorters"):
+            matched = sort_rows(list(matched), body["sorters"])
+        page, per_page = int(body.get("page", 1)), int(body.get("per_page", 100))
+        window = matched[(page - 1) * per_page : page * per_page]
+        if body.get("fields"):
+            window = project_rows(window, body["fields"])
+        return JSONResponse({"total": len(matched), "data": window})
+
+    async def set_faults(request: Request) -> JSONResponse:
+        try:
+            faults.update(await request.json())
+        except (ValueError, TypeError) as e:
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return JSONResponse(faults.as_dict())
+
+    async def stats(_request: Request) -> JSONResponse:
+        return JSONResponse({"faults": faults.as_dict(), "counters": dict(counters)})
+
+    return Starlette(
+        routes=[
+            Route("/ds/dsList/mcp", ds_list),
+            Route("/ds/view/columns/{dataset}/default/mcp", columns),
+            Route("/ds/viewViaPost/{dataset}/default/mcp", view, methods=["POST"]),
+            Route("/_faults", set_faults, methods=["POST"]),
+            Route("/_stats", stats),
+        ]
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8887)
+    parser.add_argument(
+        "--datasets",
+        default=",".join(f"{name}={n}" for name, n in DEFAULT_DATASETS.items()),
+        help="name=rows[:extra_columns[:text_width]],... (default: %(default)s)",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    defaults = Faults()
+    for name in Faults.FIELDS:
+        parser.add_argument(
+            f"--{name.replace('_', '-')}", type=type(getattr(defaults, name)), default=None
+        )
+    args = parser.parse_args()
+    datasets = parse_datasets(args.datasets)
+    faults = Faults()
+    faults.update({n: getattr(args, n) for n in Faults.FIELDS if getattr(args, n) is not None})
+    import uvicorn
+
+    uvicorn.run(create_app(datasets, faults, args.seed), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
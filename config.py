@@ -46,6 +46,37 @@ def _load_from_cursor_mcp_json() -> None:
 
 _load_from_cursor_mcp_json()
 
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, str(default)), 10)
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, str(default)))
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    raw = os.environ.get(name)
+    if raw is None or raw.strip() == "":
+        return default
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_overrides(name: str) -> dict[str, str]:
+    """Parse per-dataset overrides of the form "dataset_a=value,dataset_b=value"."""
+    overrides: dict[str, str] = {}
+    for item in os.environ.get(name, "").split(","):
+        key, sep, value = item.partition("=")
+        if sep and key.strip():
+            overrides[key.strip()] = value.strip()
+    return overrides
+
+
+def _env_list(name: str) -> list[str]:
+    """Parse a comma-separated list ("a,b,c")."""
+    return [item.strip() for item in os.environ.get(name, "").split(",") if item.strip()]
+
+
 # Config object matching TS config.ts
 MONGODB_URL = os.environ.get("MONGODB_URL", "mongodb://localhost:27017")
 MCP_SERVER_PORT = int(os.environ.get("MCP_SERVER_PORT", "3000"), 10)
@@ -53,6 +84,120 @@ DATAGROOM_GATEWAY_URL = os.environ.get("DATAGROOM_GATEWAY_URL", "http://localhos
 DATAGROOM_PAT_TOKEN = os.environ.get("DATAGROOM_PAT_TOKEN", "")
 NODE_ENV = os.environ.get("NODE_ENV", "development")
 
+# Shared Gateway HTTP client (connection pool, keep-alive, optional HTTP/2)
+GATEWAY_HTTP2 = _env_bool("GATEWAY_HTTP2", False)
+GATEWAY_MAX_CONNECTIONS = _env_int("GATEWAY_MAX_CONNECTIONS", 100)
+GATEWAY_MAX_KEEPALIVE_CONNECTIONS = _env_int("GATEWAY_MAX_KEEPALIVE_CONNECTIONS", 20)
+GATEWAY_KEEPALIVE_EXPIRY = _env_float("GATEWAY_KEEPALIVE_EXPIRY", 30.0)
+GATEWAY_TIMEOUT = _env_float("GATEWAY_TIMEOUT", 60.0)
+GATEWAY_CONNECT_TIMEOUT = _env_float("GATEWAY_CONNECT_TIMEOUT", 10.0)
+GATEWAY_POOL_TIMEOUT = _env_float("GATEWAY_POOL_TIMEOUT", 10.0)
+
+# Resilience (utils/resilience.py): retries of idempotent calls, circuit breaker, hedging
+GATEWAY_RETRIES = _env_int("GATEWAY_RETRIES", 2)
+GATEWAY_RETRY_BACKOFF = _env_float("GATEWAY_RETRY_BACKOFF", 0.2)
+GATEWAY_RETRY_MAX_BACKOFF = _env_float("GATEWAY_RETRY_MAX_BACKOFF", 5.0)
+GATEWAY_BREAKER_FAILURES = _env_int("GATEWAY_BREAKER_FAILURES", 5)
+GATEWAY_BREAKER_RESET = _env_float("GATEWAY_BREAKER_RESET", 30.0)
+GATEWAY_HEDGE = _env_bool("GATEWAY_HEDGE", False)
+GATEWAY_HEDGE_MIN_DELAY = _env_float("GATEWAY_HEDGE_MIN_DELAY", 0.05)
+# Seconds per Gateway call (all attempts) by endpoint; other endpoints use GATEWAY_TIMEOUT
+GATEWAY_ENDPOINT_TIMEOUTS = {
+    "list": 10.0,
+    "columns": 15.0,
+    "view": 30.0,
+    **{name: float(t) for name, t in _env_overrides("GATEWAY_ENDPOINT_TIMEOUTS").items()},
+}
+
+# Admission control (utils/admission.py): in-flight caps and fair, bounded wait queues (0 = no cap)
+ADMISSION_MAX_IN_FLIGHT = _env_int("ADMISSION_MAX_IN_FLIGHT", 32)
+ADMISSION_MAX_PER_CALLER = _env_int("ADMISSION_MAX_PER_CALLER", 8)
+ADMISSION_MAX_PER_DATASET = _env_int("ADMISSION_MAX_PER_DATASET", 8)
+ADMISSION_QUEUE_SIZE = _env_int("ADMISSION_QUEUE_SIZE", 128)
+ADMISSION_CALLER_QUEUE_SIZE = _env_int("ADMISSION_CALLER_QUEUE_SIZE", 32)
+ADMISSION_MAX_WAIT = _env_float("ADMISSION_MAX_WAIT", 10.0)
+# Fair-share weight per caller label (as shown in /stats), default 1
+ADMISSION_CALLER_WEIGHTS = {
+    caller: float(w) for caller, w in _env_overrides("ADMISSION_CALLER_WEIGHTS").items()
+}
+
+# Schema cache (datagroom_get_schema)
+SCHEMA_CACHE_MAX_ENTRIES = _env_int("SCHEMA_CACHE_MAX_ENTRIES", 256)
+SCHEMA_CACHE_TTL = _env_float("SCHEMA_CACHE_TTL", 300.0)
+SCHEMA_CACHE_STALE_TTL = _env_float("SCHEMA_CACHE_STALE_TTL", 600.0)
+# Column profile cached with the schema (rows sampled, top values reported per column)
+PROFILE_SAMPLE_ROWS = _env_int("PROFILE_SAMPLE_ROWS", 1000)
+PROFILE_TOP_K = _env_int("PROFILE_TOP_K", 5)
+
+# Query result cache (viewViaPost responses)
+QUERY_CACHE_MAX_ENTRIES = _env_int("QUERY_CACHE_MAX_ENTRIES", 1024)
+QUERY_CACHE_MAX_BYTES = _env_int("QUERY_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+QUERY_CACHE_TTL = _env_float("QUERY_CACHE_TTL", 30.0)
+QUERY_CACHE_DATASET_TTLS = {
+    name: float(ttl) for name, ttl in _env_overrides("QUERY_CACHE_DATASET_TTLS").items()
+}
+
+# MongoDB client (async pymongo; used by the direct Mongo backend)
+MONGO_MAX_POOL_SIZE = _env_int("MONGO_MAX_POOL_SIZE", 60)
+MONGO_MIN_POOL_SIZE = _env_int("MONGO_MIN_POOL_SIZE", 3)
+MONGO_SERVER_SELECTION_TIMEOUT_MS = _env_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10000)
+MONGO_SOCKET_TIMEOUT_MS = _env_int("MONGO_SOCKET_TIMEOUT_MS", 45000)
+MONGO_HEALTH_CACHE_SECONDS = _env_float("MONGO_HEALTH_CACHE_SECONDS", 5.0)
+
+# Execution backend: "gateway" (default) or "mongo" (direct MongoDB), overridable per dataset
+DATAGROOM_BACKEND = os.environ.get("DATAGROOM_BACKEND", "gateway").strip().lower()
+DATAGROOM_BACKEND_DATASETS = {
+    name: backend.lower()
+    for name, backend in _env_overrides("DATAGROOM_BACKEND_DATASETS").items()
+}
+
+# Response rendering budget (markdown text returned to the client)
+RESPONSE_MAX_BYTES = _env_int("RESPONSE_MAX_BYTES", 64 * 1024)
+RESPONSE_MAX_CELL_CHARS = _env_int("RESPONSE_MAX_CELL_CHARS", 200)
+
+# Client-side streaming aggregation (datagroom_aggregate_dataset)
+AGGREGATE_PAGE_SIZE = _env_int("AGGREGATE_PAGE_SIZE", 1000)
+AGGREGATE_CONCURRENCY = _env_int("AGGREGATE_CONCURRENCY", 4)
+AGGREGATE_MAX_ROWS = _env_int("AGGREGATE_MAX_ROWS", 1_000_000)
+# Cached per-page partial aggregation states (reused by repeated aggregations)
+AGGREGATE_PARTIAL_CACHE_MAX_ENTRIES = _env_int("AGGREGATE_PARTIAL_CACHE_MAX_ENTRIES", 4096)
+AGGREGATE_PARTIAL_CACHE_MAX_BYTES = _env_int("AGGREGATE_PARTIAL_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+
+# Bulk export (datagroom_export_dataset); files are only written inside EXPORT_DIR
+EXPORT_DIR = os.environ.get("EXPORT_DIR", "exports")
+EXPORT_PAGE_SIZE = _env_int("EXPORT_PAGE_SIZE", 1000)
+EXPORT_CONCURRENCY = _env_int("EXPORT_CONCURRENCY", 4)
+
+# Random sampling (datagroom_sample_dataset)
+SAMPLE_PAGE_SIZE = _env_int("SAMPLE_PAGE_SIZE", 200)
+SAMPLE_MAX_PAGES = _env_int("SAMPLE_MAX_PAGES", 8)
+SAMPLE_CONCURRENCY = _env_int("SAMPLE_CONCURRENCY", 8)
+
+# Row counts added to datagroom_list_datasets
+LIST_DATASETS_COUNT_CONCURRENCY = _env_int("LIST_DATASETS_COUNT_CONCURRENCY", 8)
+LIST_DATASETS_COUNT_TIMEOUT = _env_float("LIST_DATASETS_COUNT_TIMEOUT", 2.0)
+LIST_DATASETS_COUNT_TTL = _env_float("LIST_DATASETS_COUNT_TTL", 300.0)
+
+# Batched tool calls (datagroom_batch)
+BATCH_MAX_OPERATIONS = _env_int("BATCH_MAX_OPERATIONS", 20)
+BATCH_CONCURRENCY = _env_int("BATCH_CONCURRENCY", 4)
+
+# Local dataset snapshots (opt-in per dataset; refreshed from the editlog when stale)
+SNAPSHOT_DATASETS = _env_list("SNAPSHOT_DATASETS")
+SNAPSHOT_DIR = os.environ.get("SNAPSHOT_DIR", "snapshots")
+SNAPSHOT_TTL = _env_float("SNAPSHOT_TTL", 60.0)
+SNAPSHOT_PAGE_SIZE = _env_int("SNAPSHOT_PAGE_SIZE", 1000)
+SNAPSHOT_CONCURRENCY = _env_int("SNAPSHOT_CONCURRENCY", 4)
+
+# Diagnostics: phase timings in structured_content, token-guarded /admin/profile route
+DEBUG_TIMINGS = _env_bool("DEBUG_TIMINGS", False)
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+PROFILE_MAX_SECONDS = _env_float("PROFILE_MAX_SECONDS", 30.0)
+
+# Startup: warm Gateway connections and the dataset-list/schema caches once the port is open
+PREWARM = _env_bool("PREWARM", False)
+PREWARM_DATASETS = _env_list("PREWARM_DATASETS")
+
 config = {
     "mongo_url": MONGODB_URL,
     "mcp_server_port": MCP_SERVER_PORT,
@@ -60,6 +205,72 @@ config = {
     "datagram_gateway_url": DATAGROOM_GATEWAY_URL,
     "pat_token": DATAGROOM_PAT_TOKEN,
     "node_env": NODE_ENV,
+    "gateway_http2": GATEWAY_HTTP2,
+    "gateway_max_connections": GATEWAY_MAX_CONNECTIONS,
+    "gateway_max_keepalive_connections": GATEWAY_MAX_KEEPALIVE_CONNECTIONS,
+    "gateway_keepalive_expiry": GATEWAY_KEEPALIVE_EXPIRY,
+    "gateway_timeout": GATEWAY_TIMEOUT,
+    "gateway_connect_timeout": GATEWAY_CONNECT_TIMEOUT,
+    "gateway_pool_timeout": GATEWAY_POOL_TIMEOUT,
+    "gateway_retries": GATEWAY_RETRIES,
+    "gateway_retry_backoff": GATEWAY_RETRY_BACKOFF,
+    "gateway_retry_max_backoff": GATEWAY_RETRY_MAX_BACKOFF,
+    "gateway_breaker_failures": GATEWAY_BREAKER_FAILURES,
+    "gateway_breaker_reset": GATEWAY_BREAKER_RESET,
+    "gateway_hedge": GATEWAY_HEDGE,
+    "gateway_hedge_min_delay": GATEWAY_HEDGE_MIN_DELAY,
+    "gateway_endpoint_timeouts": GATEWAY_ENDPOINT_TIMEOUTS,
+    "admission_max_in_flight": ADMISSION_MAX_IN_FLIGHT,
+    "admission_max_per_caller": ADMISSION_MAX_PER_CALLER,
+    "admission_max_per_dataset": ADMISSION_MAX_PER_DATASET,
+    "admission_queue_size": ADMISSION_QUEUE_SIZE,
+    "admission_caller_queue_size": ADMISSION_CALLER_QUEUE_SIZE,
+    "admission_max_wait": ADMISSION_MAX_WAIT,
+    "admission_caller_weights": ADMISSION_CALLER_WEIGHTS,
+    "schema_cache_max_entries": SCHEMA_CACHE_MAX_ENTRIES,
+    "schema_cache_ttl": SCHEMA_CACHE_TTL,
+    "schema_cache_stale_ttl": SCHEMA_CACHE_STALE_TTL,
+    "profile_sample_rows": PROFILE_SAMPLE_ROWS,
+    "profile_top_k": PROFILE_TOP_K,
+    "query_cache_max_entries": QUERY_CACHE_MAX_ENTRIES,
+    "query_cache_max_bytes": QUERY_CACHE_MAX_BYTES,
+    "query_cache_ttl": QUERY_CACHE_TTL,
+    "query_cache_dataset_ttls": QUERY_CACHE_DATASET_TTLS,
+    "mongo_max_pool_size": MONGO_MAX_POOL_SIZE,
+    "mongo_min_pool_size": MONGO_MIN_POOL_SIZE,
+    "mongo_server_selection_timeout_ms": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    "mongo_socket_timeout_ms": MONGO_SOCKET_TIMEOUT_MS,
+    "mongo_health_cache_seconds": MONGO_HEALTH_CACHE_SECONDS,
+    "backend": DATAGROOM_BACKEND,
+    "backend_datasets": DATAGROOM_BACKEND_DATASETS,
+    "response_max_bytes": RESPONSE_MAX_BYTES,
+    "response_max_cell_chars": RESPONSE_MAX_CELL_CHARS,
+    "aggregate_page_size": AGGREGATE_PAGE_SIZE,
+    "aggregate_concurrency": AGGREGATE_CONCURRENCY,
+    "aggregate_max_rows": AGGREGATE_MAX_ROWS,
+    "aggregate_partial_cache_max_entries": AGGREGATE_PARTIAL_CACHE_MAX_ENTRIES,
+    "aggregate_partial_cache_max_bytes": AGGREGATE_PARTIAL_CACHE_MAX_BYTES,
+    "export_dir": EXPORT_DIR,
+    "export_page_size": EXPORT_PAGE_SIZE,
+    "export_concurrency": EXPORT_CONCURRENCY,
+    "sample_page_size": SAMPLE_PAGE_SIZE,
+    "sample_max_pages": SAMPLE_MAX_PAGES,
+    "sample_concurrency": SAMPLE_CONCURRENCY,
+    "list_datasets_count_concurrency": LIST_DATASETS_COUNT_CONCURRENCY,
+    "list_datasets_count_timeout": LIST_DATASETS_COUNT_TIMEOUT,
+    "list_datasets_count_ttl": LIST_DATASETS_COUNT_TTL,
+    "batch_max_operations": BATCH_MAX_OPERATIONS,
+    "batch_concurrency": BATCH_CONCURRENCY,
+    "snapshot_datasets": SNAPSHOT_DATASETS,
+    "snapshot_dir": SNAPSHOT_DIR,
+    "snapshot_ttl": SNAPSHOT_TTL,
+    "snapshot_page_size": SNAPSHOT_PAGE_SIZE,
+    "snapshot_concurrency": SNAPSHOT_CONCURRENCY,
+    "debug_timings": DEBUG_TIMINGS,
+    "admin_token": ADMIN_TOKEN,
+    "profile_max_seconds": PROFILE_MAX_SECONDS,
+    "prewarm": PREWARM,
+    "prewarm_datasets": PREWARM_DATASETS,
 }
 
 if not config["pat_token"]:
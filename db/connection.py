@@ -1,44 +1,77 @@
 """
 MongoDB connection management (matches TS db/connection.ts).
-Optional: server can run without MongoDB; tools use Gateway.
-Uses sync pymongo to match TS mongodb driver behavior.
+Optional: server can run without MongoDB; tools use Gateway unless a dataset is
+configured for the direct Mongo backend (see utils/backend.py).
+Uses pymongo's native asyncio client so Mongo calls never block the event loop;
+connect/close are driven by the app lifespan in main._create_app.
 """
 
+import asyncio
 import logging
+import time
 from typing import Any
 
+from config import config
+from utils.error_handlers import DatabaseConnectionError
+
 logger = logging.getLogger(__name__)
 
 _client: Any = None
+_connect_lock: asyncio.Lock | None = None
+_health: tuple[float, bool] | None = None  # (checked_at, healthy)
 
 
-def connect_to_mongo(url: str):  # -> MongoClient
-    """Connect to MongoDB with connection pooling (sync)."""
-    global _client
+def _build_client(url: str) -> Any:
     try:
-        from pymongo import MongoClient
+        from pymongo import AsyncMongoClient
     except ImportError:
-        raise RuntimeError("pymongo is not installed; pip install pymongo")
-    if _client is not None:
-        try:
-            _client.admin.command("ping")
-            return _client
-        except Exception:
-            _client = None
-    _client = MongoClient(
+        raise RuntimeError("pymongo>=4.13 is not installed; pip install 'pymongo>=4.13'")
+    return AsyncMongoClient(
         url,
-        maxPoolSize=60,
-        minPoolSize=3,
-        serverSelectionTimeoutMS=10000,
-        socketTimeoutMS=45000,
+        maxPoolSize=config["mongo_max_pool_size"],
+        minPoolSize=config["mongo_min_pool_size"],
+        serverSelectionTimeoutMS=config["mongo_server_selection_timeout_ms"],
+        socketTimeoutMS=config["mongo_socket_timeout_ms"],
     )
-    try:
-        _client.admin.command("ping")
+
+
+async def connect_to_mongo(url: str):  # -> AsyncMongoClient
+    """Connect to MongoDB with connection pooling."""
+    global _client, _connect_lock, _health
+    if _connect_lock is None:
+        _connect_lock = asyncio.Lock()
+    async with _connect_lock:
+        if _client is not None:
+            if await is_connected():
+                return _client
+            await close_mongo()
+        client = _build_client(url)
+        try:
+            await client.admin.command("ping")
+        except Exception as e:
+            await client.close()
+            raise RuntimeError(str(e)) from e
+        _client = client
+        _health = (time.monotonic(), True)
         logger.info("Connected to MongoDB successfully")
         return _client
-    except Exception as e:
-        _client = None
-        raise RuntimeError(str(e)) from e
+
+
+async def get_client() -> Any:
+    """Return the connected client, connecting on first use."""
+    if _client is not None:
+        return _client
+    try:
+        return await connect_to_mongo(config["mongo_url"])
+    except RuntimeError as e:
+        raise DatabaseConnectionError(str(e)) from e
+
+
+def set_client(client: Any) -> None:
+    """Install an already-built async client (e.g. an in-process stand-in for a local mongod)."""
+    global _client, _health
+    _client = client
+    _health = None
 
 
 def get_database(client: Any, db_name: str):
@@ -46,21 +79,28 @@ def get_database(client: Any, db_name: str):
     return client[db_name]
 
 
-def close_mongo() -> None:
+async def close_mongo() -> None:
     """Close MongoDB connection."""
-    global _client
+    global _client, _health
     if _client is not None:
-        _client.close()
-        _client = None
+        client, _client = _client, None
+        _health = None
+        await client.close()
         logger.info("MongoDB connection closed")
 
 
-def is_connected() -> bool:
-    """Check if MongoDB connection is active."""
+async def is_connected() -> bool:
+    """Check if MongoDB connection is active (ping result cached for a short interval)."""
+    global _health
     if _client is None:
         return False
+    now = time.monotonic()
+    if _health is not None and now - _health[0] < config["mongo_health_cache_seconds"]:
+        return _health[1]
     try:
-        _client.admin.command("ping")
-        return True
+        await _client.admin.command("ping")
+        healthy = True
     except Exception:
-        return False
+        healthy = False
+    _health = (now, healthy)
+    return healthy
@@ -0,0 +1,295 @@
+"""
+Direct MongoDB execution for datasets on the "mongo" backend (matches TS db/queries.ts helpers).
+Each Datagroom dataset is a database whose rows live in the "data" collection.
+Filters, sort, skip/limit, projections and $group are pushed down to MongoDB, and results are
+shaped like Gateway viewViaPost responses ({"total": ..., "data": [...]}) so tools render them
+the same way.
+All calls use the async pymongo client, so they run concurrently with Gateway calls.
+"""
+
+import asyncio
+import datetime
+from typing import Any, AsyncIterator
+
+from db.connection import get_client, get_database
+from schemas import AggregationOperation, Filter
+from utils.cursor import keyset_sorters, tag_value, untag_value
+from utils.error_handlers import DatasetNotFoundError
+from utils.filter_compiler import field_value
+from utils.filter_converter import convert_filters_to_mongo
+from utils.projection import mongo_projection
+from utils.timing import phase
+
+DATA_COLLECTION = "data"
+
+_known_datasets: set[str] = set()
+
+
+async def dataset_exists(db: Any) -> bool:
+    """Check if a dataset exists (has a 'data' collection)."""
+    return DATA_COLLECTION in await db.list_collection_names()
+
+
+async def validate_dataset_exists(db: Any, dataset_name: str) -> None:
+    """Validate that a dataset exists, raise DatasetNotFoundError if not."""
+    if not await dataset_exists(db):
+        raise DatasetNotFoundError(dataset_name)
+
+
+async def paged_find(
+    collection: Any,
+    query: dict,
+    limit: int | None = None,
+    skip: int | None = None,
+    sort: list[tuple[str, int]] | None = None,
+    projection: dict | None = None,
+) -> list[dict]:
+    """Get paged results from a collection (similar to pagedFind in dbAbstraction)."""
+    cursor = collection.find(query, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if skip:
+        cursor = cursor.skip(skip)
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(None)
+
+
+async def get_count(collection: Any, query: dict) -> int:
+    """Get total count of documents matching a query."""
+    return await collection.count_documents(query)
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert BSON values (ObjectId, datetime, ...) into JSON-friendly Python values."""
+    if isinstance(value, dict):
+        return {k: to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def build_mongo_query(filters: list[dict] | None) -> dict:
+    """Mongo query for a list of filter dicts."""
+    with phase("filters"):
+        return convert_filters_to_mongo([Filter(**f) for f in filters or []])
+
+
+def build_mongo_sort(sorters: list[dict] | None) -> list[tuple[str, int]]:
+    """Mongo sort spec for a list of {field, direction} sorters."""
+    return [
+        (s["field"], -1 if s.get("direction") == "desc" else 1)
+        for s in sorters or []
+        if s.get("field")
+    ]
+
+
+_GROUP_ACCUMULATORS = {"sum": "$sum", "avg": "$avg", "min": "$min", "max": "$max"}
+
+
+def build_group_pipeline(
+    query: dict,
+    operations: list[AggregationOperation],
+    group_by: str | None,
+) -> list[dict]:
+    """$match/$group pipeline computing the requested aggregations per group."""
+    group: dict[str, Any] = {"_id": f"${group_by}" if group_by else None}
+    for op in operations:
+        if op.operation == "count":
+            group["count"] = {"$sum": 1}
+        else:
+            group[op.operation] = {_GROUP_ACCUMULATORS[op.operation]: f"${op.field}"}
+    pipeline: list[dict] = [{"$match": query}, {"$group": group}]
+    if group_by:
+        pipeline.append({"$sort": {"count": -1, "_id": 1} if "count" in group else {"_id": 1}})
+    return pipeline
+
+
+async def _data_collection(dataset_name: str) -> Any:
+    db = get_database(await get_client(), dataset_name)
+    if dataset_name not in _known_datasets:
+        await validate_dataset_exists(db, dataset_name)
+        _known_datasets.add(dataset_name)
+    return db[DATA_COLLECTION]
+
+
+async def mongo_view(
+    dataset_name: str,
+    filters: list[dict] | None = None,
+    sorters: list[dict] | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """Filtered, sorted rows [skip, skip+limit) plus the total match count."""
+    collection = await _data_collection(dataset_name)
+    query = build_mongo_query(filters)
+    docs, total = await asyncio.gather(
+        paged_find(
+            collection,
+            query,
+            limit=limit,
+            skip=skip,
+            sort=build_mongo_sort(sorters),
+            projection=mongo_projection(fields),
+        ),
+        get_count(collection, query),
+    )
+    return {"total": total, "data": to_jsonable(docs), "last_key": _raw_last_key(docs, sorters)}
+
+
+def _raw_last_key(docs: list[dict], sorters: list[dict] | None) -> list | None:
+    """Tagged (sort value, _id) of the last raw document, keeping BSON types for cursors."""
+    if not docs or "_id" not in docs[-1]:
+        return None
+    field = sorters[0]["field"] if sorters else None
+    value = field_value(docs[-1], field) if field else None
+    return [tag_value(value), tag_value(docs[-1]["_id"])]
+
+
+def coerce_id(value: Any) -> Any:
+    """Row _id as stored in MongoDB (24-hex strings become ObjectIds)."""
+    value = untag_value(value)
+    if isinstance(value, str):
+        from bson import ObjectId
+
+        if ObjectId.is_valid(value):
+            return ObjectId(value)
+    return value
+
+
+def _keyset_after(field: str, value: Any, last_id: Any, desc: bool) -> dict:
+    """
+    Rows ordered after (value, last_id) by field, then _id. Null and missing values sort first
+    (last when descending) and $gt/$lt never match them, so they form a bracket of their own;
+    {field: None} matches both.
+    """
+    op = "$lt" if desc else "$gt"
+    tie = {field: value, "_id": {op: last_id}}
+    if value is None:
+        # Ascending, every non-null value follows the null bracket; descending, none does
+        return tie if desc else {"$or": [{field: {"$ne": None}}, tie]}
+    after = [{field: {op: value}}, tie]
+    if desc:
+        after.append({field: None})
+    return {"$or": after}
+
+
+async def mongo_view_after(
+    dataset_name: str,
+    filters: list[dict] | None,
+    sort: dict | None,
+    last_value: Any,
+    last_id: Any,
+    limit: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Keyset page: rows after (last_value, last_id) as one indexed range query, at any depth.
+    One extra row is read to tell whether more follow ({"has_more": ..., "data": [...]}); the
+    remaining rows are not counted, so every page costs the same.
+    """
+    collection = await _data_collection(dataset_name)
+    desc = bool(sort) and sort.get("direction") == "desc"
+    last_id = coerce_id(last_id)
+    if sort:
+        after = _keyset_after(sort["field"], untag_value(last_value), last_id, desc)
+    else:
+        after = {"_id": {"$lt" if desc else "$gt": last_id}}
+    base = build_mongo_query(filters)
+    query = {"$and": [base, after]} if base else after
+    sorters = keyset_sorters(sort)
+    docs = await paged_find(
+        collection,
+        query,
+        limit=limit + 1,
+        sort=build_mongo_sort(sorters),
+        projection=mongo_projection(fields),
+    )
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    return {
+        "has_more": has_more,
+        "data": to_jsonable(docs),
+        "last_key": _raw_last_key(docs, sorters),
+    }
+
+
+async def mongo_count(dataset_name: str, filters: list[dict] | None = None) -> int:
+    """Number of rows matching the filters."""
+    collection = await _data_collection(dataset_name)
+    return await get_count(collection, build_mongo_query(filters))
+
+
+async def mongo_estimated_count(dataset_name: str) -> int:
+    """Approximate row count from collection metadata (no scan)."""
+    collection = await _data_collection(dataset_name)
+    return await collection.estimated_document_count()
+
+
+async def mongo_aggregate(
+    dataset_name: str,
+    operations: list[AggregationOperation],
+    filters: list[dict] | None = None,
+    group_by: str | None = None,
+) -> list[dict[str, Any]]:
+    """Aggregation result rows computed server-side with $match/$group."""
+    collection = await _data_collection(dataset_name)
+    pipeline = build_group_pipeline(build_mongo_query(filters), operations, group_by)
+    results = []
+    cursor = await collection.aggregate(pipeline, allowDiskUse=True)
+    async for doc in cursor:
+        row = {"group_value": to_jsonable(doc.pop("_id"))} if group_by else {}
+        doc.pop("_id", None)
+        row.update(to_jsonable(doc))
+        results.append(row)
+    return results
+
+
+async def mongo_sample(
+    dataset_name: str,
+    size: int,
+    filters: list[dict] | None = None,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """Random rows via $sample plus the total match count."""
+    collection = await _data_collection(dataset_name)
+    query = build_mongo_query(filters)
+    pipeline = [{"$match": query}, {"$sample": {"size": size}}]
+    projection = mongo_projection(fields)
+    if projection:
+        pipeline.append({"$project": projection})
+
+    async def _sampled() -> list[dict]:
+        cursor = await collection.aggregate(pipeline)
+        return await cursor.to_list(None)
+
+    docs, total = await asyncio.gather(_sampled(), get_count(collection, query))
+    return {"total": total, "data": to_jsonable(docs)}
+
+
+async def iter_mongo_batches(
+    dataset_name: str,
+    filters: list[dict] | None = None,
+    sorters: list[dict] | None = None,
+    batch_size: int = 1000,
+    fields: list[str] | None = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Stream every matching row in batches from one server-side cursor."""
+    collection = await _data_collection(dataset_name)
+    cursor = collection.find(build_mongo_query(filters), mongo_projection(fields))
+    sort = build_mongo_sort(sorters)
+    if sort:
+        cursor = cursor.sort(sort)
+    batch: list[dict] = []
+    async for doc in cursor.batch_size(batch_size):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            yield to_jsonable(batch)
+            batch = []
+    if batch:
+        yield to_jsonable(batch)
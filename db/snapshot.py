@@ -0,0 +1,688 @@
+"""
+Opt-in local snapshots of whole datasets (SNAPSHOT_DATASETS) for repeated analytical queries.
+Each snapshot is an SQLite file under SNAPSHOT_DIR holding one JSON document per row; filters,
+sort, paging and counts run inside SQLite via its JSON1 functions, so no Gateway call is made.
+A snapshot younger than SNAPSHOT_TTL is fresh. A stale one is caught up in the background from
+the dataset's editlog collection (only the edited rows are re-read from MongoDB) and keeps serving
+meanwhile; it is reloaded in full, also in the background, only when it has no editlog mark or
+too many edits are pending.
+"""
+
+import asyncio
+import datetime
+import functools
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable
+
+from config import config
+from db.connection import get_client, get_database
+from db.queries import DATA_COLLECTION, coerce_id, iter_mongo_batches, to_jsonable
+from schemas import AggregationOperation, Filter
+from utils.aggregation import StreamingAggregator
+from utils.backend import get_backend
+from utils.cursor import keyset_sorters, tag_value, untag_value
+from utils.error_handlers import format_error
+from utils.gateway_views import iter_view_pages
+from utils.json_codec import loads
+
+logger = logging.getLogger(__name__)
+
+EDITLOG_COLLECTION = "editlog"
+# Beyond this many pending edits a full reload is cheaper than replaying them
+EDITLOG_MAX_ENTRIES = 10_000
+_FETCH_BATCH = 5000
+
+# _id has no declared type, so ids keep their JSON type (numbers sort before text, as in
+# MongoDB) and order like the Gateway and Mongo paths; bump the version when the layout changes
+SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (_id PRIMARY KEY, doc TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class _FullReloadNeeded(Exception):
+    """The editlog cannot bring a snapshot up to date; it has to be reloaded."""
+
+
+class Snapshot:
+    """Snapshot file of one dataset and its refresh state."""
+
+    def __init__(self, dataset_name: str, path: Path):
+        self.dataset_name = dataset_name
+        self.path = path
+        self.refreshed_at: float | None = None  # wall clock, persisted in the file
+        self.editlog_mark: Any = None  # tagged _id of the last applied editlog entry
+        self.row_count = 0
+        self.indexed: set[str] = set()
+        self.lock = asyncio.Lock()
+        self.refresh_task: asyncio.Task | None = None
+        self.catching_up = False  # refresh_task is replaying the editlog (stale copy served)
+        self.failed_at: float | None = None
+
+    def is_fresh(self) -> bool:
+        return (
+            self.refreshed_at is not None
+            and time.time() - self.refreshed_at < config["snapshot_ttl"]
+        )
+
+
+_snapshots: dict[str, Snapshot] = {}
+
+
+def snapshot_enabled(dataset_name: str) -> bool:
+    """Whether the dataset is configured for a local snapshot."""
+    return dataset_name in config["snapshot_datasets"]
+
+
+def _snapshot_path(dataset_name: str) -> Path:
+    safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", dataset_name)
+    digest = hashlib.sha1(dataset_name.encode("utf-8")).hexdigest()[:8]
+    return Path(config["snapshot_dir"]) / f"{safe_name}-{digest}.sqlite"
+
+
+# --- SQLite access ---------------------------------------------------------------
+
+
+@functools.lru_cache(maxsize=256)
+def _compiled_regex(pattern: str) -> re.Pattern:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+def _regexp(pattern: str, value: Any) -> bool:
+    return value is not None and _compiled_regex(pattern).search(str(value)) is not None
+
+
+def _connect(path: Path, readonly: bool = True) -> sqlite3.Connection:
+    if readonly:
+        conn = sqlite3.connect(
+            f"{path.resolve().as_uri()}?mode=ro", uri=True, timeout=30, check_same_thread=False
+        )
+    else:
+        conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.create_function("regexp", 2, _regexp, deterministic=True)
+    return conn
+
+
+async def _read(snapshot: Snapshot, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+    """Run fn on a read-only connection in a worker thread."""
+
+    def _run() -> Any:
+        conn = _connect(snapshot.path)
+        try:
+            return fn(conn)
+        finally:
+            conn.close()
+
+    return await asyncio.to_thread(_run)
+
+
+def _row_records(rows: list[dict[str, Any]]) -> list[tuple[Any, str]]:
+    return [
+        (
+            _sql_value(row.get("_id")),
+            json.dumps(row, separators=(",", ":"), ensure_ascii=False, default=str),
+        )
+        for row in rows
+    ]
+
+
+def _write_meta(conn: sqlite3.Connection, editlog_mark: Any, refreshed_at: float) -> int:
+    row_count = conn.execute("SELECT COUNT(*) FROM rows").fetchone()[0]
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        [
+            ("refreshed_at", repr(refreshed_at)),
+            ("editlog_mark", json.dumps(editlog_mark)),
+            ("row_count", str(row_count)),
+            ("schema_version", str(SCHEMA_VERSION)),
+        ],
+    )
+    return row_count
+
+
+def _load_meta(snapshot: Snapshot) -> None:
+    """Restore refresh state from a snapshot file left by a previous run."""
+    if not snapshot.path.exists():
+        return
+    try:
+        conn = _connect(snapshot.path)
+        try:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        finally:
+            conn.close()
+        if meta.get("schema_version") != str(SCHEMA_VERSION):
+            logger.info("Snapshot %s has an older layout; it will be reloaded", snapshot.path)
+            return
+        snapshot.refreshed_at = float(meta["refreshed_at"])
+        snapshot.editlog_mark = json.loads(meta.get("editlog_mark") or "null")
+        snapshot.row_count = int(meta.get("row_count") or 0)
+    except (sqlite3.Error, KeyError, ValueError) as e:
+        logger.warning("Ignoring unreadable snapshot %s: %s", snapshot.path, e)
+
+
+# --- Filters, sort and keyset conditions as SQL ---------------------------------
+
+
+def _json_path(field: str) -> str:
+    """SQL string literal for a JSON path; dotted fields address nested values like MongoDB."""
+    path = "$" + "".join(f'."{part}"' for part in field.split("."))
+    return "'" + path.replace("'", "''") + "'"
+
+
+def _sql_value(value: Any) -> Any:
+    """Bind value comparable with json_extract() output (as the row was stored)."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def _json_types(value: Any) -> str:
+    if isinstance(value, bool):
+        return "('true', 'false')"
+    if isinstance(value, (int, float)):
+        return "('integer', 'real')"
+    return "('text')"
+
+
+def _any_element(path: str, predicate: str) -> str:
+    """The field, or any element of an array field, satisfies the predicate (MongoDB semantics)."""
+    return f"EXISTS (SELECT 1 FROM json_each(rows.doc, {path}) AS j WHERE {predicate})"
+
+
+def _equals(path: str, value: Any, params: list) -> str:
+    if value is None:
+        return f"json_extract(rows.doc, {path}) IS NULL"
+    if isinstance(value, (dict, list)):
+        params.append(_sql_value(value))
+        return f"json_extract(rows.doc, {path}) = json(?)"
+    params.append(_sql_value(value))
+    return _any_element(path, f"j.type IN {_json_types(value)} AND j.value = ?")
+
+
+_COMPARATORS = {"gt": ">", "lt": "<", "gte": ">=", "lte": "<="}
+
+
+def _condition(f: Filter, params: list) -> str:
+    path = _json_path(f.field)
+    if f.type in ("eq", "ne"):
+        clause = _equals(path, f.value, params)
+        return clause if f.type == "eq" else f"NOT ({clause})"
+    if f.type in ("in", "nin"):
+        values = f.value if isinstance(f.value, list) else [f.value]
+        clause = " OR ".join(_equals(path, v, params) for v in values) or "0"
+        return f"({clause})" if f.type == "in" else f"NOT ({clause})"
+    if f.type == "regex":
+        try:
+            _compiled_regex(str(f.value))
+        except re.error as e:
+            raise ValueError(f"Invalid regex for field '{f.field}': {e}") from e
+        params.append(str(f.value))
+        return _any_element(path, "j.type = 'text' AND regexp(?, j.value)")
+    if f.value is None:
+        # gte/lte null match null or missing fields; gt/lt null match nothing
+        return f"json_extract(rows.doc, {path}) IS NULL" if f.type in ("gte", "lte") else "0"
+    if isinstance(f.value, (dict, list)):
+        raise ValueError(f"'{f.type}' filter on '{f.field}' needs a scalar value")
+    params.append(_sql_value(f.value))
+    comparator = _COMPARATORS[f.type]
+    return _any_element(path, f"j.type IN {_json_types(f.value)} AND j.value {comparator} ?")
+
+
+def build_snapshot_where(filters: list[dict] | None) -> tuple[str, list]:
+    """SQL WHERE clause and parameters for a list of filter dicts."""
+    params: list = []
+    clauses = [_condition(Filter(**f), params) for f in filters or []]
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def _sort_key(field: str) -> str:
+    # Unqualified columns so the expression matches the index built by _ensure_sort_index
+    return "_id" if field == "_id" else f"json_extract(doc, {_json_path(field)})"
+
+
+def _order_by(sorters: list[dict] | None) -> str:
+    terms = [
+        f"{_sort_key(s['field'])} {'DESC' if s.get('direction') == 'desc' else 'ASC'}"
+        for s in sorters or []
+        if s.get("field")
+    ]
+    return " ORDER BY " + ", ".join(terms) if terms else ""
+
+
+def _after_clause(sort: dict | None, last_value: Any, last_id: Any, params: list) -> str:
+    """Rows strictly after (last_value, last_id) in keyset order (nulls sort first)."""
+    desc = bool(sort) and sort.get("direction") == "desc"
+    op = "<" if desc else ">"
+    last_id = _sql_value(last_id)
+    if not sort or sort.get("field") == "_id":
+        params.append(last_id)
+        return f"_id {op} ?"
+    key = _sort_key(sort["field"])
+    if last_value is None:
+        params.append(last_id)
+        if desc:
+            return f"({key} IS NULL AND _id < ?)"
+        return f"({key} IS NOT NULL OR _id > ?)"
+    last_value = _sql_value(last_value)
+    params.extend([last_value, last_value, last_id])
+    if desc:
+        return f"({key} < ? OR {key} IS NULL OR ({key} = ? AND _id < ?))"
+    return f"({key} > ? OR ({key} = ? AND _id > ?))"
+
+
+def _count(conn: sqlite3.Connection, where: str, params: list) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM rows{where}", params).fetchone()[0]
+
+
+def _select_docs(conn: sqlite3.Connection, sql: str, params: list) -> list[dict[str, Any]]:
+    return [loads(doc) for (doc,) in conn.execute(sql, params)]
+
+
+async def _ensure_sort_index(snapshot: Snapshot, sorters: list[dict] | None) -> None:
+    """Index sort fields on first use so ORDER BY ... LIMIT does not sort the whole table."""
+    fields = [
+        s["field"]
+        for s in sorters or []
+        if s.get("field") and s["field"] != "_id" and s["field"] not in snapshot.indexed
+    ]
+    if not fields:
+        return
+
+    def _create(path: Path) -> None:
+        conn = _connect(path, readonly=False)
+        try:
+            for field in fields:
+                name = "ix_" + hashlib.sha1(field.encode("utf-8")).hexdigest()[:12]
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {name} ON rows ({_sort_key(field)}, _id)"
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    async with snapshot.lock:
+        try:
+            await asyncio.to_thread(_create, snapshot.path)
+        except sqlite3.Error as e:
+            logger.warning("Could not index snapshot %s: %s", snapshot.dataset_name, e)
+        snapshot.indexed.update(fields)
+
+
+# --- Queries (same response shapes as db/queries.py) -----------------------------
+
+
+async def snapshot_view(
+    snapshot: Snapshot,
+    filters: list[dict] | None = None,
+    sorters: list[dict] | None = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> dict[str, Any]:
+    """Filtered, sorted rows [skip, skip+limit) plus the total match count."""
+    where, params = build_snapshot_where(filters)
+    sql = f"SELECT doc FROM rows{where}{_order_by(sorters)} LIMIT ? OFFSET ?"
+    await _ensure_sort_index(snapshot, sorters)
+    total, data = await _read(
+        snapshot,
+        lambda conn: (_count(conn, where, params), _select_docs(conn, sql, [*params, limit, skip])),
+    )
+    return {"total": total, "data": data}
+
+
+async def snapshot_view_after(
+    snapshot: Snapshot,
+    filters: list[dict] | None,
+    sort: dict | None,
+    last_value: Any,
+    last_id: Any,
+    limit: int,
+) -> dict[str, Any]:
+    """Keyset page: rows after (last_value, last_id); total counts the rows remaining."""
+    where, params = build_snapshot_where(filters)
+    after = _after_clause(sort, last_value, last_id, params)
+    where = f"{where} AND {after}" if where else f" WHERE {after}"
+    sorters = keyset_sorters(sort)
+    sql = f"SELECT doc FROM rows{where}{_order_by(sorters)} LIMIT ?"
+    await _ensure_sort_index(snapshot, sorters)
+    total, data = await _read(
+        snapshot,
+        lambda conn: (_count(conn, where, params), _select_docs(conn, sql, [*params, limit])),
+    )
+    return {"total": total, "data": data}
+
+
+async def snapshot_count(snapshot: Snapshot, filters: list[dict] | None = None) -> int:
+    """Number of rows matching the filters."""
+    where, params = build_snapshot_where(filters)
+    return await _read(snapshot, lambda conn: _count(conn, where, params))
+
+
+async def snapshot_aggregate(
+    snapshot: Snapshot,
+    operations: list[AggregationOperation],
+    filters: list[dict] | None = None,
+    group_by: str | None = None,
+) -> StreamingAggregator:
+    """
+    Aggregate matching rows with the same engine as the Gateway path (identical results).
+    SQLite filters the rows and extracts only the referenced fields.
+    """
+    where, params = build_snapshot_where(filters)
+    fields = sorted({op.field for op in operations if op.field} | {group_by} - {None})
+    columns = ", ".join(f"rows.doc -> {_json_path(field)}" for field in fields) or "1"
+
+    def _aggregate(conn: sqlite3.Connection) -> StreamingAggregator:
+        aggregator = StreamingAggregator(operations, group_by)
+        cursor = conn.execute(f"SELECT {columns} FROM rows{where}", params)
+        while batch := cursor.fetchmany(_FETCH_BATCH):
+            aggregator.add_rows(
+                [
+                    {f: loads(v) for f, v in zip(fields, record) if v is not None}
+                    for record in batch
+                ]
+            )
+        return aggregator
+
+    return await _read(snapshot, _aggregate)
+
+
+async def snapshot_sample(
+    snapshot: Snapshot,
+    size: int,
+    filters: list[dict] | None = None,
+) -> dict[str, Any]:
+    """Uniformly random rows plus the total match count."""
+    where, params = build_snapshot_where(filters)
+    sql = f"SELECT doc FROM rows{where} ORDER BY random() LIMIT ?"
+    total, data = await _read(
+        snapshot,
+        lambda conn: (_count(conn, where, params), _select_docs(conn, sql, [*params, size])),
+    )
+    return {"total": total, "data": data}
+
+
+# --- Refresh ----------------------------------------------------------------------
+
+
+def _edited_row_id(entry: dict[str, Any]) -> Any:
+    """
+    _id of the row an editlog entry touched (Datagroom records it in the entry's selector), as
+    stored in the rows table.
+    """
+    for key in ("selector", "doc"):
+        ref = entry.get(key)
+        if isinstance(ref, str):
+            try:
+                ref = json.loads(ref)
+            except ValueError:
+                continue
+        if isinstance(ref, dict) and ref.get("_id") is not None:
+            return _sql_value(to_jsonable(ref["_id"]))
+    return None
+
+
+def _apply_edits(
+    path: Path,
+    row_ids: set[Any],
+    docs: list[dict[str, Any]],
+    editlog_mark: Any,
+    refreshed_at: float,
+) -> int:
+    """Replace edited rows (rows no longer in MongoDB are deleted) in one transaction."""
+    conn = _connect(path, readonly=False)
+    try:
+        with conn:
+            conn.executemany("DELETE FROM rows WHERE _id = ?", [(row_id,) for row_id in row_ids])
+            conn.executemany(
+                "INSERT OR REPLACE INTO rows (_id, doc) VALUES (?, ?)", _row_records(docs)
+            )
+            return _write_meta(conn, editlog_mark, refreshed_at)
+    finally:
+        conn.close()
+
+
+async def _catch_up(snapshot: Snapshot) -> None:
+    """Apply editlog entries recorded after the snapshot's mark."""
+    async with snapshot.lock:
+        if snapshot.is_fresh():
+            return
+        started = time.time()
+        db = get_database(await get_client(), snapshot.dataset_name)
+        entries = (
+            await db[EDITLOG_COLLECTION]
+            .find({"_id": {"$gt": untag_value(snapshot.editlog_mark)}})
+            .sort("_id", 1)
+            .limit(EDITLOG_MAX_ENTRIES + 1)
+            .to_list(None)
+        )
+        if len(entries) > EDITLOG_MAX_ENTRIES:
+            raise _FullReloadNeeded(f"more than {EDITLOG_MAX_ENTRIES:,} edits pending")
+        row_ids: set[Any] = set()
+        for entry in entries:
+            row_id = _edited_row_id(entry)
+            if row_id is None:
+                raise _FullReloadNeeded("editlog entry does not identify a row")
+            row_ids.add(row_id)
+        docs: list[dict] = []
+        if row_ids:
+            docs = await (
+                db[DATA_COLLECTION]
+                .find({"_id": {"$in": [coerce_id(row_id) for row_id in row_ids]}})
+                .to_list(None)
+            )
+        mark = tag_value(entries[-1]["_id"]) if entries else snapshot.editlog_mark
+        snapshot.row_count = await asyncio.to_thread(
+            _apply_edits, snapshot.path, row_ids, to_jsonable(docs), mark, started
+        )
+        snapshot.editlog_mark = mark
+        snapshot.refreshed_at = started
+        if entries:
+            logger.info(
+                "Snapshot %s: applied %d edits (%d rows)",
+                snapshot.dataset_name,
+                len(entries),
+                len(row_ids),
+            )
+
+
+async def _editlog_head(dataset_name: str) -> Any:
+    """Tagged _id of the newest editlog entry, or None when MongoDB is unavailable."""
+    try:
+        db = get_database(await get_client(), dataset_name)
+        latest = (
+            await db[EDITLOG_COLLECTION].find({}, {"_id": 1}).sort("_id", -1).limit(1).to_list(None)
+        )
+    except Exception as e:
+        logger.info(
+            "Snapshot %s: editlog unavailable (%s); stale snapshots will be reloaded in full",
+            dataset_name,
+            format_error(e),
+        )
+        return None
+    if latest:
+        return tag_value(latest[0]["_id"])
+    from bson import ObjectId
+
+    return tag_value(ObjectId("0" * 24))
+
+
+async def _iter_source_rows(dataset_name: str) -> AsyncIterator[list[dict[str, Any]]]:
+    if get_backend(dataset_name) == "mongo":
+        async for batch in iter_mongo_batches(
+            dataset_name, batch_size=config["snapshot_page_size"]
+        ):
+            yield batch
+        return
+    # Offset pages are only disjoint under a total order; _id gives one
+    expected = None
+    loaded = 0
+    async for page in iter_view_pages(
+        dataset_name,
+        sorters=keyset_sorters(None),
+        per_page=config["snapshot_page_size"],
+        concurrency=config["snapshot_concurrency"],
+    ):
+        if expected is None:
+            expected = page.get("total") or 0
+        rows = page.get("data") or []
+        loaded += len(rows)
+        yield rows
+    if loaded != expected:
+        raise RuntimeError(
+            f"read {loaded:,} rows but the Gateway reported {expected:,} "
+            "(the dataset changed during the load)"
+        )
+
+
+def _create_file(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    conn = _connect(path, readonly=False)
+    # Scratch file until it is renamed into place: no journal needed
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _insert_rows(conn: sqlite3.Connection, rows: list[dict[str, Any]]) -> None:
+    conn.executemany("INSERT OR REPLACE INTO rows (_id, doc) VALUES (?, ?)", _row_records(rows))
+
+
+def _finish_file(conn: sqlite3.Connection, editlog_mark: Any, refreshed_at: float) -> int:
+    try:
+        row_count = _write_meta(conn, editlog_mark, refreshed_at)
+        conn.commit()
+        return row_count
+    finally:
+        conn.close()
+
+
+async def _reload(snapshot: Snapshot) -> None:
+    """Load the whole dataset into a new file and swap it in."""
+    started = time.time()
+    # Mark taken before reading rows: edits made during the load are replayed later
+    mark = await _editlog_head(snapshot.dataset_name)
+    building = snapshot.path.with_name(snapshot.path.name + ".building")
+    conn = await asyncio.to_thread(_create_file, building)
+    try:
+        async for rows in _iter_source_rows(snapshot.dataset_name):
+            await asyncio.to_thread(_insert_rows, conn, rows)
+        row_count = await asyncio.to_thread(_finish_file, conn, mark, started)
+    except BaseException:
+        conn.close()
+        building.unlink(missing_ok=True)
+        raise
+    async with snapshot.lock:
+        building.replace(snapshot.path)
+        snapshot.indexed.clear()
+        snapshot.editlog_mark = mark
+        snapshot.row_count = row_count
+        snapshot.refreshed_at = started
+        snapshot.failed_at = None
+    logger.info(
+        "Snapshot %s: loaded %d rows in %.1fs",
+        snapshot.dataset_name,
+        row_count,
+        time.time() - started,
+    )
+
+
+async def _refresh(snapshot: Snapshot, incremental: bool) -> None:
+    """Bring a stale snapshot up to date: replay the editlog, or reload it in full."""
+    if incremental:
+        try:
+            await _catch_up(snapshot)
+            return
+        except _FullReloadNeeded as e:
+            logger.info("Snapshot %s: %s; reloading", snapshot.dataset_name, e)
+        except Exception as e:
+            logger.warning(
+                "Snapshot %s: editlog catch-up failed (%s); reloading",
+                snapshot.dataset_name,
+                format_error(e),
+            )
+        finally:
+            snapshot.catching_up = False
+    await _reload(snapshot)
+
+
+async def _run_refresh(snapshot: Snapshot, incremental: bool) -> None:
+    try:
+        await _refresh(snapshot, incremental)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        snapshot.failed_at = time.time()
+        logger.warning("Snapshot %s: reload failed: %s", snapshot.dataset_name, format_error(e))
+
+
+def _start_refresh(snapshot: Snapshot) -> None:
+    if snapshot.refresh_task is not None and not snapshot.refresh_task.done():
+        return
+    if snapshot.failed_at is not None and time.time() - snapshot.failed_at < config["snapshot_ttl"]:
+        return
+    incremental = snapshot.refreshed_at is not None and snapshot.editlog_mark is not None
+    snapshot.catching_up = incremental
+    snapshot.refresh_task = asyncio.create_task(_run_refresh(snapshot, incremental))
+
+
+async def get_fresh_snapshot(dataset_name: str) -> Snapshot | None:
+    """
+    Snapshot to answer from, or None if the dataset is not snapshotted or no usable copy is
+    available yet (the caller then queries the backend). A stale snapshot is refreshed in the
+    background; it is still served while the editlog is replayed, so the caller does not wait
+    for that round trip, but not while it is reloaded in full. Never raises.
+    """
+    if not snapshot_enabled(dataset_name):
+        return None
+    snapshot = _snapshots.get(dataset_name)
+    if snapshot is None:
+        snapshot = Snapshot(dataset_name, _snapshot_path(dataset_name))
+        _load_meta(snapshot)
+        _snapshots[dataset_name] = snapshot
+    if snapshot.is_fresh():
+        return snapshot
+    _start_refresh(snapshot)
+    return snapshot if snapshot.catching_up else None
+
+
+async def close_snapshots() -> None:
+    """Cancel snapshot refreshes still running (app shutdown)."""
+    tasks = [
+        s.refresh_task
+        for s in _snapshots.values()
+        if s.refresh_task is not None and not s.refresh_task.done()
+    ]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def get_snapshot_stats() -> dict[str, dict[str, Any]]:
+    """Per-dataset snapshot state for /stats."""
+    now = time.time()
+    return {
+        name: {
+            "rows": s.row_count,
+            "age_seconds": round(now - s.refreshed_at, 1) if s.refreshed_at is not None else None,
+            "fresh": s.is_fresh(),
+            "incremental": s.editlog_mark is not None,
+            "catching_up": s.catching_up,
+            "reloading": (
+                s.refresh_task is not None and not s.refresh_task.done() and not s.catching_up
+            ),
+        }
+        for name, s in _snapshots.items()
+    }
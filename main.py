@@ -1,13 +1,29 @@
 """
 Main entry point for Datagroom MCP Server.
 Exposes health, /mcp/v1, optional MongoDB at startup, and MCP tool contracts.
+The FastMCP app (and with it fastmcp, starlette and uvicorn) is built on first use of main.app or
+main(), so importing this module stays cheap; bench/import_time.py checks the budget.
 """
 
+import asyncio
+import hmac
 import logging
 import sys
+import time
+from contextlib import asynccontextmanager
 
 from config import config
-from db.connection import close_mongo, connect_to_mongo
+from db.connection import close_mongo, connect_to_mongo, is_connected
+from db.snapshot import close_snapshots, get_snapshot_stats
+from utils.admission import get_admission_stats
+from utils.backend import mongo_backend_enabled
+from utils.cache import get_cache_stats
+from utils.gateway_client import close_gateway_client, get_pool_stats, open_gateway_client
+from utils.gateway_views import get_single_flight_stats, get_superset_stats
+from utils.metrics import create_tool_metrics_middleware, render_metrics
+from utils.resilience import get_resilience_stats
+from utils.stack_sampler import collapsed, sample_stacks
+from utils.timing import create_tool_timing_middleware
 
 # Configure structured logging before other imports that log
 logging.basicConfig(
@@ -19,6 +35,49 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+async def _connect_mongo() -> None:
+    try:
+        await connect_to_mongo(config["mongo_url"])
+    except Exception as e:
+        logger.warning(
+            "MongoDB not available (%s). Mongo-backed datasets will retry on first use.",
+            e,
+        )
+
+
+async def _prewarm() -> None:
+    """Open Gateway connections and fill the dataset-list and PREWARM_DATASETS schema caches."""
+    from tools.get_schema import datagroom_get_schema
+    from tools.list_datasets import datagroom_list_datasets
+
+    started = time.perf_counter()
+    names = ["dataset list", *config["prewarm_datasets"]]
+    results = await asyncio.gather(
+        datagroom_list_datasets(),
+        *(datagroom_get_schema(name) for name in config["prewarm_datasets"]),
+        return_exceptions=True,
+    )
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.warning("Pre-warming %s failed: %s", name, result)
+    logger.info(
+        "Pre-warmed %d of %d cache(s) in %.2fs",
+        sum(not isinstance(r, Exception) for r in results),
+        len(results),
+        time.perf_counter() - started,
+    )
+
+
+async def _warm_up() -> None:
+    """Startup work that must not hold up serving: MongoDB connect and optional pre-warming."""
+    work = []
+    if mongo_backend_enabled():
+        work.append(_connect_mongo())
+    if config["prewarm"]:
+        work.append(_prewarm())
+    await asyncio.gather(*work)
+
+
 def _create_app():
     from fastmcp import FastMCP
     from tools.get_schema import GET_SCHEMA_DESCRIPTION, datagroom_get_schema
@@ -26,12 +85,32 @@ def _create_app():
     from tools.aggregate_dataset import AGGREGATE_DATASET_DESCRIPTION, datagroom_aggregate_dataset
     from tools.list_datasets import LIST_DATASETS_DESCRIPTION, datagroom_list_datasets
     from tools.sample_dataset import SAMPLE_DATASET_DESCRIPTION, datagroom_sample_dataset
-    from starlette.responses import JSONResponse
+    from tools.export_dataset import EXPORT_DATASET_DESCRIPTION, datagroom_export_dataset
+    from tools.batch import BATCH_DESCRIPTION, datagroom_batch
+    from starlette.responses import JSONResponse, PlainTextResponse
+
+    @asynccontextmanager
+    async def _lifespan(_server):
+        # One pooled Gateway client per process, shared by every tool call
+        await open_gateway_client()
+        # Runs in the background so the port opens without waiting for MongoDB or the Gateway
+        warm_up = asyncio.create_task(_warm_up())
+        try:
+            yield
+        finally:
+            warm_up.cancel()
+            await asyncio.gather(warm_up, return_exceptions=True)
+            await close_snapshots()
+            await close_mongo()
+            await close_gateway_client()
 
     mcp = FastMCP(
         name="datagroom-mcp-server",
         version="1.0.0",
+        lifespan=_lifespan,
     )
+    mcp.add_middleware(create_tool_metrics_middleware())
+    mcp.add_middleware(create_tool_timing_middleware())
 
     @mcp.tool(
         name="datagroom_get_schema",
@@ -51,6 +130,8 @@ def _create_app():
         max_rows: int = 100,
         offset: int = 0,
         response_format: str = "markdown",
+        cursor: str | None = None,
+        fields: list[str] | None = None,
     ):
         return await datagroom_query_dataset(
             dataset_name=dataset_name,
@@ -59,6 +140,8 @@ def _create_app():
             max_rows=max_rows,
             offset=offset,
             response_format=response_format,
+            cursor=cursor,
+            fields=fields,
         )
 
     @mcp.tool(
@@ -93,24 +176,125 @@ def _create_app():
         dataset_name: str,
         sample_size: int = 20,
         stratify_by: str | None = None,
+        allocation: str = "proportional",
+        seed: int | None = None,
+        fields: list[str] | None = None,
+        response_format: str = "markdown",
     ):
         return await datagroom_sample_dataset(
             dataset_name=dataset_name,
             sample_size=sample_size,
             stratify_by=stratify_by,
+            allocation=allocation,
+            seed=seed,
+            fields=fields,
+            response_format=response_format,
         )
 
+    @mcp.tool(
+        name="datagroom_export_dataset",
+        description=EXPORT_DATASET_DESCRIPTION,
+    )
+    async def export_dataset(
+        dataset_name: str,
+        format: str = "ndjson",
+        filters: list[dict] | None = None,
+        sort: dict | None = None,
+        output_path: str | None = None,
+        fields: list[str] | None = None,
+    ):
+        return await datagroom_export_dataset(
+            dataset_name=dataset_name,
+            format=format,
+            filters=filters,
+            sort=sort,
+            output_path=output_path,
+            fields=fields,
+        )
+
+    @mcp.tool(
+        name="datagroom_batch",
+        description=BATCH_DESCRIPTION,
+    )
+    async def batch(operations: list[dict]):
+        return await datagroom_batch(operations=operations)
+
     @mcp.custom_route("/health", methods=["GET"])
     async def health(_request):
         return JSONResponse(
             {"status": "ok", "service": "datagroom-mcp-server"}
         )
 
+    @mcp.custom_route("/stats", methods=["GET"])
+    async def stats(_request):
+        return JSONResponse(
+            {
+                "gateway_pool": get_pool_stats(),
+                "gateway_resilience": get_resilience_stats(),
+                "admission": get_admission_stats(),
+                "caches": get_cache_stats(),
+                "single_flight": get_single_flight_stats(),
+                "query_supersets": get_superset_stats(),
+                "mongo": {
+                    "enabled": mongo_backend_enabled(),
+                    "connected": await is_connected(),
+                },
+                "snapshots": get_snapshot_stats(),
+            }
+        )
+
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics(_request):
+        return PlainTextResponse(
+            render_metrics(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+    @mcp.custom_route("/admin/profile", methods=["GET"])
+    async def profile(request):
+        # Disabled unless ADMIN_TOKEN is set; the token is sent as "Authorization: Bearer <token>"
+        token = config["admin_token"]
+        given = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        if not token or not hmac.compare_digest(given.encode(), token.encode()):
+            return JSONResponse({"error": "not found"}, status_code=404)
+        try:
+            seconds = float(request.query_params.get("seconds", "5"))
+            interval = float(request.query_params.get("interval", "0.005"))
+        except ValueError:
+            return JSONResponse({"error": "seconds and interval must be numbers"}, status_code=400)
+        if not 0 < seconds <= config["profile_max_seconds"] or not 0.001 <= interval <= 1:
+            return JSONResponse(
+                {
+                    "error": f"seconds must be in (0, {config['profile_max_seconds']:g}] "
+                    "and interval in [0.001, 1]"
+                },
+                status_code=400,
+            )
+        try:
+            counts = await asyncio.to_thread(sample_stacks, seconds, interval)
+        except RuntimeError as e:
+            return JSONResponse({"error": str(e)}, status_code=409)
+        return PlainTextResponse(collapsed(counts))
+
     return mcp.http_app(path="/mcp/v1")
 
 
-# Expose ASGI app for uvicorn main:app (e.g. --reload)
-app = _create_app()
+_app = None
+
+
+def get_app():
+    """The ASGI app, built on first call."""
+    global _app
+    if _app is None:
+        _app = _create_app()
+    return _app
+
+
+def __getattr__(name: str):
+    # Expose ASGI app for uvicorn main:app (e.g. --reload) without building it at import
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main():
@@ -119,21 +303,12 @@ def main():
     logger.info("Port: %s", config["port"])
     logger.info("")
 
-    # Optional MongoDB connection (sync; tools use Gateway)
-    try:
-        connect_to_mongo(config["mongo_url"])
-    except Exception as e:
-        logger.warning(
-            "MongoDB not available (%s). Server will start anyway; tools use Gateway.",
-            e,
-        )
-        logger.info("")
-
+    # MongoDB (when a dataset uses the mongo backend) is connected and closed by the app lifespan
     port = config["port"]
     import uvicorn
     try:
         uvicorn.run(
-            app,
+            get_app(),
             host="0.0.0.0",
             port=port,
             log_level="info",
@@ -141,7 +316,6 @@ def main():
     except KeyboardInterrupt:
         logger.info("Shutting down...")
     finally:
-        close_mongo()
         logger.info("Goodbye.")
 
 
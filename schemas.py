@@ -4,7 +4,7 @@ Type definitions for Datagroom MCP Server (Pydantic models matching TS types.ts)
 
 from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 FilterType = Literal["eq", "ne", "gt", "lt", "gte", "lte", "in", "nin", "regex"]
 
@@ -36,6 +36,31 @@ class DatasetSchema(BaseModel):
     keys: list[str] = Field(default_factory=list)
 
 
+class ValueCount(BaseModel):
+    value: Any = None
+    count: int
+
+
+class ColumnProfile(BaseModel):
+    name: str
+    type: str
+    type_counts: dict[str, int] = Field(default_factory=dict)
+    null_count: int = 0
+    null_ratio: float = 0.0
+    min: Any = None
+    max: Any = None
+    top_values: list[ValueCount] = Field(default_factory=list)
+    approx_distinct: int = 0
+    distinct_error: float = 0.0
+    sample_values: list[Any] = Field(default_factory=list)
+
+
+class DatasetProfile(BaseModel):
+    total_rows: int
+    sampled_rows: int
+    columns: list[ColumnProfile] = Field(default_factory=list)
+
+
 class QueryResult(BaseModel):
     dataset_name: str
     query_summary: str
@@ -44,13 +69,18 @@ class QueryResult(BaseModel):
     offset: int
     has_more: bool
     next_offset: int | None = None
+    next_cursor: str | None = None
     data: list[dict[str, Any]] = Field(default_factory=list)
     warning: str | None = None
 
 
 class AggregationOperation(BaseModel):
-    operation: Literal["count", "sum", "avg", "min", "max"]
+    operation: Literal[
+        "count", "sum", "avg", "min", "max", "approx_distinct", "median", "percentile"
+    ]
     field: str | None = None
+    # Percentile rank for the percentile operation (0-100, e.g. 95)
+    percentile: float | None = Field(default=None, ge=0, le=100)
 
 
 class AggregationResultRow(BaseModel):
@@ -60,6 +90,12 @@ class AggregationResultRow(BaseModel):
     avg: float | None = None
     min: Any = None
     max: Any = None
+    approx_distinct: int | None = None
+    median: float | None = None
+    percentile: float | None = None
+    # Per approximate operation: relative standard error (approx_distinct) or
+    # normalized rank error (median/percentile); 0 when the result is exact
+    error_bounds: dict[str, float] | None = None
 
 
 class AggregationResult(BaseModel):
@@ -75,10 +111,50 @@ class DatasetInfo(BaseModel):
 
 class ListDatasetsResult(BaseModel):
     datasets: list[DatasetInfo]
+    warning: str | None = None
+
+
+class StratumSummary(BaseModel):
+    value: Any = None
+    other: bool = False
+    population: int
+    sampled: int
 
 
 class SampleResult(BaseModel):
     dataset_name: str
     sample_size: int
     total_rows: int
+    method: Literal["uniform", "stratified"] = "uniform"
+    stratify_by: str | None = None
+    allocation: Literal["proportional", "equal"] | None = None
+    seed: int | None = None
+    strata: list[StratumSummary] | None = None
     data: list[dict[str, Any]] = Field(default_factory=list)
+    warning: str | None = None
+
+
+class BatchOperation(BaseModel):
+    # Any other keys are arguments of the tool (e.g. filters, max_rows)
+    model_config = ConfigDict(extra="allow")
+
+    tool: Literal["query", "count", "aggregate", "schema", "sample"]
+    dataset_name: str
+    id: str | None = None
+
+
+class BatchItemResult(BaseModel):
+    id: str | None = None
+    tool: str | None = None
+    dataset_name: str | None = None
+    ok: bool
+    elapsed_ms: float = 0.0
+    result: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class BatchResult(BaseModel):
+    operations: int
+    succeeded: int
+    failed: int
+    results: list[BatchItemResult]
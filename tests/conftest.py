@@ -0,0 +1,165 @@
+"""
+Shared test setup. `async def` tests run on a fresh event loop each. Gateway calls go to the stub
+Gateway (bench/stub_gateway.py) in-process through the shared client's transport, and MongoDB is
+an in-memory mongomock database installed with db.connection.set_client. Module-level caches,
+the circuit breaker and admission state are reset between tests.
+"""
+
+import asyncio
+import inspect
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+os.environ.setdefault("DATAGROOM_PAT_TOKEN", "test")
+
+import httpx
+import pytest
+
+from bench.stub_gateway import Faults, create_app
+from config import config
+from db import queries, snapshot
+from db.connection import set_client
+from utils import cache, gateway_views
+from utils.admission import reset_admission
+from utils.gateway_client import close_gateway_client, open_gateway_client
+from utils.resilience import reset_resilience
+
+
+def pytest_pyfunc_call(pyfuncitem: pytest.Function) -> bool | None:
+    if not inspect.iscoroutinefunction(pyfuncitem.obj):
+        return None
+    arguments = {name: pyfuncitem.funcargs[name] for name in pyfuncitem._fixtureinfo.argnames}
+    asyncio.run(pyfuncitem.obj(**arguments))
+    return True
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state():
+    for registered in cache._caches.values():
+        registered.clear()
+    gateway_views._complete_views.clear()
+    queries._known_datasets.clear()
+    snapshot._snapshots.clear()
+    reset_resilience()
+    reset_admission()
+    yield
+    set_client(None)
+
+
+@pytest.fixture
+def overrides(monkeypatch):
+    """Set config values for one test: overrides(key=value, ...)."""
+
+    def _set(**values: Any) -> None:
+        for key, value in values.items():
+            monkeypatch.setitem(config, key, value)
+
+    return _set
+
+
+@pytest.fixture
+def stub_gateway():
+    """
+    `async with stub_gateway({"orders": 500}) as faults:` serves the datasets (row counts or
+    rows) from the stub Gateway for the block; faults changes latency and errors while it runs.
+    """
+
+    @asynccontextmanager
+    async def _serve(
+        datasets: dict[str, Any], faults: Faults | None = None
+    ) -> AsyncIterator[Faults]:
+        faults = faults or Faults()
+        await open_gateway_client(httpx.ASGITransport(create_app(datasets, faults, seed=1)))
+        try:
+            yield faults
+        finally:
+            await close_gateway_client()
+
+    return _serve
+
+
+class _AsyncCursor:
+    def __init__(self, cursor: Any):
+        self._cursor = cursor
+
+    def sort(self, key: Any, direction: int | None = None) -> "_AsyncCursor":
+        self._cursor = self._cursor.sort(key, direction)
+        return self
+
+    def batch_size(self, size: int) -> "_AsyncCursor":
+        return self
+
+    def skip(self, count: int) -> "_AsyncCursor":
+        self._cursor = self._cursor.skip(count)
+        return self
+
+    def limit(self, count: int) -> "_AsyncCursor":
+        self._cursor = self._cursor.limit(count)
+        return self
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        return list(self._cursor)
+
+    def __aiter__(self) -> "_AsyncCursor":
+        self._iterator = iter(self._cursor)
+        return self
+
+    async def __anext__(self) -> dict:
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class _AsyncCollection:
+    def __init__(self, collection: Any):
+        self._collection = collection
+
+    def find(self, query: dict | None = None, projection: dict | None = None) -> _AsyncCursor:
+        return _AsyncCursor(self._collection.find(query or {}, projection))
+
+    async def count_documents(self, query: dict) -> int:
+        return self._collection.count_documents(query)
+
+    async def estimated_document_count(self) -> int:
+        return self._collection.estimated_document_count()
+
+    async def aggregate(self, pipeline: list[dict], **kwargs: Any) -> _AsyncCursor:
+        return _AsyncCursor(self._collection.aggregate(pipeline))
+
+
+class _AsyncDatabase:
+    def __init__(self, database: Any):
+        self._database = database
+
+    def __getitem__(self, name: str) -> _AsyncCollection:
+        return _AsyncCollection(self._database[name])
+
+    async def list_collection_names(self) -> list[str]:
+        return self._database.list_collection_names()
+
+
+class AsyncMongomock:
+    """The slice of pymongo's AsyncMongoClient that db/queries.py uses, over mongomock."""
+
+    def __init__(self):
+        import mongomock
+
+        self.sync = mongomock.MongoClient()
+
+    def __getitem__(self, name: str) -> _AsyncDatabase:
+        return _AsyncDatabase(self.sync[name])
+
+    async def close(self) -> None:
+        self.sync.close()
+
+
+@pytest.fixture
+def mongo(overrides) -> AsyncMongomock:
+    """In-memory MongoDB; datasets inserted into mongo.sync[name]["data"] use the mongo backend."""
+    pytest.importorskip("mongomock")
+    client = AsyncMongomock()
+    set_client(client)
+    overrides(backend="mongo")
+    return client
@@ -0,0 +1,35 @@
+"""Admission slots around Gateway calls made through send_authenticated_request."""
+
+import asyncio
+
+from bench.stub_gateway import Faults
+from utils.admission import get_admission_stats
+from utils.authenticated_request import send_authenticated_request
+from utils.resilience import get_resilience_stats
+
+LIST = "/ds/dsList/mcp"
+
+
+async def test_backoff_does_not_hold_a_slot(stub_gateway, overrides):
+    overrides(
+        admission_max_in_flight=1,
+        admission_max_wait=0.05,
+        gateway_retries=1,
+        gateway_retry_backoff=0.001,
+        gateway_retry_max_backoff=0.001,
+    )
+    async with stub_gateway({"orders": 10}, Faults(throttle_rate=1.0, retry_after=0.3)) as faults:
+        throttled = asyncio.create_task(send_authenticated_request(LIST))
+        # Wait until the first attempt got its 429 and is waiting out Retry-After
+        while not get_resilience_stats()["retries"]:
+            assert not throttled.done()
+            await asyncio.sleep(0.005)
+        assert get_admission_stats()["in_flight"] == 0
+
+        faults.throttle_rate = 0.0
+        other = await send_authenticated_request(LIST)  # admitted within admission_max_wait
+        assert other.status_code == 200
+        assert (await throttled).status_code == 200
+    stats = get_admission_stats()
+    assert stats["admitted"] == 3  # one slot per attempt
+    assert stats["rejected_timeout"] == 0
@@ -0,0 +1,83 @@
+"""datagroom_export_dataset: output files and the writer thread pipeline."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tools.export_dataset import _pipeline, datagroom_export_dataset
+from utils.exporters import ChunkWriter, ParquetWriter
+
+
+def test_empty_parquet_is_valid(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "empty.parquet"
+    writer = ParquetWriter(path, ["_id", "amount"])
+    writer.close()
+    table = pq.read_table(path)
+    assert table.num_rows == 0
+    assert table.column_names == ["_id", "amount"]
+
+
+def test_incomplete_writer_cannot_be_created(tmp_path):
+    class _NoClose(ChunkWriter):
+        def write_chunk(self, rows):
+            self.rows_written += len(rows)
+
+    with pytest.raises(TypeError, match="close"):
+        _NoClose(tmp_path / "out")
+
+
+async def test_zero_row_parquet_export(stub_gateway, overrides, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    overrides(export_dir=str(tmp_path))
+    async with stub_gateway({"orders": 50}):
+        result = await datagroom_export_dataset(
+            "orders",
+            format="parquet",
+            filters=[{"field": "status", "type": "eq", "value": "no-such-status"}],
+            output_path="none.parquet",
+        )
+    assert result.structured_content["rows_written"] == 0
+    assert pq.read_table(tmp_path / "none.parquet").num_rows == 0
+
+
+async def test_export_writes_every_row(stub_gateway, overrides, tmp_path):
+    overrides(export_dir=str(tmp_path), export_page_size=7)
+    async with stub_gateway({"orders": 50}):
+        result = await datagroom_export_dataset("orders", output_path="all.ndjson")
+    assert result.structured_content["rows_written"] == 50
+    assert len((tmp_path / "all.ndjson").read_text().splitlines()) == 50
+
+
+class _SlowWriter(ChunkWriter):
+    def __init__(self, path):
+        super().__init__(path)
+        self.writing = threading.Event()
+        self.closed_during_write = False
+
+    def write_chunk(self, rows):
+        self.writing.set()
+        time.sleep(0.2)
+        self.rows_written += len(rows)
+        self.writing.clear()
+
+    def close(self):
+        self.closed_during_write = self.writing.is_set()
+
+
+async def test_pipeline_waits_for_write_in_progress_before_returning(tmp_path):
+    writer = _SlowWriter(tmp_path / "slow")
+
+    async def _chunks():
+        yield [{"a": 1}]
+        while not writer.writing.is_set():
+            await asyncio.sleep(0.001)
+        raise RuntimeError("page fetch failed")
+
+    with pytest.raises(RuntimeError, match="page fetch failed"):
+        await _pipeline(writer, _chunks())
+    writer.close()
+    assert not writer.closed_during_write
+    assert writer.rows_written == 1
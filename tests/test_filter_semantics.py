@@ -0,0 +1,186 @@
+"""
+compile_filters must agree with MongoDB on convert_filters_to_mongo's query (mongomock stands in
+for the server), and filters_cover may only claim that a superset answers a narrower query when
+every row of the narrower query is in the superset.
+
+Generated values stay clear of the places where mongomock differs from the server: it compares
+booleans with Python equality (False == 0), its $gte/$lte null skip missing fields, and it does
+not treat "c.d" as missing when "c" is a scalar.
+"""
+
+import random
+
+import pytest
+
+from schemas import Filter
+from utils.filter_compiler import compile_filters, filters_cover
+from utils.filter_converter import convert_filters_to_mongo
+
+mongomock = pytest.importorskip("mongomock")
+
+OPERATORS = ("eq", "ne", "gt", "gte", "lt", "lte", "in", "nin", "regex")
+FIELDS = ("a", "b", "c.d")
+# No 0 or 1: mongomock would treat them as equal to False and True
+SCALARS = [None, 2, 2.5, 3, -1, 10, "", "1", "a", "ab", "B", "ok", "fail", True, False]
+MISSING = object()
+
+
+def _value(rng: random.Random) -> object:
+    roll = rng.random()
+    if roll < 0.1:
+        return MISSING
+    if roll < 0.25:
+        return [rng.choice(SCALARS) for _ in range(rng.randrange(4))]
+    return rng.choice(SCALARS)
+
+
+def _row(rng: random.Random, i: int) -> dict:
+    row: dict = {"_id": i}
+    for field in ("a", "b"):
+        value = _value(rng)
+        if value is not MISSING:
+            row[field] = value
+    nested = _value(rng)
+    roll = rng.random()
+    if roll < 0.2:
+        # An array of documents, some without "d"
+        row["c"] = [{} if v is MISSING else {"d": v} for v in (nested, _value(rng))]
+    elif roll < 0.9:
+        row["c"] = {} if nested is MISSING else {"d": nested}
+    return row
+
+
+def _f(field: str, op: str, value: object) -> dict:
+    return {"field": field, "type": op, "value": value}
+
+
+def _filter(rng: random.Random, op: str | None = None) -> dict:
+    op = op or rng.choice(OPERATORS)
+    field = rng.choice(FIELDS)
+    if op in ("in", "nin"):
+        value = rng.sample(SCALARS, rng.randrange(1, 4))
+    elif op == "regex":
+        value = rng.choice(["^a", "b", "^$", "o", "1", "^f.*l$"])
+    elif op in ("eq", "ne") and rng.random() < 0.1:
+        value = [rng.choice(SCALARS) for _ in range(rng.randrange(3))]
+    elif op in ("gte", "lte"):
+        value = rng.choice([v for v in SCALARS if v is not None])  # see test_null_bounds
+    else:
+        value = rng.choice(SCALARS)
+    return _f(field, op, value)
+
+
+@pytest.fixture(scope="module")
+def dataset():
+    rng = random.Random(11)
+    rows = [_row(rng, i) for i in range(400)]
+    collection = mongomock.MongoClient()["semantics"]["data"]
+    collection.insert_many([dict(row) for row in rows])
+    return rows, collection
+
+
+def _mongo_ids(collection, filters: list[dict]) -> set:
+    query = convert_filters_to_mongo([Filter(**f) for f in filters])
+    return {doc["_id"] for doc in collection.find(query, {"_id": 1})}
+
+
+def _local_ids(rows: list[dict], filters: list[dict]) -> set:
+    compiled = compile_filters(filters)
+    by_row = {row["_id"] for row in rows if compiled.matches(row)}
+    by_batch = {row["_id"] for row in compiled.filter(rows)}
+    assert by_row == by_batch
+    return by_row
+
+
+@pytest.mark.parametrize("op", OPERATORS)
+def test_every_operator_matches_mongo(dataset, op):
+    rows, collection = dataset
+    rng = random.Random(f"op-{op}")
+    for _ in range(60):
+        filters = [_filter(rng, op)]
+        assert _local_ids(rows, filters) == _mongo_ids(collection, filters), filters
+
+
+@pytest.mark.parametrize("value", [None, 2, "a", True, [], [2, "a"]], ids=repr)
+@pytest.mark.parametrize("op", ["eq", "ne", "gt", "gte", "lt", "lte", "in", "nin"])
+def test_null_missing_array_and_mixed_values(dataset, op, value):
+    rows, collection = dataset
+    if op in ("gt", "gte", "lt", "lte") and isinstance(value, list):
+        pytest.skip("range filters take a scalar")
+    if op in ("gte", "lte") and value is None:
+        pytest.skip("see test_null_bounds")
+    if op in ("in", "nin") and not isinstance(value, list):
+        value = [value]
+    for field in FIELDS:
+        filters = [_f(field, op, value)]
+        assert _local_ids(rows, filters) == _mongo_ids(collection, filters), filters
+
+
+@pytest.mark.parametrize("op", ["gt", "gte", "lt", "lte"])
+def test_null_bounds(dataset, op):
+    """gte/lte null match null or missing fields like eq null (the server does; mongomock not)."""
+    rows, collection = dataset
+    for field in FIELDS:
+        local = _local_ids(rows, [_f(field, op, None)])
+        reference = _f(field, op if op in ("gt", "lt") else "eq", None)
+        assert local == _mongo_ids(collection, [reference])
+
+
+def test_combined_filters_match_mongo(dataset):
+    rows, collection = dataset
+    rng = random.Random(5)
+    for _ in range(300):
+        filters = [_filter(rng) for _ in range(rng.randrange(1, 4))]
+        assert _local_ids(rows, filters) == _mongo_ids(collection, filters), filters
+
+
+def test_filters_cover_is_sound(dataset):
+    rows, collection = dataset
+    rng = random.Random(9)
+    covered = 0
+    for _ in range(3000):
+        superset = [_filter(rng) for _ in range(rng.randrange(0, 3))]
+        # Narrow the superset: keep some of its filters, tighten or add others
+        narrower = [f for f in superset if rng.random() < 0.7]
+        narrower += [_filter(rng) for _ in range(rng.randrange(0, 3))]
+        if not filters_cover(superset, narrower):
+            continue
+        covered += 1
+        assert _mongo_ids(collection, narrower) <= _mongo_ids(collection, superset), (
+            superset,
+            narrower,
+        )
+    assert covered > 300  # the check above is not vacuous
+
+
+@pytest.mark.parametrize(
+    "superset, narrower",
+    [
+        ([], [_f("a", "eq", 1)]),
+        ([_f("a", "gt", 1)], [_f("a", "gt", 2)]),
+        ([_f("a", "gte", 1)], [_f("a", "gt", 1)]),
+        ([_f("a", "lt", 10)], [_f("a", "eq", 2)]),
+        ([_f("a", "in", [1, 2])], [_f("a", "eq", 2)]),
+        ([_f("a", "nin", [1])], [_f("a", "nin", [1, 2])]),
+        ([_f("b", "regex", "^a")], [_f("b", "regex", "^a"), _f("a", "eq", 1)]),
+    ],
+)
+def test_filters_cover_accepts_narrower_queries(superset, narrower):
+    assert filters_cover(superset, narrower)
+
+
+@pytest.mark.parametrize(
+    "superset, narrower",
+    [
+        ([_f("a", "eq", 1)], []),
+        ([_f("a", "gt", 2)], [_f("a", "gt", 1)]),
+        ([_f("a", "gt", 1)], [_f("a", "gte", 1)]),
+        ([_f("a", "gt", 1)], [_f("a", "gt", "2")]),
+        ([_f("a", "eq", 1)], [_f("b", "eq", 1)]),
+        ([_f("a", "ne", 1)], [_f("a", "in", [1, 2])]),
+        ([_f("a", "eq", 1)], [_f("a", "eq", True)]),
+        ([_f("a", "gte", None)], [_f("a", "gt", 0)]),
+    ],
+)
+def test_filters_cover_rejects_wider_queries(superset, narrower):
+    assert not filters_cover(superset, narrower)
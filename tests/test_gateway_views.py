@@ -0,0 +1,20 @@
+"""iter_view_pages: prefetched pages are cleaned up when the consumer stops early."""
+
+import asyncio
+import contextlib
+
+from bench.stub_gateway import Faults
+from utils.gateway_views import iter_view_pages
+
+
+async def test_stopping_early_leaves_no_page_fetches_running(stub_gateway):
+    async with stub_gateway({"ds": 100}, Faults(latency=0.05)):
+        pages = iter_view_pages("ds", per_page=10, concurrency=4)
+        async with contextlib.aclosing(pages):
+            seen = 0
+            async for _ in pages:
+                seen += 1
+                if seen == 2:  # pages 3-6 are being prefetched
+                    break
+        others = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        assert all(task.done() for task in others)
@@ -0,0 +1,74 @@
+"""datagroom_get_schema: cached schemas and column profiles across revalidations."""
+
+import httpx
+import pytest
+
+from tools import get_schema
+from tools.get_schema import get_cached_schema
+
+
+@pytest.fixture
+def samples(monkeypatch):
+    """Counts the row samples taken for column profiles."""
+    calls = []
+    sample_rows = get_schema._sample_rows
+
+    async def _counting(dataset_name):
+        calls.append(dataset_name)
+        return await sample_rows(dataset_name)
+
+    monkeypatch.setattr(get_schema, "_sample_rows", _counting)
+    return calls
+
+
+async def _revalidated(dataset: str) -> tuple:
+    """Let the cached entry go stale, serve it once and wait for the background refresh."""
+    entry = get_schema._schema_cache.get_entry(dataset)
+    entry.expires_at = 0
+    await get_cached_schema(dataset)
+    await get_schema._revalidating[dataset]
+    return await get_cached_schema(dataset)
+
+
+def _rows(count: int) -> list[dict]:
+    return [{"_id": i, "amount": i * 2} for i in range(count)]
+
+
+async def test_unchanged_schema_keeps_profile(stub_gateway, samples):
+    async with stub_gateway({"ds": _rows(20)}):
+        first = await get_cached_schema("ds")
+        again = await _revalidated("ds")
+    assert samples == ["ds"]
+    assert again[1]["profile"] == first[1]["profile"]
+
+
+async def test_not_modified_keeps_profile(stub_gateway, samples, monkeypatch):
+    async with stub_gateway({"ds": _rows(20)}):
+        first = await get_cached_schema("ds")
+
+        async def _not_modified(*args, **kwargs):
+            return httpx.Response(304)
+
+        monkeypatch.setattr(get_schema, "send_authenticated_request", _not_modified)
+        again = await _revalidated("ds")
+    assert samples == ["ds"]
+    assert again is first
+
+
+async def test_changed_schema_is_profiled_again(stub_gateway, samples):
+    rows = _rows(20)
+    async with stub_gateway({"ds": rows}):
+        await get_cached_schema("ds")
+        rows[0]["region"] = "emea"
+        again = await _revalidated("ds")
+    assert samples == ["ds", "ds"]
+    assert "region" in {column["name"] for column in again[1]["profile"]["columns"]}
+
+
+async def test_text_summarizes_the_structured_schema(stub_gateway):
+    rows = [{"_id": i, "note": f"sample-{i}"} for i in range(20)]
+    async with stub_gateway({"ds": rows}):
+        _, structured, text = await get_cached_schema("ds")
+    assert structured["profile"]["total_rows"] == 20
+    assert "`note`" in text and "Column Profile" in text
+    assert "sample-" not in text.split("## Column Profile")[0]  # rows only in structured
@@ -0,0 +1,43 @@
+"""
+Cold start: `import main` leaves heavy dependencies unloaded. The wall-clock budgets depend on
+the machine and only run with DATAGROOM_TIMING_TESTS=1 (or via `python -m bench.import_time`).
+"""
+
+import os
+import statistics
+
+import pytest
+
+from bench.import_time import BUDGETS_MS, STAGES, _import_times, _probe
+
+RUNS = 3
+
+timing = pytest.mark.skipif(
+    os.environ.get("DATAGROOM_TIMING_TESTS") != "1",
+    reason="wall-clock budget; set DATAGROOM_TIMING_TESTS=1",
+)
+
+
+@timing
+def test_import_main_is_within_budget():
+    # Cumulative time python -X importtime reports for main, in fresh interpreters
+    runs = [
+        next(ms for _, ms, name in _import_times("import main") if name == "main")
+        for _ in range(RUNS)
+    ]
+    assert statistics.median(runs) <= BUDGETS_MS["import main"], runs
+
+
+@pytest.mark.parametrize("stage", list(STAGES))
+def test_heavy_modules_are_not_loaded(stage):
+    # import main: no fastmcp, starlette or uvicorn either; pymongo, pyarrow and h2 never
+    statement, forbidden = STAGES[stage]
+    loaded = set(_probe(statement)["modules"])
+    assert [name for name in forbidden if name in loaded] == []
+
+
+@timing
+def test_build_app_is_within_budget():
+    statement, _ = STAGES["build app"]
+    runs = [_probe(statement)["seconds"] * 1000 for _ in range(RUNS)]
+    assert statistics.median(runs) <= BUDGETS_MS["build app"], runs
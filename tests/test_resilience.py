@@ -0,0 +1,131 @@
+"""Gateway retries, timeout budgets, circuit breaker and hedging against the stub Gateway."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from bench.stub_gateway import Faults
+from utils.error_handlers import GatewayUnavailableError
+from utils.gateway_client import send_gateway_request
+from utils.resilience import gateway_request, get_resilience_stats, reset_resilience
+
+LIST = "/ds/dsList/mcp"
+VIEW = "/ds/viewViaPost/orders/default/mcp"
+
+
+@pytest.fixture
+def resilience(overrides):
+    """Set resilience config and rebuild the breaker with it: resilience(key=value, ...)."""
+
+    def _set(**values) -> None:
+        defaults = {
+            "gateway_retry_backoff": 0.001,
+            "gateway_retry_max_backoff": 0.005,
+            "gateway_hedge": False,
+        }
+        overrides(**{**defaults, **values})
+        reset_resilience()
+
+    return _set
+
+
+async def _requests(endpoint: str) -> int:
+    """Requests the stub Gateway has received for an endpoint class."""
+    stats = (await send_gateway_request("GET", "/_stats")).json()
+    return stats["counters"].get(f"requests.{endpoint}", 0)
+
+
+async def test_retries_until_success(stub_gateway, resilience):
+    resilience(gateway_retries=5, gateway_breaker_failures=100)
+    async with stub_gateway({"orders": 10}, Faults(error_rate=0.3)):
+        for _ in range(20):
+            response = await gateway_request("POST", VIEW, json={})
+            assert response.status_code == 200
+        retries = get_resilience_stats()["retries"]
+        assert retries > 0
+        assert await _requests("view") == 20 + retries
+
+
+async def test_gives_up_after_the_configured_retries(stub_gateway, resilience):
+    resilience(gateway_retries=3, gateway_breaker_failures=100)
+    async with stub_gateway({"orders": 10}, Faults(error_rate=1.0)):
+        response = await gateway_request("POST", VIEW, json={})
+        assert response.status_code == 503
+        assert await _requests("view") == 4
+
+
+async def test_writes_are_not_retried(stub_gateway, resilience):
+    resilience(gateway_retries=3, gateway_breaker_failures=100)
+    async with stub_gateway({"orders": 10}, Faults(error_rate=1.0)):
+        response = await gateway_request("POST", "/ds/edit/orders", json={})
+        assert response.status_code == 404  # the stub has no such route, but it was sent once
+        assert get_resilience_stats()["retries"] == 0
+
+
+async def test_budget_bounds_the_whole_attempt(stub_gateway, resilience):
+    # The in-process transport ignores httpx timeouts, like a server that trickles bytes
+    resilience(gateway_retries=3, gateway_endpoint_timeouts={"list": 0.2})
+    async with stub_gateway({"orders": 10}, Faults(latency=2.0)):
+        started = time.monotonic()
+        with pytest.raises(httpx.TimeoutException):
+            await gateway_request("GET", LIST)
+        assert time.monotonic() - started < 1.0
+    assert get_resilience_stats()["budget_exhausted"] == 1
+
+
+async def test_breaker_opens_probes_and_closes(stub_gateway, resilience):
+    resilience(gateway_retries=0, gateway_breaker_failures=2, gateway_breaker_reset=0.1)
+    async with stub_gateway({"orders": 10}, Faults(error_rate=1.0)) as faults:
+        for _ in range(2):
+            assert (await gateway_request("GET", LIST)).status_code == 503
+        assert get_resilience_stats()["breaker"]["state"] == "open"
+        with pytest.raises(GatewayUnavailableError):
+            await gateway_request("GET", LIST)
+        assert await _requests("list") == 2  # rejected without a request
+
+        # A failed half-open probe opens the circuit again
+        await asyncio.sleep(0.15)
+        assert (await gateway_request("GET", LIST)).status_code == 503
+        assert get_resilience_stats()["breaker"]["state"] == "open"
+        with pytest.raises(GatewayUnavailableError):
+            await gateway_request("GET", LIST)
+
+        # A good probe closes it
+        faults.error_rate = 0.0
+        await asyncio.sleep(0.15)
+        assert (await gateway_request("GET", LIST)).status_code == 200
+        assert get_resilience_stats()["breaker"]["state"] == "closed"
+        assert (await gateway_request("GET", LIST)).status_code == 200
+        assert get_resilience_stats()["breaker"]["opens"] == 2
+
+
+async def test_half_open_allows_a_single_probe(stub_gateway, resilience):
+    resilience(gateway_retries=0, gateway_breaker_failures=1, gateway_breaker_reset=0.1)
+    async with stub_gateway({"orders": 10}, Faults(error_rate=1.0)) as faults:
+        await gateway_request("GET", LIST)
+        await asyncio.sleep(0.15)
+        faults.error_rate, faults.latency = 0.0, 0.05
+        results = await asyncio.gather(
+            *(gateway_request("GET", LIST) for _ in range(3)), return_exceptions=True
+        )
+    assert [r.status_code for r in results if isinstance(r, httpx.Response)] == [200]
+    assert sum(isinstance(r, GatewayUnavailableError) for r in results) == 2
+
+
+async def test_hedging_races_slow_attempts(stub_gateway, resilience):
+    resilience(gateway_retries=0, gateway_hedge=True, gateway_hedge_min_delay=0.02)
+    async with stub_gateway({"orders": 10}) as faults:
+        for _ in range(20):  # latency history before hedges fire
+            await gateway_request("GET", LIST)
+        faults.slow_rate, faults.slow_latency = 0.5, 0.5
+        started = time.monotonic()
+        for _ in range(10):
+            assert (await gateway_request("GET", LIST)).status_code == 200
+        elapsed = time.monotonic() - started
+    stats = get_resilience_stats()
+    assert stats["hedges"] > 0
+    assert stats["hedge_wins"] > 0
+    # Only calls whose attempt and hedge were both slow waited out the slow latency
+    assert elapsed < 10 * 0.5
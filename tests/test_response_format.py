@@ -0,0 +1,36 @@
+"""Row-returning tools send each row once: in the text (markdown) or structured content (json)."""
+
+import pytest
+
+from tools.query_dataset import datagroom_query_dataset
+from tools.sample_dataset import datagroom_sample_dataset
+
+ROWS = [{"_id": i, "name": f"customer-{i:03d}"} for i in range(20)]
+TOOLS = {
+    "query": lambda fmt: datagroom_query_dataset("ds", max_rows=10, response_format=fmt),
+    "sample": lambda fmt: datagroom_sample_dataset("ds", sample_size=10, response_format=fmt),
+}
+
+
+def _text(result) -> str:
+    return "\n".join(block.text for block in result.content)
+
+
+def _names(text: str) -> list[str]:
+    return [row["name"] for row in ROWS if row["name"] in text]
+
+
+@pytest.mark.parametrize("tool", list(TOOLS))
+async def test_json_rows_are_only_structured(stub_gateway, tool):
+    async with stub_gateway({"ds": ROWS}):
+        result = await TOOLS[tool]("json")
+    assert len(result.structured_content["data"]) == 10
+    assert _names(_text(result)) == []
+
+
+@pytest.mark.parametrize("tool", list(TOOLS))
+async def test_markdown_rows_are_only_text(stub_gateway, tool):
+    async with stub_gateway({"ds": ROWS}):
+        result = await TOOLS[tool]("markdown")
+    assert "data" not in result.structured_content
+    assert len(_names(_text(result))) == 10
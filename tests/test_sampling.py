@@ -0,0 +1,124 @@
+"""Sample allocation across strata, stratum construction and seeded sampling end to end."""
+
+import random
+
+import pytest
+
+from tools.sample_dataset import datagroom_sample_dataset
+from utils.sampling import MAX_STRATA, allocate, build_strata, sample_strata
+
+
+def _populations(rng: random.Random) -> list[int]:
+    return [rng.choice([0, 1, 2, 5, 40, 1000]) for _ in range(rng.randrange(1, 12))]
+
+
+@pytest.mark.parametrize("allocation", ["proportional", "equal"])
+def test_allocate_fills_the_sample_within_each_stratum(allocation):
+    rng = random.Random(allocation)
+    for _ in range(500):
+        populations = _populations(rng)
+        n = rng.randrange(0, 200)
+        counts = allocate(populations, n, allocation)
+        assert sum(counts) == min(n, sum(populations)), (populations, n)
+        assert all(0 <= c <= p for c, p in zip(counts, populations)), (populations, n)
+
+
+def test_proportional_allocation_follows_populations():
+    # One row per stratum first, then the rest by population
+    assert allocate([500, 300, 200], 103, "proportional") == [51, 31, 21]
+    assert allocate([900, 100], 10, "proportional") == [8, 2]
+
+
+def test_proportional_allocation_gives_every_stratum_a_row():
+    assert allocate([1000, 1, 1], 10, "proportional") == [8, 1, 1]
+    assert allocate([1000, 0, 1], 10, "proportional") == [9, 0, 1]
+    # Fewer rows than strata: no minimum, the largest strata are sampled
+    assert allocate([1000, 5, 1], 2, "proportional") == [2, 0, 0]
+
+
+def test_equal_allocation_splits_evenly():
+    assert allocate([100, 100, 100], 9, "equal") == [3, 3, 3]
+    assert sum(allocate([100, 100, 100], 10, "equal")) == 10
+
+
+def test_capped_strata_pass_their_leftover_on():
+    # Equal shares of 10 do not fit the small strata; what they cannot take goes to the others
+    assert allocate([2, 100, 100], 30, "equal") == [2, 14, 14]
+    assert allocate([3, 4, 1000], 500, "equal") == [3, 4, 493]
+
+
+def test_allocate_takes_everything_when_the_sample_is_larger():
+    assert allocate([3, 0, 7], 50, "proportional") == [3, 0, 7]
+    assert allocate([3, 0, 7], 50, "equal") == [3, 0, 7]
+    assert allocate([], 5, "equal") == []
+
+
+def test_build_strata_collects_the_rest_in_other():
+    base = [{"field": "region", "type": "eq", "value": "EU"}]
+    counts = [("ok", 6), ("fail", 3), (["a"], 2), ({"x": 1}, 1), (None, 1), ("gone", 0)]
+    strata = build_strata("status", base, counts, 15)
+    assert [(s.value, s.population, s.other) for s in strata] == [
+        ("ok", 6, False),
+        ("fail", 3, False),
+        (None, 1, False),
+        (None, 5, True),  # arrays, objects and rows the counts missed
+    ]
+    assert strata[0].filters == [*base, {"field": "status", "type": "eq", "value": "ok"}]
+    assert strata[-1].filters == [
+        *base,
+        {"field": "status", "type": "nin", "value": ["ok", "fail", None]},
+    ]
+
+
+def test_build_strata_keeps_the_largest_values():
+    counts = [(f"v{i}", i + 1) for i in range(MAX_STRATA + 5)]
+    total = sum(c for _, c in counts)
+    strata = build_strata("v", [], counts, total)
+    assert len(strata) == MAX_STRATA + 1
+    assert strata[-1].other and strata[-1].population == sum(range(1, 6))
+    assert "v0" not in [s.value for s in strata]
+
+
+def test_build_strata_without_rest_has_no_other():
+    strata = build_strata("status", [], [("ok", 6), ("fail", 4)], 10)
+    assert not any(s.other for s in strata)
+
+
+async def test_sample_strata_fills_each_quota():
+    strata = build_strata("g", [], [("a", 50), ("b", 30), ("c", 2)], 100)
+    calls = []
+
+    async def _sampler(filters, n, rng, total):
+        calls.append((filters[-1]["value"], n, total))
+        return total, [{"i": rng.random()} for _ in range(n)]
+
+    await sample_strata(strata, 20, "proportional", random.Random(1), _sampler)
+    quotas = allocate([s.population for s in strata], 20, "proportional")
+    assert [len(s.rows) for s in strata] == quotas
+    assert sorted(calls, key=str) == sorted(
+        ((s.filters[-1]["value"], q, s.population) for s, q in zip(strata, quotas)), key=str
+    )
+
+
+def _rows(count: int) -> list[dict]:
+    statuses = ["ok"] * 6 + ["fail"] * 3 + ["pending"]
+    return [{"_id": i, "status": statuses[i % len(statuses)]} for i in range(count)]
+
+
+@pytest.mark.parametrize("stratify_by", [None, "status"])
+async def test_seeded_samples_are_reproducible(stub_gateway, stratify_by):
+    async def _sample(seed: int) -> list:
+        result = await datagroom_sample_dataset(
+            "ds", sample_size=25, stratify_by=stratify_by, seed=seed, response_format="json"
+        )
+        strata = result.structured_content.get("strata") or []
+        if stratify_by:  # ok/fail/pending hold 300/150/50 rows
+            assert [s["population"] for s in strata] == [300, 150, 50]
+            assert [s["sampled"] for s in strata] == allocate([300, 150, 50], 25, "proportional")
+        return [row["_id"] for row in result.structured_content["data"]]
+
+    async with stub_gateway({"ds": _rows(500)}):
+        first = await _sample(7)
+        assert len(first) == len(set(first)) == 25
+        assert await _sample(7) == first
+        assert await _sample(8) != first
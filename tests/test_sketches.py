@@ -0,0 +1,210 @@
+"""
+HyperLogLog and KLL sketches: estimates within their reported error, merges of per-page
+partials equal to one stream, and merges that leave the merged-in sketch unchanged.
+"""
+
+import copy
+import random
+
+import pytest
+
+from schemas import AggregationOperation
+from utils.aggregation import StreamingAggregator
+from utils.sketches import HLL_EXACT_LIMIT, HyperLogLog, KLLSketch
+
+N = 50_000
+PAGE = 1000
+
+
+def _pages(values: list, size: int = PAGE) -> list[list]:
+    return [values[i : i + size] for i in range(0, len(values), size)]
+
+
+def _shuffled(n: int, seed: int = 0) -> list[int]:
+    values = list(range(n))
+    random.Random(seed).shuffle(values)
+    return values
+
+
+# --- HyperLogLog ------------------------------------------------------------------
+
+
+def test_hll_counts_exactly_up_to_the_limit():
+    hll = HyperLogLog()
+    hll.update(range(HLL_EXACT_LIMIT))
+    hll.update(range(HLL_EXACT_LIMIT))  # repeats do not count
+    assert hll.exact
+    assert hll.estimate() == HLL_EXACT_LIMIT
+    assert hll.relative_error == 0.0
+
+    hll.add(HLL_EXACT_LIMIT)
+    assert not hll.exact
+    assert hll.relative_error > 0
+    assert abs(hll.estimate() - (HLL_EXACT_LIMIT + 1)) <= 3 * hll.relative_error * HLL_EXACT_LIMIT
+
+
+def test_hll_update_and_add_agree_across_the_limit():
+    values = [f"v{i}" for i in range(HLL_EXACT_LIMIT * 3)]
+    batched, single = HyperLogLog(), HyperLogLog()
+    batched.update(values)
+    for value in values:
+        single.add(value)
+    assert batched.registers == single.registers
+
+
+@pytest.mark.parametrize("n", [1_000, 20_000, 100_000])
+def test_hll_estimate_is_within_its_error(n):
+    hll = HyperLogLog()
+    hll.update(f"customer-{i}" for i in range(n))
+    # relative_error is one standard error
+    assert abs(hll.estimate() - n) <= 3 * hll.relative_error * n
+
+
+@pytest.mark.parametrize("page", [100, PAGE], ids=["exact_pages", "register_pages"])
+def test_hll_merged_pages_equal_one_stream(page):
+    values = [f"v{i % 7000}" for i in _shuffled(N)]
+    stream = HyperLogLog()
+    stream.update(values)
+    merged = HyperLogLog()
+    for chunk in _pages(values, page):
+        partial = HyperLogLog()
+        partial.update(chunk)
+        merged.merge(partial)
+    assert merged.registers == stream.registers
+    assert merged.estimate() == stream.estimate()
+
+
+def test_hll_exact_partials_merge_across_the_limit():
+    a, b = HyperLogLog(), HyperLogLog()
+    a.update(range(200))
+    b.update(range(100, 300))
+    assert a.exact and b.exact
+    stream = HyperLogLog()
+    stream.update(range(300))
+    assert a.merge(b).registers == stream.registers
+
+
+@pytest.mark.parametrize("size", [10, HLL_EXACT_LIMIT * 4], ids=["exact", "registers"])
+def test_hll_merge_leaves_other_unchanged(size):
+    other = HyperLogLog()
+    other.update(range(size))
+    before = (copy.copy(other.hashes), copy.copy(other.registers))
+    target = HyperLogLog()
+    target.update(range(size, size + HLL_EXACT_LIMIT * 2))
+    target.merge(other)
+    assert (other.hashes, other.registers) == before
+
+
+def test_hll_merge_rejects_other_precisions():
+    with pytest.raises(ValueError):
+        HyperLogLog(12).merge(HyperLogLog(10))
+
+
+# --- KLL --------------------------------------------------------------------------
+
+
+def _rank_errors(sketch: KLLSketch, n: int) -> list[float]:
+    """|rank/n - q| of the sketch's quantiles over 0..n-1."""
+    return [abs(sketch.quantile(q / 100) / n - q / 100) for q in range(1, 100)]
+
+
+def test_kll_is_exact_until_it_compacts():
+    sketch = KLLSketch()
+    sketch.update([5, 1, 4, 2, 3])
+    assert sketch.exact
+    assert sketch.normalized_rank_error() == 0.0
+    assert [sketch.quantile(q) for q in (0, 0.2, 0.5, 0.8, 1)] == [1, 1, 3, 4, 5]
+
+
+def test_kll_quantiles_are_within_the_rank_error():
+    sketch = KLLSketch()
+    for chunk in _pages(_shuffled(N)):
+        sketch.update(chunk)
+    assert not sketch.exact
+    assert max(_rank_errors(sketch, N)) <= sketch.normalized_rank_error()
+    assert (sketch.count, sketch.min, sketch.max) == (N, 0, N - 1)
+
+
+def test_kll_merged_pages_match_one_stream():
+    values = _shuffled(N, seed=3)
+    stream, merged = KLLSketch(), KLLSketch()
+    for chunk in _pages(values):
+        stream.update(chunk)
+        partial = KLLSketch()
+        partial.update(chunk)
+        merged.merge(partial)
+    assert (merged.count, merged.min, merged.max) == (stream.count, stream.min, stream.max)
+    assert merged.normalized_rank_error() == stream.normalized_rank_error()
+    for sketch in (merged, stream):
+        assert max(_rank_errors(sketch, N)) <= sketch.normalized_rank_error()
+
+
+def test_kll_merge_leaves_other_unchanged():
+    other = KLLSketch()
+    other.update(_shuffled(5000))
+    before = (copy.deepcopy(other.levels), other.count, other.min, other.max)
+    target = KLLSketch()
+    target.update(range(5000, 8000))
+    target.merge(other)
+    assert (other.levels, other.count, other.min, other.max) == before
+
+
+# --- Through the aggregator -------------------------------------------------------
+
+OPERATIONS = [
+    AggregationOperation(operation="count"),
+    AggregationOperation(operation="approx_distinct", field="customer"),
+    AggregationOperation(operation="median", field="amount"),
+    AggregationOperation(operation="percentile", field="amount", percentile=95),
+]
+
+
+def _rows(n: int) -> list[dict]:
+    rng = random.Random(7)
+    return [
+        {"customer": f"c{rng.randrange(n // 4)}", "amount": rng.randrange(n), "region": i % 3}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("group_by", [None, "region"])
+def test_aggregator_pages_merge_like_one_stream(group_by):
+    rows = _rows(20_000)
+    stream = StreamingAggregator(OPERATIONS, group_by)
+    merged = StreamingAggregator(OPERATIONS, group_by)
+    for page in _pages(rows):
+        stream.add_rows(page)
+        partial = StreamingAggregator(OPERATIONS, group_by)
+        partial.add_rows(page)
+        before = copy.deepcopy(partial.groups)
+        merged.merge(partial)
+        assert partial.groups.keys() == before.keys()
+        for key, state in partial.groups.items():
+            hll, kll = state.distinct["customer"], state.quantiles["amount"]
+            assert hll.registers == before[key].distinct["customer"].registers
+            assert kll.levels == before[key].quantiles["amount"].levels
+    assert merged.rows_scanned == stream.rows_scanned == len(rows)
+    for key, state in stream.groups.items():
+        mine, theirs = merged.groups[key].result(OPERATIONS), state.result(OPERATIONS)
+        assert mine["count"] == theirs["count"]
+        assert mine["approx_distinct"] == theirs["approx_distinct"]
+        assert mine["error_bounds"] == theirs["error_bounds"]
+        # Quantiles may differ between the two, each within the reported rank error
+        amounts = sorted(
+            row["amount"] for row in rows if group_by is None or row[group_by] == key
+        )
+        for result in (mine, theirs):
+            for name, q in (("median", 0.5), ("percentile", 0.95)):
+                rank = sum(a <= result[name] for a in amounts) / len(amounts)
+                assert abs(rank - q) <= result["error_bounds"][name] + 1 / len(amounts)
+
+
+def test_aggregator_reports_zero_error_while_exact():
+    rows = [{"customer": f"c{i}", "amount": i} for i in range(HLL_EXACT_LIMIT)]
+    aggregator = StreamingAggregator(OPERATIONS)
+    aggregator.add_rows(rows)
+    result = aggregator.groups[None].result(OPERATIONS)
+    assert result["approx_distinct"] == HLL_EXACT_LIMIT
+    assert result["error_bounds"]["approx_distinct"] == 0.0
+    aggregator.add_rows([{"customer": "one more", "amount": 0}])
+    assert aggregator.groups[None].result(OPERATIONS)["error_bounds"]["approx_distinct"] > 0
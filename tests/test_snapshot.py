@@ -0,0 +1,135 @@
+"""Local dataset snapshots: full loads from the Gateway and background editlog catch-up."""
+
+import sqlite3
+import time
+
+import pytest
+
+from db import snapshot as snapshots
+from db.snapshot import get_fresh_snapshot, snapshot_count, snapshot_view
+from tools.query_dataset import datagroom_query_dataset
+from utils.cursor import keyset_sorters
+
+
+@pytest.fixture
+def snapshot_config(overrides, tmp_path):
+    overrides(
+        snapshot_datasets=["ds"],
+        snapshot_dir=str(tmp_path),
+        snapshot_ttl=60.0,
+        snapshot_page_size=7,
+        snapshot_concurrency=4,
+    )
+
+
+@pytest.fixture
+def gateway_mongo(mongo, overrides):
+    """mongomock holds the editlog (and the rows edits are re-read from); rows come via Gateway."""
+    overrides(backend="gateway")
+    return mongo
+
+
+def _rows(count: int) -> list[dict]:
+    return [{"_id": f"r{i:03d}", "n": i} for i in range(count)]
+
+
+async def _loaded(dataset: str) -> snapshots.Snapshot:
+    assert await get_fresh_snapshot(dataset) is None  # first call starts the load
+    await snapshots._snapshots[dataset].refresh_task
+    snapshot = await get_fresh_snapshot(dataset)
+    assert snapshot is not None
+    return snapshot
+
+
+async def _ids(snapshot: snapshots.Snapshot) -> list[str]:
+    page = await snapshot_view(snapshot, None, keyset_sorters(None), limit=1000)
+    return [row["_id"] for row in page["data"]]
+
+
+async def test_full_load_reads_every_row_once(stub_gateway, gateway_mongo, snapshot_config):
+    rows = _rows(100)
+    async with stub_gateway({"ds": rows}):
+        snapshot = await _loaded("ds")
+    assert await snapshot_count(snapshot) == 100
+    assert await _ids(snapshot) == [row["_id"] for row in rows]
+
+
+async def test_full_load_fails_when_rows_are_missing(
+    stub_gateway, gateway_mongo, snapshot_config, monkeypatch
+):
+    async def _short_pages(*args, **kwargs):
+        yield {"total": 20, "data": _rows(7)}
+        yield {"total": 20, "data": _rows(14)[7:]}  # the third page never arrives
+
+    monkeypatch.setattr(snapshots, "iter_view_pages", _short_pages)
+    assert await get_fresh_snapshot("ds") is None
+    snapshot = snapshots._snapshots["ds"]
+    await snapshot.refresh_task
+    assert snapshot.failed_at is not None
+    assert snapshot.refreshed_at is None
+    assert await get_fresh_snapshot("ds") is None
+
+
+async def test_stale_snapshot_is_served_while_catching_up(
+    stub_gateway, gateway_mongo, snapshot_config
+):
+    from bson import ObjectId
+
+    rows = _rows(10)
+    gateway_mongo.sync["ds"]["data"].insert_many([dict(row) for row in rows])
+    async with stub_gateway({"ds": rows}):
+        snapshot = await _loaded("ds")
+    # Edit one row and let the snapshot go stale
+    gateway_mongo.sync["ds"]["data"].update_one({"_id": "r003"}, {"$set": {"n": 300}})
+    gateway_mongo.sync["ds"]["editlog"].insert_one(
+        {"_id": ObjectId(), "selector": {"_id": "r003"}}
+    )
+    snapshot.refreshed_at = time.time() - 120
+
+    served = await get_fresh_snapshot("ds")
+    assert served is snapshot  # no waiting for the editlog round trip
+    assert snapshot.catching_up
+    await snapshot.refresh_task
+    assert snapshot.is_fresh() and not snapshot.catching_up
+    page = await snapshot_view(snapshot, [{"field": "_id", "type": "eq", "value": "r003"}])
+    assert page["data"][0]["n"] == 300
+
+
+async def test_numeric_ids_keep_order_across_backend_and_snapshot(
+    stub_gateway, gateway_mongo, snapshot_config
+):
+    rows = [{"_id": i, "n": i} for i in range(1, 15)]
+    async with stub_gateway({"ds": rows}):
+        # The first page comes from the Gateway while the snapshot loads
+        page = (
+            await datagroom_query_dataset("ds", max_rows=5, response_format="json")
+        ).structured_content
+        assert [row["_id"] for row in page["data"]] == [1, 2, 3, 4, 5]
+        snapshot = snapshots._snapshots["ds"]
+        await snapshot.refresh_task
+        assert snapshot.is_fresh()
+        seen = [row["_id"] for row in page["data"]]
+        while page["has_more"]:
+            page = (
+                await datagroom_query_dataset(
+                    "ds", max_rows=5, cursor=page["next_cursor"], response_format="json"
+                )
+            ).structured_content
+            seen.extend(row["_id"] for row in page["data"])
+    assert seen == list(range(1, 15))
+    assert await _ids(snapshot) == list(range(1, 15))
+
+
+def test_snapshot_files_with_an_older_layout_are_reloaded(snapshot_config):
+    path = snapshots._snapshot_path("ds")
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        "CREATE TABLE rows (_id TEXT PRIMARY KEY, doc TEXT NOT NULL);"
+        "CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);"
+        "INSERT INTO meta VALUES ('refreshed_at', '1e12'), ('row_count', '0');"
+    )
+    conn.commit()
+    conn.close()
+    snapshot = snapshots.Snapshot("ds", path)
+    snapshots._load_meta(snapshot)
+    assert snapshot.refreshed_at is None
@@ -1,26 +1,55 @@
 """
 Tool: datagroom_aggregate_dataset - Perform aggregations on dataset (matches TS aggregateDataset.ts).
-Only count (without group_by) is supported via Gateway; sum/avg/min/max require future Gateway endpoint.
+Ungrouped count uses the Gateway total; everything else streams filtered pages from viewViaPost
+through the client-side aggregation engine in utils/aggregation.py.
+Datasets on the direct Mongo backend run a single $match/$group pipeline instead (or stream
+through the engine for approx_distinct/median/percentile), and datasets with a fresh local
+snapshot are aggregated from it.
+Gateway pages are reduced independently as they arrive and each page's partial state is cached,
+so repeated aggregations over the same filters merge cached partials instead of re-reading rows.
 """
 
+import asyncio
 import logging
-from urllib.parse import quote
+import math
 
-from utils.authenticated_request import make_authenticated_request
+from fastmcp.tools.tool import ToolResult
+
+from config import config
+from db.queries import iter_mongo_batches, mongo_aggregate, mongo_count
+from db.snapshot import get_fresh_snapshot, snapshot_aggregate, snapshot_count
+from schemas import AggregationOperation, AggregationResult, Filter
+from utils.aggregation import SKETCH_OPERATIONS, StreamingAggregator
+from utils.backend import get_backend
+from utils.cache import TTLCache
+from utils.cursor import keyset_sorters
 from utils.error_handlers import format_error
+from utils.formatters import format_aggregation_results
+from utils.gateway_views import fetch_view_page, view_cache_key, view_ttl
+from utils.timing import phase
 
 logger = logging.getLogger(__name__)
 
+# Per-page partial aggregation states: (page key, state signature) -> (total, aggregator)
+_partials = TTLCache(
+    "aggregate_partials",
+    max_entries=config["aggregate_partial_cache_max_entries"],
+    ttl=config["query_cache_ttl"],
+    max_bytes=config["aggregate_partial_cache_max_bytes"],
+)
+
 AGGREGATE_DATASET_DESCRIPTION = """Perform aggregations on a Datagroom dataset without fetching all rows.
 
-Use this for statistics, counts, sums, averages, min/max values. Supports optional grouping.
+Use this for statistics, counts, sums, averages, min/max values, distinct counts and percentiles.
+Supports optional grouping.
 
 Args:
   - dataset_name (string, required): Name of the dataset
   - filters (array, optional): Array of filter objects (same format as query_dataset)
   - aggregations (array, required): Array of aggregation objects with:
-    - operation: 'count', 'sum', 'avg', 'min', or 'max'
-    - field: Field name (required for sum/avg/min/max, not for count)
+    - operation: 'count', 'sum', 'avg', 'min', 'max', 'approx_distinct', 'median', or 'percentile'
+    - field: Field name (required for every operation except count)
+    - percentile: Percentile rank 0-100 (required for 'percentile', e.g. 95)
   - group_by (string, optional): Field name to group results by
 
 Returns:
@@ -33,11 +62,103 @@ Returns:
     - avg: Average value (if avg aggregation requested)
     - min: Minimum value (if min aggregation requested)
     - max: Maximum value (if max aggregation requested)
+    - approx_distinct: Number of distinct non-null values (HyperLogLog; exact up to 256 values)
+    - median / percentile: Approximate quantile of numeric values (KLL sketch)
+    - error_bounds: Per approximate operation, the relative standard error (approx_distinct)
+      or rank error as a fraction of rows (median/percentile); 0 means exact
 
 Examples:
   - Total sum: aggregations=[{operation: "sum", field: "amount"}]
   - Count by status: aggregations=[{operation: "count"}], group_by="status"
-  - Average order value by customer: aggregations=[{operation: "avg", field: "order_value"}], group_by="customer_id\""""
+  - Average order value by customer: aggregations=[{operation: "avg", field: "order_value"}], group_by="customer_id"
+  - Unique customers: aggregations=[{operation: "approx_distinct", field: "customer_id"}]
+  - p95 latency by endpoint: aggregations=[{operation: "percentile", field: "latency_ms", percentile: 95}], group_by="endpoint\""""
+
+
+def _check_row_limit(total: int) -> None:
+    if total > config["aggregate_max_rows"]:
+        raise RuntimeError(
+            f"{total:,} rows match; client-side aggregation is limited to "
+            f"{config['aggregate_max_rows']:,} rows. Add filters to narrow the query."
+        )
+
+
+async def _stream_aggregate(
+    dataset_name: str,
+    operations: list[AggregationOperation],
+    filters: list[dict],
+    group_by: str | None,
+) -> StreamingAggregator:
+    """
+    Aggregate every matching Gateway page. Pages are fetched up to AGGREGATE_CONCURRENCY at a
+    time and each is reduced to its own partial state (cached per page); partials are merged in
+    page order, so sketch results do not depend on which page arrived first. Pages are sorted by
+    _id so offset pages neither overlap nor skip rows.
+    """
+    per_page = config["aggregate_page_size"]
+    aggregator = StreamingAggregator(operations, group_by)
+    # Partials depend on the columns reduced, not on which operations read them
+    signature = (
+        group_by,
+        tuple(aggregator.fields),
+        tuple(aggregator.distinct_fields),
+        tuple(aggregator.quantile_fields),
+    )
+    ttl = view_ttl(dataset_name)
+    sorters = keyset_sorters(None)
+
+    async def _partial(page: int) -> tuple[int, StreamingAggregator]:
+        key = (view_cache_key(dataset_name, filters, sorters, page, per_page), signature)
+        cached = _partials.get(key)
+        if cached is not None:
+            return cached
+        response = await fetch_view_page(
+            dataset_name, filters, sorters, page=page, per_page=per_page, use_cache=False
+        )
+        partial = StreamingAggregator(operations, group_by)
+        partial.add_rows(response.get("data") or [])
+        value = (response.get("total") or 0, partial)
+        _partials.set(key, value, ttl=ttl, size=partial.size_hint())
+        return value
+
+    total, first = await _partial(1)
+    _check_row_limit(total)
+    aggregator.merge(first)
+    semaphore = asyncio.Semaphore(max(config["aggregate_concurrency"], 1))
+
+    async def _bounded(page: int) -> tuple[int, StreamingAggregator]:
+        async with semaphore:
+            return await _partial(page)
+
+    tasks = [
+        asyncio.ensure_future(_bounded(page))
+        for page in range(2, math.ceil(total / per_page) + 1)
+    ]
+    try:
+        for task in tasks:
+            _, partial = await task
+            aggregator.merge(partial)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return aggregator
+
+
+async def _mongo_stream_aggregate(
+    dataset_name: str,
+    operations: list[AggregationOperation],
+    filters: list[dict],
+    group_by: str | None,
+) -> StreamingAggregator:
+    """Sketch operations on the Mongo backend: stream matching documents through the engine."""
+    _check_row_limit(await mongo_count(dataset_name, filters))
+    aggregator = StreamingAggregator(operations, group_by)
+    async for batch in iter_mongo_batches(
+        dataset_name, filters, batch_size=config["aggregate_page_size"]
+    ):
+        aggregator.add_rows(batch)
+    return aggregator
 
 
 async def datagroom_aggregate_dataset(
@@ -46,28 +167,42 @@ async def datagroom_aggregate_dataset(
     filters: list[dict] | None = None,
     group_by: str | None = None,
 ):
-    """Run aggregations; only count (no group_by) is supported via Gateway."""
-    if not dataset_name or not dataset_name.strip():
-        raise ValueError("Dataset name is required")
-    if not aggregations or len(aggregations) < 1:
-        raise ValueError("At least one aggregation is required")
-    for agg in aggregations:
-        op = agg.get("operation")
-        if op != "count" and (not agg.get("field") or not str(agg.get("field", "")).strip()):
-            raise ValueError("Field is required for sum, avg, min, and max operations")
+    """Run aggregations: ungrouped count via the Gateway total, everything else client-side."""
+    with phase("validation"):
+        if not dataset_name or not dataset_name.strip():
+            raise ValueError("Dataset name is required")
+        if not aggregations or len(aggregations) < 1:
+            raise ValueError("At least one aggregation is required")
+        for agg in aggregations:
+            op = agg.get("operation")
+            if op != "count" and (not agg.get("field") or not str(agg.get("field", "")).strip()):
+                raise ValueError("Field is required for every operation except count")
+            if op == "percentile" and agg.get("percentile") is None:
+                raise ValueError("percentile (0-100) is required for the percentile operation")
+        operations = [AggregationOperation(**agg) for agg in aggregations]
+        seen_ops = [op.operation for op in operations]
+        if len(set(seen_ops)) != len(seen_ops):
+            raise ValueError("Each aggregation operation may appear at most once per request")
     filters = filters or []
-    # Only count without group_by is implemented via Gateway (viewViaPost with per_page=1)
-    if len(aggregations) == 1 and aggregations[0].get("operation") == "count" and not group_by:
+    with phase("filters"):
+        for f in filters:
+            Filter(**f)
+    use_mongo = get_backend(dataset_name) == "mongo"
+    snapshot = await get_fresh_snapshot(dataset_name)
+    # Ungrouped count only needs the Gateway total (viewViaPost with per_page=1)
+    if len(operations) == 1 and operations[0].operation == "count" and not group_by:
         try:
-            gateway_response = await make_authenticated_request(
-                f"/ds/viewViaPost/{quote(dataset_name, safe='')}/default/mcp",
-                "POST",
-                {"filters": filters, "sorters": [], "page": 1, "per_page": 1},
-            )
-            total = gateway_response.get("total")
-            if total is None:
-                total = len(gateway_response.get("data") or [])
-            from fastmcp.tools.tool import ToolResult
+            if snapshot is not None:
+                total = await snapshot_count(snapshot, filters)
+            elif use_mongo:
+                total = await mongo_count(dataset_name, filters)
+            else:
+                gateway_response = await fetch_view_page(
+                    dataset_name, filters, [], page=1, per_page=1
+                )
+                total = gateway_response.get("total")
+                if total is None:
+                    total = len(gateway_response.get("data") or [])
             return ToolResult(
                 content=f"Count: {total}",
                 structured_content={"count": total},
@@ -75,8 +210,32 @@ async def datagroom_aggregate_dataset(
         except Exception as e:
             logger.exception("aggregate_dataset failed")
             raise RuntimeError(f"Error aggregating dataset: {format_error(e)}") from e
-    # sum/avg/min/max and group_by require a Gateway aggregate endpoint (not yet implemented)
-    raise RuntimeError(
-        "Only count aggregation is supported via Gateway at this time. "
-        "sum/avg/min/max and group_by require a future Gateway endpoint."
-    )
+    try:
+        if snapshot is not None:
+            aggregator = await snapshot_aggregate(snapshot, operations, filters, group_by)
+            results = aggregator.results()
+            rows_scanned = aggregator.rows_scanned
+        elif use_mongo and any(op.operation in SKETCH_OPERATIONS for op in operations):
+            aggregator = await _mongo_stream_aggregate(dataset_name, operations, filters, group_by)
+            results = aggregator.results()
+            rows_scanned = aggregator.rows_scanned
+        elif use_mongo:
+            results = await mongo_aggregate(dataset_name, operations, filters, group_by)
+            rows_scanned = None
+        else:
+            aggregator = await _stream_aggregate(dataset_name, operations, filters, group_by)
+            results = aggregator.results()
+            rows_scanned = aggregator.rows_scanned
+    except Exception as e:
+        logger.exception("aggregate_dataset failed")
+        raise RuntimeError(f"Error aggregating dataset: {format_error(e)}") from e
+    percentile = next((op.percentile for op in operations if op.operation == "percentile"), None)
+    with phase("formatting"):
+        text = format_aggregation_results(dataset_name, results, group_by, percentile)
+    with phase("serialization"):
+        structured = AggregationResult(dataset_name=dataset_name, results=results).model_dump(
+            exclude_unset=True
+        )
+    if rows_scanned is not None:
+        structured["rows_scanned"] = rows_scanned
+    return ToolResult(content=text, structured_content=structured)
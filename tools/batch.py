@@ -0,0 +1,181 @@
+"""
+Tool: datagroom_batch - Run several query/count/aggregate/schema/sample operations in one call.
+Each operation is dispatched to the matching datagroom_* tool function, at most BATCH_CONCURRENCY
+at a time, so all operations share the schema/view caches and single-flight fetches of the
+process; identical operations in one batch run once. Failures are reported per operation and
+never fail the batch.
+"""
+
+import asyncio
+import inspect
+import json
+import time
+from typing import Any
+
+from fastmcp.tools.tool import ToolResult
+from pydantic import ValidationError
+
+from config import config
+from schemas import BatchItemResult, BatchOperation, BatchResult
+from tools.aggregate_dataset import datagroom_aggregate_dataset
+from tools.get_schema import datagroom_get_schema
+from tools.query_dataset import datagroom_query_dataset
+from tools.sample_dataset import datagroom_sample_dataset
+
+BATCH_DESCRIPTION = """Run several dataset operations concurrently and return all results in one response.
+
+Use this instead of several sequential calls when you already know the operations you need
+(e.g. a schema, a count and a couple of filtered queries).
+
+Args:
+  - operations (array, required, max: 20): Operation objects, each with:
+    - tool: 'query', 'count', 'aggregate', 'schema' or 'sample'
+    - dataset_name: Dataset the operation runs on
+    - id (string, optional): Your label for the operation, echoed in its result
+    - Any argument of the matching tool:
+      - query: filters, sort, max_rows, offset, cursor, fields, response_format
+      - count: filters, group_by
+      - aggregate: aggregations, filters, group_by
+      - sample: sample_size, stratify_by, allocation, seed, fields, response_format
+      - schema: (none)
+
+Returns:
+  Object containing:
+  - operations / succeeded / failed: Operation counts
+  - results: One entry per operation, in request order, with:
+    - id, tool, dataset_name: The operation
+    - ok: Whether it succeeded
+    - elapsed_ms: Time the operation took
+    - result: The tool's structured result (if ok)
+    - error: Error message (if not ok)
+
+Examples:
+  - Schema plus failed count: operations=[{tool: "schema", dataset_name: "orders"},
+    {tool: "count", dataset_name: "orders", filters: [{field: "status", type: "eq", value: "failed"}]}]
+  - Two filtered queries: operations=[{tool: "query", dataset_name: "orders", id: "eu",
+    filters: [{field: "region", type: "eq", value: "EU"}], max_rows: 10},
+    {tool: "query", dataset_name: "orders", id: "us", filters: [{field: "region", type: "eq", value: "US"}], max_rows: 10}]"""
+
+
+async def _count(
+    dataset_name: str, filters: list[dict] | None = None, group_by: str | None = None
+):
+    """Row count (per group with group_by) via the aggregate tool."""
+    return await datagroom_aggregate_dataset(
+        dataset_name=dataset_name,
+        aggregations=[{"operation": "count"}],
+        filters=filters,
+        group_by=group_by,
+    )
+
+
+_TOOLS = {
+    "query": datagroom_query_dataset,
+    "count": _count,
+    "aggregate": datagroom_aggregate_dataset,
+    "schema": datagroom_get_schema,
+    "sample": datagroom_sample_dataset,
+}
+# Arguments each operation accepts besides dataset_name
+_ARGUMENTS = {
+    tool: [name for name in inspect.signature(fn).parameters if name != "dataset_name"]
+    for tool, fn in _TOOLS.items()
+}
+
+
+def _parse(raw: Any) -> tuple[BatchOperation, dict[str, Any]]:
+    """Validated operation and the keyword arguments for its tool function."""
+    if not isinstance(raw, dict):
+        raise ValueError("Each operation must be an object")
+    try:
+        op = BatchOperation.model_validate(raw)
+    except ValidationError as e:
+        problems = "; ".join(
+            f"{'.'.join(map(str, err['loc'])) or 'operation'}: {err['msg']}" for err in e.errors()
+        )
+        raise ValueError(f"Invalid operation: {problems}") from None
+    arguments = dict(op.model_extra or {})
+    unknown = sorted(set(arguments) - set(_ARGUMENTS[op.tool]))
+    if unknown:
+        raise ValueError(
+            f"Unknown argument(s) for {op.tool}: {', '.join(unknown)} "
+            f"(accepted: {', '.join(_ARGUMENTS[op.tool]) or 'none'})"
+        )
+    return op, arguments
+
+
+def _text(value: Any) -> str | None:
+    return value if isinstance(value, str) else None
+
+
+def _clip(text: str, max_bytes: int) -> str:
+    """Text cut at a line boundary to fit max_bytes."""
+    data = text.encode("utf-8")
+    if len(data) <= max_bytes:
+        return text
+    kept = data[:max_bytes].decode("utf-8", "ignore").rsplit("\n", 1)[0]
+    return f"{kept}\n\n_(shortened to fit the response budget)_"
+
+
+async def datagroom_batch(operations: list[dict]):
+    """Run the operations concurrently (bounded) and collect per-operation results."""
+    if not operations:
+        raise ValueError("operations must contain at least one operation")
+    if len(operations) > config["batch_max_operations"]:
+        raise ValueError(
+            f"At most {config['batch_max_operations']} operations are allowed per batch"
+        )
+    semaphore = asyncio.Semaphore(max(config["batch_concurrency"], 1))
+    # Identical operations (ignoring id) share one run
+    runs: dict[str, asyncio.Task] = {}
+
+    async def _run(tool: str, arguments: dict[str, Any]) -> tuple[Any, float]:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await _TOOLS[tool](**arguments)
+            return result, (time.perf_counter() - started) * 1000
+
+    async def _item(raw: Any) -> tuple[BatchItemResult, str | None]:
+        given = raw if isinstance(raw, dict) else {}
+        item = BatchItemResult(
+            id=_text(given.get("id")),
+            tool=_text(given.get("tool")),
+            dataset_name=_text(given.get("dataset_name")),
+            ok=False,
+        )
+        try:
+            op, arguments = _parse(raw)
+            arguments["dataset_name"] = op.dataset_name
+            key = json.dumps([op.tool, arguments], sort_keys=True, default=str)
+            if key not in runs:
+                runs[key] = asyncio.ensure_future(_run(op.tool, arguments))
+            result, item.elapsed_ms = await runs[key]
+        except Exception as e:
+            item.error = str(e) or type(e).__name__
+            return item, None
+        item.ok = True
+        item.elapsed_ms = round(item.elapsed_ms, 1)
+        item.result = result.structured_content
+        return item, "\n".join(getattr(block, "text", "") for block in result.content)
+
+    outcomes = await asyncio.gather(*(_item(raw) for raw in operations))
+    items = [item for item, _ in outcomes]
+    succeeded = sum(item.ok for item in items)
+    result = BatchResult(
+        operations=len(items),
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        results=items,
+    )
+    # Every operation gets an equal share of the response budget
+    share = max(config["response_max_bytes"] // len(items), 512)
+    sections = [f"# Batch Results: {succeeded} of {len(items)} operations succeeded"]
+    for i, (item, text) in enumerate(outcomes, 1):
+        label = f" ({item.id})" if item.id else ""
+        heading = f"## {i}. {item.tool or 'operation'} {item.dataset_name or ''}".rstrip()
+        body = _clip(text, share) if item.ok else f"**Error**: {item.error}"
+        sections.append(f"{heading}{label}\n\n{body}")
+    return ToolResult(
+        content="\n\n".join(sections),
+        structured_content=result.model_dump(),
+    )
@@ -0,0 +1,210 @@
+"""
+Tool: datagroom_export_dataset - Stream every matching row to a local file (NDJSON, CSV, Parquet).
+Pages are prefetched concurrently while a worker thread writes the previous ones, with a bounded
+queue between them, so memory stays flat regardless of dataset size. A fields projection is
+pushed down to the backend, so only the exported columns are transferred.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+from fastmcp.tools.tool import ToolResult
+
+from config import config
+from db.queries import iter_mongo_batches
+from schemas import Filter, Sort
+from utils.backend import get_backend
+from utils.cursor import keyset_sorters
+from utils.error_handlers import format_error
+from utils.exporters import EXPORT_FORMATS, ChunkWriter, open_writer
+from utils.gateway_views import iter_view_pages
+from utils.projection import fetch_fields, normalize_fields, project_rows
+from utils.timing import phase
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DATASET_DESCRIPTION = """Export all rows of a Datagroom dataset that match the filters to a local file.
+
+Use this when the full result is needed (analysis in other tools, archiving). It is not limited to 1000 rows:
+rows are streamed page by page to the file, and only a short summary is returned.
+
+Args:
+  - dataset_name (string, required): Name of the dataset
+  - format (string, optional, default: 'ndjson'): 'ndjson', 'csv' or 'parquet'
+  - filters (array, optional): Array of filter objects (same format as query_dataset)
+  - sort (object, optional): Sort configuration (same format as query_dataset)
+  - output_path (string, optional): File name relative to the server's export directory
+    (default: '<dataset>-<timestamp>.<format>')
+  - fields (array, optional): Columns to export (plus _id); default is every column
+
+Returns:
+  Object containing:
+  - dataset_name: Name of the dataset
+  - path: Absolute path of the written file
+  - format: File format
+  - rows_written: Number of rows exported
+  - bytes_written: File size in bytes
+  - elapsed_seconds: Export duration
+  - rows_per_second / mb_per_second: Throughput
+  - warning: Present if columns were dropped or values could not be typed
+
+Examples:
+  - Export failed transactions: filters=[{field: "status", type: "eq", value: "failed"}], format="csv"
+  - Full dataset to Parquet: format="parquet\""""
+
+_EXTENSIONS = {"ndjson": "ndjson", "csv": "csv", "parquet": "parquet"}
+
+
+def _resolve_output_path(dataset_name: str, output_path: str | None, fmt: str) -> Path:
+    """Output file inside EXPORT_DIR (absolute paths and '..' escapes are rejected)."""
+    export_dir = Path(config["export_dir"]).resolve()
+    if not output_path:
+        safe_name = re.sub(r"[^A-Za-z0-9._-]", "_", dataset_name)
+        output_path = f"{safe_name}-{time.strftime('%Y%m%d-%H%M%S')}.{_EXTENSIONS[fmt]}"
+    path = (export_dir / output_path).resolve()
+    if not path.is_relative_to(export_dir) or path == export_dir:
+        raise ValueError("output_path must be a file name inside the export directory (EXPORT_DIR)")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+async def _iter_rows(
+    dataset_name: str,
+    filters: list[dict],
+    sorters: list[dict],
+    fields: list[str] | None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    request_fields = fetch_fields(fields, *(s["field"] for s in sorters))
+    if get_backend(dataset_name) == "mongo":
+        async for batch in iter_mongo_batches(
+            dataset_name,
+            filters,
+            sorters,
+            batch_size=config["export_page_size"],
+            fields=request_fields,
+        ):
+            yield project_rows(batch, fields)
+        return
+    async for page in iter_view_pages(
+        dataset_name,
+        filters,
+        sorters,
+        per_page=config["export_page_size"],
+        concurrency=config["export_concurrency"],
+        fields=request_fields,
+    ):
+        yield project_rows(page.get("data") or [], fields)
+
+
+async def _pipeline(writer: ChunkWriter, chunks: AsyncIterator[list[dict[str, Any]]]) -> None:
+    """Feed chunks to a writer thread through a bounded queue (fetch overlaps with writing)."""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(config["export_concurrency"], 1))
+    # Cancelling does not stop a thread, so the write in progress is tracked and awaited below
+    write: asyncio.Future | None = None
+
+    async def _drain() -> None:
+        nonlocal write
+        while True:
+            rows = await queue.get()
+            if rows is None:
+                return
+            write = asyncio.ensure_future(asyncio.to_thread(writer.write_chunk, rows))
+            await asyncio.shield(write)
+
+    writer_task = asyncio.create_task(_drain())
+    try:
+        async for rows in chunks:
+            put = asyncio.ensure_future(queue.put(rows))
+            await asyncio.wait({put, writer_task}, return_when=asyncio.FIRST_COMPLETED)
+            if writer_task.done():
+                put.cancel()
+                writer_task.result()
+                raise RuntimeError("Export writer stopped unexpectedly")
+        await queue.put(None)
+        await writer_task
+    finally:
+        if not writer_task.done():
+            writer_task.cancel()
+        if write is not None:
+            # The writer is closed next, never while a chunk is still being written
+            await asyncio.gather(write, return_exceptions=True)
+
+
+async def datagroom_export_dataset(
+    dataset_name: str,
+    format: str = "ndjson",
+    filters: list[dict] | None = None,
+    sort: dict | None = None,
+    output_path: str | None = None,
+    fields: list[str] | None = None,
+):
+    """Stream all matching rows to a file under EXPORT_DIR and report throughput."""
+    with phase("validation"):
+        if not dataset_name or not dataset_name.strip():
+            raise ValueError("Dataset name is required")
+        fmt = (format or "").lower()
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+        if sort:
+            Sort(**sort)
+        fields = normalize_fields(fields)
+        path = _resolve_output_path(dataset_name, output_path, fmt)
+    filters = filters or []
+    with phase("filters"):
+        for f in filters:
+            Filter(**f)
+    part_path = path.with_name(path.name + ".part")
+    started = time.perf_counter()
+    writer = open_writer(fmt, part_path)
+    try:
+        await _pipeline(writer, _iter_rows(dataset_name, filters, keyset_sorters(sort), fields))
+        await asyncio.to_thread(writer.close)
+        part_path.replace(path)
+    except Exception as e:
+        logger.exception("export_dataset failed")
+        try:
+            writer.close()
+        except Exception:
+            pass
+        part_path.unlink(missing_ok=True)
+        raise RuntimeError(f"Error exporting dataset: {format_error(e)}") from e
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    size = path.stat().st_size
+    warnings = []
+    if writer.dropped_columns:
+        warnings.append(
+            "Columns first seen after the first page were not written: "
+            + ", ".join(sorted(writer.dropped_columns))
+        )
+    if writer.coerced_values:
+        warnings.append(
+            f"{writer.coerced_values:,} values did not match their column type and were written as null"
+        )
+    result = {
+        "dataset_name": dataset_name,
+        "path": str(path),
+        "format": fmt,
+        "rows_written": writer.rows_written,
+        "bytes_written": size,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(writer.rows_written / elapsed, 1),
+        "mb_per_second": round(size / elapsed / 1_000_000, 3),
+        "warning": " ".join(warnings) or None,
+    }
+    lines = [
+        f"# Export Complete: {dataset_name}",
+        "",
+        f"**File**: `{path}`",
+        f"**Format**: {fmt}",
+        f"**Rows Written**: {writer.rows_written:,}",
+        f"**Size**: {size / 1_000_000:,.2f} MB",
+        f"**Elapsed**: {elapsed:,.2f}s",
+        f"**Throughput**: {result['rows_per_second']:,} rows/s, {result['mb_per_second']:,} MB/s",
+    ]
+    if result["warning"]:
+        lines.append(f"**Warning**: {result['warning']}")
+    return ToolResult(content="\n".join(lines), structured_content=result)
@@ -1,16 +1,47 @@
 """
 Tool: datagroom_get_schema - Get dataset structure and sample data (matches TS getSchema.ts).
+Schemas are cached per dataset (LRU + TTL); stale entries are served while they are
+revalidated in the background with If-None-Match / If-Modified-Since.
+Each schema is cached with a column profile (types, nulls, min/max, top values, distinct counts)
+computed from a bounded row sample, fetched concurrently with the columns; revalidations that
+find the schema unchanged keep the cached profile. The schema goes out once, as structured
+content; the text is a column summary with the profile table.
 """
 
-import json
+import asyncio
 import logging
+import random
+from typing import Any
 from urllib.parse import quote
 
-from utils.authenticated_request import make_authenticated_request
+from fastmcp.tools.tool import ToolResult
+
+from config import config
+from db.queries import mongo_sample
+from db.snapshot import get_fresh_snapshot, snapshot_sample
+from schemas import DatasetProfile
+from utils.authenticated_request import raise_for_gateway_status, send_authenticated_request
+from utils.backend import get_backend
+from utils.cache import CacheEntry, TTLCache
+from utils.cursor import keyset_sorters
 from utils.error_handlers import format_error
+from utils.formatters import format_column_profile, format_schema_summary
+from utils.gateway_views import fetch_view_window
+from utils.json_codec import loads
+from utils.profiler import profile_rows
+from utils.sampling import page_sample
+from utils.timing import phase
 
 logger = logging.getLogger(__name__)
 
+_schema_cache = TTLCache(
+    "schema",
+    max_entries=config["schema_cache_max_entries"],
+    ttl=config["schema_cache_ttl"],
+    stale_ttl=config["schema_cache_stale_ttl"],
+)
+_revalidating: dict[str, asyncio.Task] = {}
+
 GET_SCHEMA_DESCRIPTION = """Get comprehensive schema information for a Datagroom dataset including column names, types, sample values, and sample data.
 
 This tool helps you understand the structure of a dataset before querying it. Use this FIRST when working with a new dataset.
@@ -30,6 +61,8 @@ Returns:
   - total_rows: Total number of rows in the dataset
   - sample_data: First 5 rows of actual data
   - keys: Primary key fields for the dataset
+  - profile: Per-column profile from a row sample: type histogram, null ratio, min/max,
+    top values and (approximate) distinct count
 
 Examples:
   - Use when: "What columns does the transactions dataset have?"
@@ -41,20 +74,165 @@ Error Handling:
   - Returns error if unable to connect to MongoDB"""
 
 
+def _column_names(gateway_response: Any) -> list[str]:
+    """Column names from the Gateway columns response (list of column defs or a field map)."""
+    columns = gateway_response.get("columns") if isinstance(gateway_response, dict) else None
+    if isinstance(columns, dict):
+        return [str(name) for name in columns]
+    if isinstance(columns, list):
+        names = []
+        for column in columns:
+            name = column.get("field") or column.get("name") if isinstance(column, dict) else column
+            if isinstance(name, str) and name:
+                names.append(name)
+        return names
+    return []
+
+
+async def _sample_rows(dataset_name: str) -> tuple[int, list[dict[str, Any]]]:
+    """(total rows, up to PROFILE_SAMPLE_ROWS random rows) from the snapshot, Mongo or Gateway."""
+    size = config["profile_sample_rows"]
+    snapshot = await get_fresh_snapshot(dataset_name)
+    if snapshot is not None:
+        response = await snapshot_sample(snapshot, size)
+    elif get_backend(dataset_name) == "mongo":
+        response = await mongo_sample(dataset_name, size)
+    else:
+        id_order = keyset_sorters(None)
+
+        async def _fetch(filters: list[dict], skip: int, limit: int) -> dict:
+            return await fetch_view_window(dataset_name, filters, id_order, skip, limit)
+
+        # Fixed seed: the same pages are profiled (and stay cached) until the data changes
+        return await page_sample(_fetch, [], size, random.Random(0))
+    return response["total"], response["data"]
+
+
+async def _try_sample_rows(dataset_name: str) -> tuple[int, list[dict[str, Any]]] | None:
+    """Row sample for the profile; failures only cost the profile, not the schema."""
+    try:
+        return await _sample_rows(dataset_name)
+    except Exception as e:
+        logger.warning("Column profile sample failed for %s: %s", dataset_name, e)
+        return None
+
+
+def _render(dataset_name: str, gateway_response: Any, profile: DatasetProfile | None) -> tuple:
+    """Cached value: (gateway_response, structured_content, text); the text is a summary."""
+    columns = _column_names(gateway_response)
+    if profile is None:
+        return gateway_response, gateway_response, format_schema_summary(dataset_name, columns)
+    profile_dict = profile.model_dump()
+    structured = dict(gateway_response) if isinstance(gateway_response, dict) else {
+        "columns": gateway_response
+    }
+    structured.update(
+        dataset_name=dataset_name, total_rows=profile.total_rows, profile=profile_dict
+    )
+    summary = format_schema_summary(dataset_name, columns, profile.total_rows)
+    return gateway_response, structured, f"{summary}\n\n{format_column_profile(profile_dict)}"
+
+
+async def _profile(
+    dataset_name: str, gateway_response: Any, sample: tuple | None
+) -> DatasetProfile | None:
+    """Column profile of a row sample (None when the sample failed)."""
+    if sample is None:
+        return None
+    total, rows = sample
+    return await asyncio.to_thread(
+        profile_rows, rows, _column_names(gateway_response), total, config["profile_top_k"]
+    )
+
+
+async def _fetch_schema(dataset_name: str, entry: CacheEntry | None = None) -> tuple:
+    """
+    Fetch the schema from the Gateway (conditionally if a cached entry has validators) and
+    cache it with a column profile. A miss samples rows for the profile concurrently with the
+    schema; a revalidation keeps the cached profile unless the schema changed.
+    """
+    headers: dict[str, str] = {}
+    if entry is not None:
+        if entry.meta.get("etag"):
+            headers["If-None-Match"] = entry.meta["etag"]
+        if entry.meta.get("last_modified"):
+            headers["If-Modified-Since"] = entry.meta["last_modified"]
+    request = send_authenticated_request(
+        f"/ds/view/columns/{quote(dataset_name, safe='')}/default/mcp",
+        "GET",
+        headers=headers or None,
+    )
+    if entry is None:
+        response, sample = await asyncio.gather(request, _try_sample_rows(dataset_name))
+    else:
+        response, sample = await request, None
+    not_modified = response.status_code == 304 and entry is not None
+    if not_modified:
+        gateway_response = entry.value[0]
+    else:
+        raise_for_gateway_status(response)
+        with phase("json_decode"):
+            gateway_response = loads(response.content)
+    profile = None
+    if entry is not None and (not_modified or gateway_response == entry.value[0]):
+        profile = entry.meta.get("profile")
+    if profile is not None:
+        value = entry.value
+    else:
+        if entry is not None:
+            sample = await _try_sample_rows(dataset_name)
+        profile = await _profile(dataset_name, gateway_response, sample)
+        with phase("formatting"):
+            value = _render(dataset_name, gateway_response, profile)
+    if not_modified:
+        _schema_cache.touch(dataset_name)
+        entry.value = value
+        entry.meta["profile"] = profile
+        return value
+    _schema_cache.set(
+        dataset_name,
+        value,
+        meta={
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "profile": profile,
+        },
+    )
+    return value
+
+
+async def _revalidate(dataset_name: str, entry: CacheEntry) -> None:
+    try:
+        await _fetch_schema(dataset_name, entry)
+    except Exception as e:
+        logger.warning("Background schema refresh failed for %s: %s", dataset_name, e)
+    finally:
+        _revalidating.pop(dataset_name, None)
+
+
+async def get_cached_schema(dataset_name: str) -> tuple:
+    """
+    Return (gateway_response, structured_content, rendered_text) from cache, fetching or
+    revalidating as needed.
+    """
+    entry = _schema_cache.get_entry(dataset_name)
+    if entry is None:
+        return await _fetch_schema(dataset_name)
+    if not entry.is_fresh_now() and dataset_name not in _revalidating:
+        # Stale-while-revalidate: answer now, refresh in the background
+        _revalidating[dataset_name] = asyncio.create_task(_revalidate(dataset_name, entry))
+    return entry.value
+
+
 async def datagroom_get_schema(dataset_name: str):
-    """Get schema and sample data for a dataset via Gateway."""
+    """Get schema and sample data for a dataset via Gateway (cached)."""
     if not dataset_name or not dataset_name.strip():
         raise ValueError("Dataset name is required")
     try:
-        gateway_response = await make_authenticated_request(
-            f"/ds/view/columns/{quote(dataset_name, safe='')}/default/mcp",
-            "GET",
-        )
-        text = json.dumps(gateway_response, indent=2)
-        from fastmcp.tools.tool import ToolResult
+        _, structured, text = await get_cached_schema(dataset_name)
         return ToolResult(
             content=text,
-            structured_content=gateway_response,
+            structured_content=structured,
         )
     except Exception as e:
         logger.exception("get_schema failed")
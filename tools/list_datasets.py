@@ -1,14 +1,37 @@
 """
 Tool: datagroom_list_datasets - List all available datasets (matches TS listDatasets.ts).
+Row counts are added concurrently (at most LIST_DATASETS_COUNT_CONCURRENCY at a time): from a
+fresh snapshot, MongoDB's metadata estimate, or the Gateway view total. Counts are cached; a
+dataset whose count is not ready within LIST_DATASETS_COUNT_TIMEOUT is listed without one while
+the count finishes in the background for the next call.
 """
 
+import asyncio
 import logging
+from typing import Any
 
+from fastmcp.tools.tool import ToolResult
+
+from config import config
+from db.queries import mongo_estimated_count
+from db.snapshot import get_fresh_snapshot, snapshot_count
+from schemas import DatasetInfo, ListDatasetsResult
 from utils.authenticated_request import make_authenticated_request
+from utils.backend import get_backend
+from utils.cache import SingleFlight, TTLCache
 from utils.error_handlers import format_error
+from utils.gateway_views import fetch_view_page
 
 logger = logging.getLogger(__name__)
 
+# dataset name -> approximate row count
+_row_counts = TTLCache(
+    "dataset_row_counts",
+    max_entries=4096,
+    ttl=config["list_datasets_count_ttl"],
+)
+_count_flight = SingleFlight()
+
 LIST_DATASETS_DESCRIPTION = """List all available datasets in the MongoDB instance.
 
 Returns information about each dataset including:
@@ -24,6 +47,7 @@ Returns:
     - name: Dataset name
     - collections: Array of collection names
     - row_count: Approximate number of rows (if available)
+  - warning: Set when some row counts are missing (slow or failed counts)
 
 Examples:
   - "What datasets are available?"
@@ -31,18 +55,80 @@ Examples:
   - "Show me all the datasets\""""
 
 
+async def _fetch_row_count(dataset_name: str) -> int:
+    """Row count from the cheapest source for the dataset's backend, cached."""
+    snapshot = await get_fresh_snapshot(dataset_name)
+    if snapshot is not None:
+        count = await snapshot_count(snapshot)
+    elif get_backend(dataset_name) == "mongo":
+        count = await mongo_estimated_count(dataset_name)
+    else:
+        response = await fetch_view_page(dataset_name, [], [], page=1, per_page=1)
+        count = response.get("total")
+        if count is None:
+            count = len(response.get("data") or [])
+    _row_counts.set(dataset_name, count)
+    return count
+
+
+async def _row_count(dataset_name: str, slots: asyncio.Semaphore) -> int | None:
+    """Cached or freshly fetched row count; None if it failed or did not finish in time."""
+    count = _row_counts.get(dataset_name)
+    if count is not None:
+        return count
+    async with slots:
+        try:
+            # The single-flight task is shielded: after a timeout it still completes and caches
+            return await asyncio.wait_for(
+                _count_flight.do(dataset_name, lambda: _fetch_row_count(dataset_name)),
+                timeout=config["list_datasets_count_timeout"],
+            )
+        except asyncio.TimeoutError:
+            logger.info("Row count for %s not ready in time", dataset_name)
+        except Exception as e:
+            logger.warning("Row count for %s failed: %s", dataset_name, format_error(e))
+    return None
+
+
+def _collections(entry: dict[str, Any]) -> list[str]:
+    collections = entry.get("collections")
+    if not isinstance(collections, list):
+        return []
+    return [c.get("name", "") if isinstance(c, dict) else str(c) for c in collections]
+
+
 async def datagroom_list_datasets():
-    """List datasets via Gateway."""
+    """List datasets via Gateway, with approximate row counts gathered concurrently."""
     try:
         gateway_response = await make_authenticated_request("/ds/dsList/mcp", "GET")
-        db_list = gateway_response.get("dbList") or []
-        names = [d.get("name", "") for d in db_list if isinstance(d, dict)]
-        text = f"Datasets ({len(names)}): {', '.join(names) or 'none'}"
-        from fastmcp.tools.tool import ToolResult
-        return ToolResult(
-            content=text,
-            structured_content={"datasets": names, "dbList": gateway_response.get("dbList")},
-        )
     except Exception as e:
         logger.exception("list_datasets failed")
         raise RuntimeError(f"Error listing datasets: {format_error(e)}") from e
+    db_list = [d for d in gateway_response.get("dbList") or [] if isinstance(d, dict)]
+    names = [d.get("name", "") for d in db_list]
+    slots = asyncio.Semaphore(max(config["list_datasets_count_concurrency"], 1))
+    named = [name for name in names if name]
+    row_counts = dict(zip(named, await asyncio.gather(*(_row_count(n, slots) for n in named))))
+    datasets = [
+        DatasetInfo(name=name, collections=_collections(d), row_count=row_counts.get(name))
+        for name, d in zip(names, db_list)
+    ]
+    result = ListDatasetsResult(datasets=datasets)
+    missing = [d.name for d in datasets if d.name and d.row_count is None]
+    if missing:
+        result.warning = (
+            f"No row count for {len(missing)} dataset(s) ({', '.join(missing)}): counting "
+            f"failed or took longer than {config['list_datasets_count_timeout']:g}s. "
+            "Counts that finish later are cached for the next call."
+        )
+    listed = [
+        f"{d.name} ({d.row_count:,} rows)" if d.row_count is not None else d.name
+        for d in datasets
+    ]
+    text = f"Datasets ({len(names)}): {', '.join(listed) or 'none'}"
+    if result.warning:
+        text += f"\n\n**Warning**: {result.warning}"
+    structured = result.model_dump(exclude_unset=True)
+    # Raw Gateway entries, as returned before row counts were added
+    structured["dbList"] = gateway_response.get("dbList")
+    return ToolResult(content=text, structured_content=structured)
@@ -1,14 +1,35 @@
 """
 Tool: datagroom_query_dataset - Query dataset with structured filters (matches TS queryDataset.ts).
+Supports exact offset paging and keyset (cursor) paging for deep scans.
+Datasets with a fresh local snapshot (db/snapshot.py) are answered from it.
+A fields projection is pushed down to the backend; rows are trimmed to it before formatting.
+Rows are sent once per call: as a markdown table in the text, or (response_format='json') in
+structured_content with the summary as text.
 """
 
 import logging
-from urllib.parse import quote
 
-from schemas import Filter
-from utils.authenticated_request import make_authenticated_request
+from fastmcp.tools.tool import ToolResult
+from pydantic import BaseModel
+
+from config import config
+from db.queries import mongo_view, mongo_view_after
+from db.snapshot import get_fresh_snapshot, snapshot_view, snapshot_view_after
+from schemas import Filter, QueryResult
+from utils.backend import get_backend
+from utils.cursor import (
+    decode_cursor,
+    encode_cursor,
+    keyset_sorters,
+    last_key,
+    query_fingerprint,
+    untag_value,
+)
 from utils.error_handlers import format_error
-from utils.formatters import format_markdown_table, format_query_summary
+from utils.formatters import RESPONSE_FORMATS, format_query_summary, render_markdown_table
+from utils.gateway_views import fetch_view_after, fetch_view_window
+from utils.projection import fetch_fields, normalize_fields, project_rows
+from utils.timing import phase
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +48,13 @@ Args:
     - direction: 'asc' or 'desc'
   - max_rows (number, optional, default: 100, max: 1000): Maximum rows to return
   - offset (number, optional, default: 0): Number of rows to skip (for pagination)
-  - response_format (string, optional, default: 'markdown'): 'markdown' or 'json'
+  - cursor (string, optional): next_cursor from a previous response with the same dataset, filters
+    and sort. Continues right after that page at constant cost, so prefer it over large offsets.
+  - response_format (string, optional, default: 'markdown'): 'markdown' (summary and table as
+    text; structured content has everything below except data) or 'json' (the object below as
+    structured content, with the summary as text)
+  - fields (array, optional): Field names to return (plus _id); other columns are not fetched.
+    Dotted names select nested values, e.g. ["name", "address.city"]
 
 Returns:
   Object containing:
@@ -38,13 +65,16 @@ Returns:
   - offset: Offset used
   - has_more: Whether more rows are available
   - next_offset: Offset for next page (if has_more is true)
-  - data: Array of matching rows
+  - next_cursor: Cursor for the next page (if has_more is true)
+  - data: Array of matching rows (response_format='json'; markdown shows them as a table)
   - warning: Warning message if results truncated
 
 Examples:
   - Find transactions > $1000: filters=[{field: "amount", type: "gt", value: 1000}]
   - Get active users sorted by name: filters=[{field: "status", type: "eq", value: "active"}], sort={field: "name", direction: "asc"}
-  - Paginate results: offset=100, max_rows=50"""
+  - Paginate results: offset=100, max_rows=50
+  - Deep scan: pass the previous response's next_cursor as cursor
+  - Only two columns: fields=["customer", "amount"]"""
 
 
 class QueryFilterInput(BaseModel):
@@ -65,28 +95,89 @@ async def datagroom_query_dataset(
     max_rows: int = 100,
     offset: int = 0,
     response_format: str = "markdown",
+    cursor: str | None = None,
+    fields: list[str] | None = None,
 ):
-    """Query a dataset via Gateway with filters, sort, and pagination."""
-    if not dataset_name or not dataset_name.strip():
-        raise ValueError("Dataset name is required")
-    if max_rows < 1 or max_rows > 1000:
-        raise ValueError("max_rows must be between 1 and 1000")
-    if offset < 0:
-        raise ValueError("offset must be >= 0")
-    filters = filters or []
-    sorters = [sort] if sort else []
-    page = offset // max_rows + 1 if max_rows else 1
+    """Query a dataset via Gateway (or direct Mongo backend) with filters, sort, and pagination."""
+    with phase("validation"):
+        if not dataset_name or not dataset_name.strip():
+            raise ValueError("Dataset name is required")
+        if max_rows < 1 or max_rows > 1000:
+            raise ValueError("max_rows must be between 1 and 1000")
+        if offset < 0:
+            raise ValueError("offset must be >= 0")
+        if cursor and offset:
+            raise ValueError("Use either offset or cursor, not both")
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError("response_format must be 'markdown' or 'json'")
+        filters = filters or []
+        fields = normalize_fields(fields)
+        # Paging needs _id and the sort field even when they are not requested
+        request_fields = fetch_fields(fields, (sort or {}).get("field"))
+        # _id breaks ties so offset pages and cursor pages share one stable order
+        sorters = keyset_sorters(sort)
+        fingerprint = query_fingerprint(dataset_name, filters, sort)
+        after = decode_cursor(cursor, fingerprint) if cursor else None
+    use_mongo = get_backend(dataset_name) == "mongo"
     try:
-        response = await make_authenticated_request(
-            f"/ds/viewViaPost/{quote(dataset_name, safe='')}/default/mcp",
-            "POST",
-            {
-                "filters": filters,
-                "sorters": sorters,
-                "page": page,
-                "per_page": max_rows,
-            },
-        )
+        snapshot = await get_fresh_snapshot(dataset_name)
+        if after is not None:
+            offset = after["o"]
+            if snapshot is not None:
+                response = await snapshot_view_after(
+                    snapshot,
+                    filters,
+                    sort,
+                    untag_value(after["k"]),
+                    untag_value(after["id"]),
+                    max_rows,
+                )
+            elif use_mongo:
+                response = await mongo_view_after(
+                    dataset_name,
+                    filters,
+                    sort,
+                    after["k"],
+                    after["id"],
+                    max_rows,
+                    fields=request_fields,
+                )
+            else:
+                response = await fetch_view_after(
+                    dataset_name,
+                    filters,
+                    sort,
+                    sorters,
+                    untag_value(after["k"]),
+                    untag_value(after["id"]),
+                    max_rows,
+                    fields=request_fields,
+                )
+            if "has_more" in response:
+                # Uncounted keyset page: the total is carried over from the cursor
+                end = offset + len(response.get("data") or [])
+                total = max(after.get("t") or 0, end + 1) if response["has_more"] else end
+            else:
+                # Keyset responses count the rows remaining from this page on
+                total = offset + (response.get("total") or 0)
+            response = {**response, "total": total}
+        elif snapshot is not None:
+            response = await snapshot_view(
+                snapshot, filters, sorters, skip=offset, limit=max_rows
+            )
+        elif use_mongo:
+            response = await mongo_view(
+                dataset_name, filters, sorters, skip=offset, limit=max_rows, fields=request_fields
+            )
+        else:
+            response = await fetch_view_window(
+                dataset_name,
+                filters,
+                sorters,
+                offset=offset,
+                limit=max_rows,
+                fields=request_fields,
+            )
     except Exception as e:
         logger.exception("query_dataset failed")
         raise RuntimeError(f"Error querying dataset: {format_error(e)}") from e
@@ -94,14 +185,81 @@ async def datagroom_query_dataset(
     data = response.get("data") or []
     rows_returned = len(data)
     has_more = offset + rows_returned < total
-    filter_objs = [Filter(**f) for f in filters] if filters else []
-    summary = format_query_summary(
-        dataset_name, total, rows_returned, filter_objs, offset, has_more
-    )
-    data_table = format_markdown_table(data)
-    text = f"{summary}\n\n{data_table}"
-    from fastmcp.tools.tool import ToolResult
-    return ToolResult(
-        content=text,
-        structured_content=response,
-    )
+    next_offset = offset + rows_returned if has_more else None
+    next_cursor = None
+    if has_more:
+        key = response.get("last_key") or last_key(data, sort)
+        if key is not None:
+            next_cursor = encode_cursor(fingerprint, key[0], key[1], next_offset, total)
+    data = project_rows(data, fields)
+    warning = None
+    if offset and offset >= total:
+        warning = f"offset {offset:,} is past the last matching row ({total:,} rows match)."
+    elif has_more:
+        warning = (
+            f"Results truncated at max_rows={max_rows}; {total - next_offset:,} more rows match. "
+            f"Use offset={next_offset} (or cursor=next_cursor) for the next page."
+        )
+    with phase("filters"):
+        filter_objs = [Filter(**f) for f in filters] if filters else []
+
+    def _summary(warning: str | None) -> str:
+        return format_query_summary(
+            dataset_name,
+            total,
+            rows_returned,
+            filter_objs,
+            offset,
+            has_more,
+            next_offset=next_offset,
+            warning=warning,
+        )
+
+    def _result(summary: str, warning: str | None, with_data: bool) -> dict:
+        return QueryResult(
+            dataset_name=dataset_name,
+            query_summary=summary,
+            total_matching=total,
+            rows_returned=rows_returned,
+            offset=offset,
+            has_more=has_more,
+            next_offset=next_offset,
+            next_cursor=next_cursor,
+            data=data,
+            warning=warning,
+        ).model_dump(exclude=None if with_data else {"data"})
+
+    if response_format == "json":
+        with phase("formatting"):
+            summary = _summary(warning)
+        with phase("serialization"):
+            structured = _result(summary, warning, with_data=True)
+        return ToolResult(content=summary, structured_content=structured)
+    with phase("formatting"):
+        summary = _summary(warning)
+        max_bytes = config["response_max_bytes"]
+        # Room for the summary and a budget warning line added below
+        table = render_markdown_table(
+            data,
+            max_bytes=max(max_bytes - len(summary.encode("utf-8")) - 400, 0),
+            max_cell_chars=config["response_max_cell_chars"],
+        )
+        notes = []
+        if table.rows_rendered < rows_returned:
+            notes.append(
+                f"The table shows {table.rows_rendered:,} of {rows_returned:,} returned rows to "
+                f"stay within {max_bytes:,} bytes; use offset={offset + table.rows_rendered} or a "
+                "smaller max_rows to see the rest."
+            )
+        if table.cells_truncated:
+            notes.append(
+                f"{table.cells_truncated:,} cells longer than "
+                f"{config['response_max_cell_chars']:,} characters were shortened in the table."
+            )
+        if notes:
+            warning = " ".join([warning, *notes] if warning else notes)
+            summary = _summary(warning)
+        text = f"{summary}\n\n{table.text}"
+    with phase("serialization"):
+        structured = _result(summary, warning, with_data=False)
+    return ToolResult(content=text, structured_content=structured)
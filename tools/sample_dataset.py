@@ -1,14 +1,41 @@
 """
 Tool: datagroom_sample_dataset - Get stratified random sample of rows (matches TS sampleDataset.ts).
-Stratification not supported by Gateway; returns first page as sample.
+Uniform samples are drawn with a reservoir over random pages (or $sample / a random snapshot
+query when no seed is given); stratified samples allocate rows across the values of a field and
+sample every stratum in parallel (utils/sampling.py). A fields projection is pushed down to the
+backend and rows are trimmed to it. Rows are sent once per call: listed in the text, or
+(response_format='json') in structured_content with the header as text.
 """
 
-import json
 import logging
-from urllib.parse import quote
+import random
 
-from utils.authenticated_request import make_authenticated_request
+from fastmcp.tools.tool import ToolResult
+
+from db.queries import mongo_aggregate, mongo_sample, mongo_view
+from db.snapshot import (
+    Snapshot,
+    get_fresh_snapshot,
+    snapshot_aggregate,
+    snapshot_sample,
+    snapshot_view,
+)
+from schemas import AggregationOperation, SampleResult, StratumSummary
+from utils.backend import get_backend
+from utils.cursor import keyset_sorters
 from utils.error_handlers import format_error
+from utils.formatters import RESPONSE_FORMATS, format_markdown_table
+from utils.gateway_views import fetch_view_window
+from utils.json_codec import dumps_pretty
+from utils.projection import fetch_fields, normalize_fields, project_rows
+from utils.sampling import (
+    ALLOCATIONS,
+    build_strata,
+    page_sample,
+    pilot_value_counts,
+    sample_strata,
+)
+from utils.timing import phase
 
 logger = logging.getLogger(__name__)
 
@@ -20,51 +47,176 @@ Args:
   - dataset_name (string, required): Name of the dataset
   - sample_size (number, optional, default: 20, max: 100): Number of rows to sample
   - stratify_by (string, optional): Field name to stratify sampling by (ensures representation from each group)
+  - allocation (string, optional, default: 'proportional'): How stratified rows are split across groups:
+    'proportional' (by group size, at least one row per group) or 'equal' (same count per group)
+  - seed (number, optional): Random seed; the same seed returns the same sample while the data is unchanged
+  - fields (array, optional): Field names to return (plus _id); other columns are not fetched
+  - response_format (string, optional, default: 'markdown'): 'markdown' (header, strata table and
+    rows as text; structured content has everything below except data) or 'json' (the object
+    below as structured content, with the header as text)
 
 Returns:
   Object containing:
   - dataset_name: Name of the dataset
   - sample_size: Number of rows in sample
   - total_rows: Total number of rows in dataset
-  - data: Array of sampled rows
+  - method: 'uniform' or 'stratified'
+  - strata: Per-group population and sampled row count (stratified only)
+  - data: Array of sampled rows (response_format='json'; markdown lists them in the text)
 
 Examples:
   - Random 20 rows: sample_size=20
   - Stratified by status: sample_size=30, stratify_by="status"
-  - Quick exploration: sample_size=10"""
+  - Same size from every region: sample_size=40, stratify_by="region", allocation="equal"
+  - Reproducible sample: sample_size=10, seed=42"""
+
+_ID_ORDER = keyset_sorters(None)
+
+
+class _RowSource:
+    """Row access for one dataset on its backend (or its fresh snapshot)."""
+
+    def __init__(
+        self,
+        dataset_name: str,
+        snapshot: Snapshot | None,
+        seeded: bool,
+        fields: list[str] | None = None,
+    ):
+        self.dataset_name = dataset_name
+        self.snapshot = snapshot
+        self.use_mongo = snapshot is None and get_backend(dataset_name) == "mongo"
+        self.seeded = seeded
+        # Backend projection (snapshot rows are trimmed by the caller)
+        self.fields = fields
+
+    async def fetch(self, filters: list[dict], skip: int, limit: int) -> dict:
+        """Rows [skip, skip+limit) in _id order plus the match count."""
+        if self.snapshot is not None:
+            return await snapshot_view(self.snapshot, filters, _ID_ORDER, skip=skip, limit=limit)
+        if self.use_mongo:
+            return await mongo_view(
+                self.dataset_name, filters, _ID_ORDER, skip=skip, limit=limit, fields=self.fields
+            )
+        return await fetch_view_window(
+            self.dataset_name, filters, _ID_ORDER, skip, limit, fields=self.fields
+        )
+
+    async def sample(
+        self, filters: list[dict], n: int, rng: random.Random, total: int | None
+    ) -> tuple[int, list[dict]]:
+        """Uniform sample; native random sampling is used when reproducibility is not asked for."""
+        if not self.seeded and self.snapshot is not None:
+            response = await snapshot_sample(self.snapshot, n, filters)
+            return response["total"], response["data"]
+        if not self.seeded and self.use_mongo:
+            response = await mongo_sample(self.dataset_name, n, filters, fields=self.fields)
+            return response["total"], response["data"]
+        return await page_sample(self.fetch, filters, n, rng, total)
+
+    async def value_counts(
+        self, field: str, total: int, rng: random.Random
+    ) -> list[tuple[object, int]]:
+        """(value, rows) per value of field: grouped natively, or from a pilot on the Gateway."""
+        count = [AggregationOperation(operation="count")]
+        if self.snapshot is not None:
+            rows = (await snapshot_aggregate(self.snapshot, count, [], field)).results()
+        elif self.use_mongo:
+            rows = await mongo_aggregate(self.dataset_name, count, [], field)
+        else:
+            return await pilot_value_counts(self.fetch, field, [], total, rng)
+        return [(row.get("group_value"), row.get("count") or 0) for row in rows]
 
 
 async def datagroom_sample_dataset(
     dataset_name: str,
     sample_size: int = 20,
     stratify_by: str | None = None,
+    allocation: str = "proportional",
+    seed: int | None = None,
+    fields: list[str] | None = None,
+    response_format: str = "markdown",
 ):
-    """Get sample rows via Gateway (stratify not supported by gateway)."""
-    if not dataset_name or not dataset_name.strip():
-        raise ValueError("Dataset name is required")
-    if sample_size < 1 or sample_size > 100:
-        raise ValueError("sample_size must be between 1 and 100")
+    """Sample rows uniformly, or stratified by a field, from the dataset's backend."""
+    with phase("validation"):
+        if not dataset_name or not dataset_name.strip():
+            raise ValueError("Dataset name is required")
+        if sample_size < 1 or sample_size > 100:
+            raise ValueError("sample_size must be between 1 and 100")
+        if allocation not in ALLOCATIONS:
+            raise ValueError(f"allocation must be one of: {', '.join(ALLOCATIONS)}")
+        if response_format not in RESPONSE_FORMATS:
+            raise ValueError("response_format must be 'markdown' or 'json'")
+        stratify_by = (stratify_by or "").strip() or None
+        fields = normalize_fields(fields)
+    rng = random.Random(seed)
+    strata = None
     try:
-        gateway_response = await make_authenticated_request(
-            f"/ds/viewViaPost/{quote(dataset_name, safe='')}/default/mcp",
-            "POST",
-            {
-                "filters": [],
-                "sorters": [],
-                "page": 1,
-                "per_page": min(sample_size, 100),
-            },
+        source = _RowSource(
+            dataset_name,
+            await get_fresh_snapshot(dataset_name),
+            seed is not None,
+            # Gateway strata are discovered from the stratify_by values of pilot rows
+            fetch_fields(fields, stratify_by),
         )
+        if stratify_by:
+            total = (await source.fetch([], 0, 1)).get("total") or 0
+            value_counts = await source.value_counts(stratify_by, total, rng)
+            strata = build_strata(stratify_by, [], value_counts, total)
+            await sample_strata(strata, sample_size, allocation, rng, source.sample)
+            data = [row for stratum in strata for row in stratum.rows]
+        else:
+            total, data = await source.sample([], sample_size, rng, None)
     except Exception as e:
         logger.exception("sample_dataset failed")
         raise RuntimeError(f"Error sampling dataset: {format_error(e)}") from e
-    data = gateway_response.get("data") or []
-    if data:
-        text = f"Sample ({len(data)} rows):\n{json.dumps(data, indent=2)}"
-    else:
-        text = "No data in dataset or access denied."
-    from fastmcp.tools.tool import ToolResult
-    return ToolResult(
-        content=text,
-        structured_content=gateway_response,
+    data = project_rows(data, fields)
+    result = SampleResult(
+        dataset_name=dataset_name,
+        sample_size=len(data),
+        total_rows=total,
+        method="stratified" if strata is not None else "uniform",
+        data=data,
     )
+    if seed is not None:
+        result.seed = seed
+    header = f"Sample ({len(data)} of {total:,} rows"
+    if strata is not None:
+        result.stratify_by = stratify_by
+        result.allocation = allocation
+        result.strata = [
+            StratumSummary(
+                value=s.value, other=s.other, population=s.population, sampled=len(s.rows)
+            )
+            for s in strata
+        ]
+        header += f", stratified by {stratify_by}, {allocation} allocation"
+        if any(s.other for s in strata):
+            result.warning = (
+                f"Values of '{stratify_by}' outside the {len(strata) - 1} largest groups "
+                "(or non-scalar values) are sampled together as 'other'."
+            )
+    if response_format == "json":
+        with phase("serialization"):
+            structured = result.model_dump(exclude_unset=True)
+        text = f"{header})." + (f"\n\n{result.warning}" if result.warning else "")
+        return ToolResult(content=text, structured_content=structured)
+    with phase("serialization"):
+        structured = result.model_dump(exclude_unset=True, exclude={"data"})
+    with phase("formatting"):
+        if data:
+            text = f"{header}):\n"
+            if result.strata:
+                table = [
+                    {
+                        stratify_by: "(other)" if s.other else s.value,
+                        "rows": s.population,
+                        "sampled": s.sampled,
+                    }
+                    for s in result.strata
+                ]
+                text += f"{format_markdown_table(table)}\n\n"
+            text += dumps_pretty(data)
+        else:
+            text = "No data in dataset or access denied."
+    return ToolResult(content=text, structured_content=structured)
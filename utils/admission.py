@@ -0,0 +1,253 @@
+"""
+Admission control for Gateway calls (used by utils/authenticated_request.py; utils/resilience.py
+holds a slot per attempt, so retries queue again and backoff sleeps hold no slot).
+A call needs a free slot under three caps: ADMISSION_MAX_IN_FLIGHT overall, ADMISSION_MAX_PER_CALLER
+per caller and ADMISSION_MAX_PER_DATASET per dataset. Calls that cannot start wait in a per-caller
+queue for at most ADMISSION_MAX_WAIT seconds; freed slots go to the waiting caller with the lowest
+weighted virtual time (start-time fair queueing), so one busy caller cannot starve the others.
+When the queues are full (ADMISSION_QUEUE_SIZE overall, ADMISSION_CALLER_QUEUE_SIZE per caller) or
+the wait runs out, the call is rejected at once with OverloadedError and a retry-after hint.
+
+The caller is the bearer token of the incoming MCP request (hashed), else its MCP session, else
+the configured PAT; labels in /stats are what ADMISSION_CALLER_WEIGHTS refers to.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+from config import config
+from utils.error_handlers import OverloadedError
+from utils.metrics import ADMISSION_WAIT
+from utils.timing import phase
+
+logger = logging.getLogger(__name__)
+
+_DATASET_ENDPOINT = re.compile(r"^/ds/(?:viewViaPost|view/columns)/([^/]+)/")
+WAIT_WINDOW = 500
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:12]
+
+
+def current_caller() -> str:
+    """Label of the caller the current request is admitted for."""
+    try:
+        from fastmcp.server.dependencies import get_http_headers
+        headers = get_http_headers(include_all=True)
+    except ImportError:
+        headers = {}
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token.strip():
+        return f"token:{_digest(token.strip())}"
+    if headers.get("mcp-session-id"):
+        return f"session:{_digest(headers['mcp-session-id'])}"
+    return f"pat:{_digest(config['pat_token'] or '')}"
+
+
+def endpoint_dataset(endpoint: str) -> str | None:
+    """Dataset a Gateway endpoint reads (None for dataset-independent endpoints)."""
+    match = _DATASET_ENDPOINT.match(endpoint)
+    return match.group(1) if match else None
+
+
+class _Waiter:
+    __slots__ = ("caller", "dataset", "future", "queued_at")
+
+    def __init__(self, caller: str, dataset: str | None):
+        self.caller = caller
+        self.dataset = dataset
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.queued_at = time.monotonic()
+
+
+class AdmissionController:
+    """In-flight caps with bounded, deadline-limited, weighted-fair wait queues."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.caller_in_flight: Counter[str] = Counter()
+        self.dataset_in_flight: Counter[str] = Counter()
+        self.queues: dict[str, deque[_Waiter]] = {}
+        self.queued = 0
+        # Start-time fair queueing: system virtual time and each caller's last finish tag
+        self.virtual_time = 0.0
+        self.finish_tags: dict[str, float] = {}
+        # Smoothed seconds a slot is held, for retry-after hints
+        self.hold_ewma = 0.1
+        self.waits: deque[float] = deque(maxlen=WAIT_WINDOW)
+        self.counters = Counter(
+            {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0}
+        )
+
+    def _fits(self, caller: str, dataset: str | None) -> bool:
+        limit = config["admission_max_in_flight"]
+        if limit > 0 and self.in_flight >= limit:
+            return False
+        limit = config["admission_max_per_caller"]
+        if limit > 0 and self.caller_in_flight[caller] >= limit:
+            return False
+        limit = config["admission_max_per_dataset"]
+        return not (
+            dataset is not None and limit > 0 and self.dataset_in_flight[dataset] >= limit
+        )
+
+    def _start(self, caller: str, dataset: str | None) -> None:
+        self.in_flight += 1
+        self.caller_in_flight[caller] += 1
+        if dataset is not None:
+            self.dataset_in_flight[dataset] += 1
+        weight = max(config["admission_caller_weights"].get(caller, 1.0), 0.01)
+        start = max(self.virtual_time, self.finish_tags.get(caller, 0.0))
+        self.finish_tags[caller] = start + 1.0 / weight
+        self.virtual_time = start
+        self.counters["admitted"] += 1
+
+    def _finish(self, caller: str, dataset: str | None, held: float) -> None:
+        self.in_flight -= 1
+        self.caller_in_flight[caller] -= 1
+        if self.caller_in_flight[caller] <= 0:
+            del self.caller_in_flight[caller]
+        if dataset is not None:
+            self.dataset_in_flight[dataset] -= 1
+            if self.dataset_in_flight[dataset] <= 0:
+                del self.dataset_in_flight[dataset]
+        self.hold_ewma += 0.1 * (held - self.hold_ewma)
+        self._dispatch()
+
+    def _next_tag(self, caller: str) -> float:
+        weight = max(config["admission_caller_weights"].get(caller, 1.0), 0.01)
+        return max(self.virtual_time, self.finish_tags.get(caller, 0.0)) + 1.0 / weight
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiters, lowest virtual finish time first."""
+        while self.queued:
+            best: _Waiter | None = None
+            best_tag = 0.0
+            for caller, queue in self.queues.items():
+                # A caller's first waiter whose dataset has room (FIFO within a caller otherwise)
+                waiter = next((w for w in queue if self._fits(caller, w.dataset)), None)
+                if waiter is None:
+                    continue
+                tag = self._next_tag(caller)
+                if best is None or tag < best_tag:
+                    best, best_tag = waiter, tag
+            if best is None:
+                return
+            self._dequeue(best)
+            self._start(best.caller, best.dataset)
+            waited = time.monotonic() - best.queued_at
+            self.waits.append(waited)
+            ADMISSION_WAIT.observe(waited)
+            best.future.set_result(None)
+
+    def _dequeue(self, waiter: _Waiter) -> None:
+        queue = self.queues[waiter.caller]
+        queue.remove(waiter)
+        self.queued -= 1
+        if not queue:
+            del self.queues[waiter.caller]
+
+    def retry_after(self) -> float:
+        """Seconds until the current backlog has likely drained."""
+        slots = config["admission_max_in_flight"] or max(self.in_flight, 1)
+        return max(round(self.hold_ewma * (self.queued + 1) / slots, 1), 1.0)
+
+    def _reject(self, reason: str, counter: str) -> OverloadedError:
+        self.counters[counter] += 1
+        return OverloadedError(reason, retry_after=self.retry_after())
+
+    async def acquire(self, caller: str, dataset: str | None) -> None:
+        """Take a slot, waiting in the caller's queue if needed; OverloadedError if not admitted."""
+        # Waiters left after _dispatch are blocked by their own caps, so a call that fits may start
+        if self._fits(caller, dataset):
+            self._start(caller, dataset)
+            self.waits.append(0.0)
+            ADMISSION_WAIT.observe(0.0)
+            return
+        if self.queued >= config["admission_queue_size"]:
+            raise self._reject(
+                f"{self.queued} Gateway calls already waiting", "rejected_queue_full"
+            )
+        queue = self.queues.get(caller)
+        if queue is not None and len(queue) >= config["admission_caller_queue_size"]:
+            raise self._reject(
+                f"{len(queue)} Gateway calls of this caller already waiting", "rejected_queue_full"
+            )
+        waiter = _Waiter(caller, dataset)
+        self.queues.setdefault(caller, deque()).append(waiter)
+        self.queued += 1
+        self.counters["queued"] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), config["admission_max_wait"])
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done():
+                # Granted just as the wait ended: hand the slot back
+                self._finish(caller, dataset, 0.0)
+            else:
+                waiter.future.cancel()
+                self._dequeue(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject(
+                f"no Gateway slot within {config['admission_max_wait']:g}s", "rejected_timeout"
+            ) from None
+
+    def release(self, caller: str, dataset: str | None, held: float) -> None:
+        self._finish(caller, dataset, held)
+
+    def stats(self) -> dict[str, Any]:
+        waits = sorted(self.waits)
+
+        def _quantile(q: float) -> float | None:
+            if not waits:
+                return None
+            return round(waits[min(int(q * len(waits)), len(waits) - 1)] * 1000, 1)
+
+        return {
+            "max_in_flight": config["admission_max_in_flight"],
+            "max_per_caller": config["admission_max_per_caller"],
+            "max_per_dataset": config["admission_max_per_dataset"],
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "queue_depth_by_caller": {c: len(q) for c, q in self.queues.items()},
+            "in_flight_by_caller": dict(self.caller_in_flight),
+            "in_flight_by_dataset": dict(self.dataset_in_flight),
+            **self.counters,
+            "wait_p50_ms": _quantile(0.5),
+            "wait_p95_ms": _quantile(0.95),
+            "wait_p99_ms": _quantile(0.99),
+        }
+
+
+_controller = AdmissionController()
+
+
+@asynccontextmanager
+async def admitted(endpoint: str) -> AsyncIterator[None]:
+    """Hold an admission slot for one Gateway request (one attempt) to endpoint."""
+    caller, dataset = current_caller(), endpoint_dataset(endpoint)
+    with phase("admission"):
+        await _controller.acquire(caller, dataset)
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        _controller.release(caller, dataset, time.monotonic() - started)
+
+
+def reset_admission() -> None:
+    """Start over with no slots held, empty queues and zero counters (benchmarks)."""
+    global _controller
+    _controller = AdmissionController()
+
+
+def get_admission_stats() -> dict[str, Any]:
+    """Caps, in-flight and queued calls (overall, per caller, per dataset), rejections and waits."""
+    return _controller.stats()
@@ -0,0 +1,217 @@
+"""
+Client-side streaming aggregation (count/sum/avg/min/max, approx_distinct and
+median/percentile, with optional group_by).
+Rows are consumed page by page; each page is split into per-group column batches and
+reduced with builtin sum/min/max and mergeable sketches (utils/sketches.py), so memory stays
+bounded by the number of groups. Aggregators of separate pages merge into the aggregate of all
+pages, so pages can be reduced independently and their partial states cached.
+"""
+
+import json
+import math
+from typing import Any
+
+from schemas import AggregationOperation
+from utils.sketches import HyperLogLog, KLLSketch
+
+SKETCH_OPERATIONS = ("approx_distinct", "median", "percentile")
+
+
+def to_number(value: Any) -> float | int | None:
+    """Numeric value of a cell (numbers and numeric strings), or None."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return None if isinstance(value, float) and math.isnan(value) else value
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return None
+        return None if math.isnan(number) else number
+    return None
+
+
+def _group_key(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, sort_keys=True, default=str)
+    return value
+
+
+class GroupState:
+    """Running aggregates for one group (mergeable)."""
+
+    __slots__ = ("group_value", "count", "fields", "distinct", "quantiles")
+
+    def __init__(self, group_value: Any = None):
+        self.group_value = group_value
+        self.count = 0
+        # field -> [sum, numeric_count, num_min, num_max, str_min, str_max]
+        self.fields: dict[str, list] = {}
+        self.distinct: dict[str, HyperLogLog] = {}
+        self.quantiles: dict[str, KLLSketch] = {}
+
+    def _field(self, field: str) -> list:
+        state = self.fields.get(field)
+        if state is None:
+            state = [0.0, 0, None, None, None, None]
+            self.fields[field] = state
+        return state
+
+    def add_column(self, field: str, values: list[Any]) -> None:
+        """Fold one batch of raw column values into the running state."""
+        state = self._field(field)
+        numbers = [n for n in map(to_number, values) if n is not None]
+        if numbers:
+            state[0] += math.fsum(numbers)
+            state[1] += len(numbers)
+            lo, hi = min(numbers), max(numbers)
+            state[2] = lo if state[2] is None else min(state[2], lo)
+            state[3] = hi if state[3] is None else max(state[3], hi)
+        strings = [v for v in values if isinstance(v, str) and to_number(v) is None]
+        if strings:
+            lo, hi = min(strings), max(strings)
+            state[4] = lo if state[4] is None else min(state[4], lo)
+            state[5] = hi if state[5] is None else max(state[5], hi)
+
+    def add_distinct(self, field: str, values: list[Any]) -> None:
+        """Fold non-null values into the field's distinct counter."""
+        sketch = self.distinct.get(field)
+        if sketch is None:
+            sketch = self.distinct[field] = HyperLogLog()
+        sketch.update(v for v in values if v is not None)
+
+    def add_quantiles(self, field: str, values: list[Any]) -> None:
+        """Fold numeric values into the field's quantile sketch."""
+        sketch = self.quantiles.get(field)
+        if sketch is None:
+            sketch = self.quantiles[field] = KLLSketch()
+        sketch.update(n for n in map(to_number, values) if n is not None)
+
+    def merge(self, other: "GroupState") -> None:
+        """Fold another group's state into this one (`other` is left unchanged)."""
+        self.count += other.count
+        for field, o in other.fields.items():
+            state = self._field(field)
+            state[0] += o[0]
+            state[1] += o[1]
+            for i, pick in ((2, min), (3, max), (4, min), (5, max)):
+                if o[i] is not None:
+                    state[i] = o[i] if state[i] is None else pick(state[i], o[i])
+        for field, sketch in other.distinct.items():
+            self.distinct.setdefault(field, HyperLogLog()).merge(sketch)
+        for field, sketch in other.quantiles.items():
+            self.quantiles.setdefault(field, KLLSketch()).merge(sketch)
+
+    def result(self, operations: list[AggregationOperation]) -> dict[str, Any]:
+        row: dict[str, Any] = {}
+        errors: dict[str, float] = {}
+        for op in operations:
+            if op.operation == "count":
+                row["count"] = self.count
+                continue
+            if op.operation == "approx_distinct":
+                hll = self.distinct.get(op.field) or HyperLogLog()
+                row["approx_distinct"] = hll.estimate()
+                errors["approx_distinct"] = round(hll.relative_error, 4)
+                continue
+            if op.operation in ("median", "percentile"):
+                kll = self.quantiles.get(op.field) or KLLSketch()
+                q = 0.5 if op.operation == "median" else op.percentile / 100
+                row[op.operation] = kll.quantile(q)
+                errors[op.operation] = round(kll.normalized_rank_error(), 4)
+                continue
+            total, numeric_count, num_min, num_max, str_min, str_max = self._field(op.field)
+            if op.operation == "sum":
+                row["sum"] = total if numeric_count else None
+            elif op.operation == "avg":
+                row["avg"] = total / numeric_count if numeric_count else None
+            elif op.operation == "min":
+                row["min"] = num_min if num_min is not None else str_min
+            elif op.operation == "max":
+                row["max"] = num_max if num_max is not None else str_max
+        if errors:
+            row["error_bounds"] = errors
+        return row
+
+
+class StreamingAggregator:
+    """Accumulate aggregations over pages of rows; results() renders AggregationResultRow dicts."""
+
+    def __init__(self, operations: list[AggregationOperation], group_by: str | None = None):
+        self.operations = operations
+        self.group_by = group_by
+        self.fields = sorted(
+            {
+                op.field
+                for op in operations
+                if op.operation not in ("count", *SKETCH_OPERATIONS) and op.field
+            }
+        )
+        self.distinct_fields = sorted(
+            {op.field for op in operations if op.operation == "approx_distinct"}
+        )
+        self.quantile_fields = sorted(
+            {op.field for op in operations if op.operation in ("median", "percentile")}
+        )
+        self.groups: dict[Any, GroupState] = {}
+        self.rows_scanned = 0
+
+    def add_rows(self, rows: list[dict[str, Any]]) -> None:
+        """Process one page: partition rows by group, then reduce each column batch."""
+        if not rows:
+            return
+        self.rows_scanned += len(rows)
+        if self.group_by:
+            batches: dict[Any, tuple[Any, list[dict]]] = {}
+            for row in rows:
+                value = row.get(self.group_by)
+                key = _group_key(value)
+                batch = batches.get(key)
+                if batch is None:
+                    batches[key] = (value, [row])
+                else:
+                    batch[1].append(row)
+        else:
+            batches = {None: (None, rows)}
+        for key, (value, batch) in batches.items():
+            state = self.groups.get(key)
+            if state is None:
+                state = self.groups[key] = GroupState(value)
+            state.count += len(batch)
+            for field in self.fields:
+                state.add_column(field, [row.get(field) for row in batch])
+            for field in self.distinct_fields:
+                state.add_distinct(field, [row.get(field) for row in batch])
+            for field in self.quantile_fields:
+                state.add_quantiles(field, [row.get(field) for row in batch])
+
+    def merge(self, other: "StreamingAggregator") -> None:
+        """Fold another aggregator's groups into this one (`other` is left unchanged)."""
+        self.rows_scanned += other.rows_scanned
+        for key, state in other.groups.items():
+            mine = self.groups.get(key)
+            if mine is None:
+                mine = self.groups[key] = GroupState(state.group_value)
+            mine.merge(state)
+
+    def size_hint(self) -> int:
+        """Rough memory footprint in bytes (for byte-bounded caches of partial states)."""
+        size = 0
+        for state in self.groups.values():
+            size += 200 + 150 * len(state.fields)
+            for hll in state.distinct.values():
+                size += 48 * len(hll.hashes) if hll.exact else len(hll.registers) + 100
+            for kll in state.quantiles.values():
+                size += 32 * sum(map(len, kll.levels)) + 100
+        return size
+
+    def results(self) -> list[dict[str, Any]]:
+        """Result rows, largest groups first."""
+        if not self.group_by:
+            state = self.groups.get(None) or GroupState()
+            return [state.result(self.operations)]
+        ordered = sorted(self.groups.values(), key=lambda s: (-s.count, str(s.group_value)))
+        return [
+            {"group_value": s.group_value, **s.result(self.operations)} for s in ordered
+        ]
@@ -1,6 +1,9 @@
 """
 Make authenticated request to Datagroom Gateway (matches TS authenticatedRequest.ts).
 Adds PAT token to Authorization header.
+Requests are admitted by utils/admission.py (in-flight caps, fair queueing, load shedding) and go
+through the shared pooled client in utils/gateway_client.py, with retries, a circuit breaker and
+timeout budgets from utils/resilience.py.
 """
 
 import logging
@@ -10,42 +13,73 @@ import httpx
 
 # Import after config so dotenv is loaded
 from config import config
+from utils.admission import admitted
+from utils.resilience import gateway_request
+from utils.json_codec import loads
+from utils.timing import phase
 
 logger = logging.getLogger(__name__)
 
 
-async def make_authenticated_request(
+async def send_authenticated_request(
     endpoint: str,
     method: str = "GET",
     body: Any = None,
-) -> Any:
+    headers: dict[str, str] | None = None,
+) -> httpx.Response:
     """
-    Make authenticated request to Datagroom Gateway.
+    Send an authenticated request and return the raw response without checking its status.
+    Used where the caller needs response headers or handles 304 Not Modified itself.
     :param endpoint: Gateway endpoint (e.g. '/ds/dsList/mcp')
     :param method: HTTP method
     :param body: Request body (for POST/PUT)
-    :returns: Response JSON
+    :param headers: Extra request headers (e.g. If-None-Match)
+    :returns: httpx.Response
     """
-    headers: dict[str, str] = {"Content-Type": "application/json"}
+    request_headers: dict[str, str] = {"Content-Type": "application/json"}
     if config["pat_token"]:
-        headers["Authorization"] = f"Bearer {config['pat_token']}"
+        request_headers["Authorization"] = f"Bearer {config['pat_token']}"
     else:
         raise RuntimeError(
             "DATAGROOM_PAT_TOKEN not configured. Please set the environment variable."
         )
+    if headers:
+        request_headers.update(headers)
     url = f"{config['datagram_gateway_url']}{endpoint}"
     logger.info("Making authenticated request to: %s", url)
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        if method.upper() == "GET":
-            response = await client.get(url, headers=headers)
-        elif method.upper() == "POST":
-            response = await client.post(url, headers=headers, json=body or {})
-        else:
-            response = await client.request(
-                method, url, headers=headers, json=body
-            )
+    # Each attempt takes its own admission slot; none is held while a retry backs off
+    if method.upper() == "GET":
+        return await gateway_request("GET", endpoint, admit=admitted, headers=request_headers)
+    if method.upper() == "POST":
+        return await gateway_request(
+            "POST", endpoint, admit=admitted, headers=request_headers, json=body or {}
+        )
+    return await gateway_request(
+        method, endpoint, admit=admitted, headers=request_headers, json=body
+    )
+
+
+def raise_for_gateway_status(response: httpx.Response) -> None:
+    """Raise the standard Gateway error for non-2xx responses."""
     if not response.is_success:
         raise RuntimeError(
             f"Gateway request failed ({response.status_code}): {response.text}"
         )
-    return response.json()
+
+
+async def make_authenticated_request(
+    endpoint: str,
+    method: str = "GET",
+    body: Any = None,
+) -> Any:
+    """
+    Make authenticated request to Datagroom Gateway.
+    :param endpoint: Gateway endpoint (e.g. '/ds/dsList/mcp')
+    :param method: HTTP method
+    :param body: Request body (for POST/PUT)
+    :returns: Response JSON
+    """
+    response = await send_authenticated_request(endpoint, method, body)
+    raise_for_gateway_status(response)
+    with phase("json_decode"):
+        return loads(response.content)
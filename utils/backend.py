@@ -0,0 +1,27 @@
+"""
+Execution backend selection: the Datagroom Gateway (default) or direct MongoDB.
+Chosen by DATAGROOM_BACKEND and overridden per dataset by DATAGROOM_BACKEND_DATASETS.
+"""
+
+from typing import Literal
+
+from config import config
+
+Backend = Literal["gateway", "mongo"]
+
+BACKENDS: tuple[str, ...] = ("gateway", "mongo")
+
+
+def get_backend(dataset_name: str) -> Backend:
+    """Backend that serves the given dataset."""
+    backend = config["backend_datasets"].get(dataset_name, config["backend"])
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown backend '{backend}' for dataset '{dataset_name}' (expected gateway or mongo)"
+        )
+    return backend  # type: ignore[return-value]
+
+
+def mongo_backend_enabled() -> bool:
+    """Whether any dataset (or the default) is served directly from MongoDB."""
+    return config["backend"] == "mongo" or "mongo" in config["backend_datasets"].values()
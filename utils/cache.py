@@ -0,0 +1,198 @@
+"""
+In-process caches for Gateway responses (bounded LRU with per-entry TTL and a stale window).
+Every cache registers itself by name so hit/miss counters can be exposed from one place.
+SingleFlight coalesces concurrent identical Gateway calls into one.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any
+
+_caches: dict[str, "TTLCache"] = {}
+
+
+class CacheEntry:
+    __slots__ = ("value", "expires_at", "stale_until", "meta", "size")
+
+    def __init__(
+        self,
+        value: Any,
+        expires_at: float,
+        stale_until: float,
+        meta: dict[str, Any],
+        size: int = 0,
+    ):
+        self.value = value
+        self.expires_at = expires_at
+        self.stale_until = stale_until
+        self.meta = meta
+        self.size = size
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.expires_at
+
+    def is_usable(self, now: float) -> bool:
+        return now < self.stale_until
+
+    def is_fresh_now(self) -> bool:
+        return self.is_fresh(time.monotonic())
+
+
+class TTLCache:
+    """
+    LRU cache with a per-entry TTL and an optional stale-while-revalidate window.
+    get() returns only fresh entries; get_entry() also returns stale ones so callers
+    can serve them while refreshing in the background.
+    When max_bytes is set, entries carry a size and LRU entries are evicted to stay under it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int,
+        ttl: float,
+        stale_ttl: float = 0.0,
+        max_bytes: int | None = None,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._data: OrderedDict[Any, CacheEntry] = OrderedDict()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        _caches[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_entry(self, key: Any) -> CacheEntry | None:
+        """Return the entry if fresh or within its stale window (counts hit/stale/miss)."""
+        entry = self._data.get(key)
+        now = time.monotonic()
+        if entry is None or not entry.is_usable(now):
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        if entry.is_fresh(now):
+            self.hits += 1
+        else:
+            self.stale_hits += 1
+        return entry
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return a fresh value or default."""
+        entry = self._data.get(key)
+        if entry is None or not entry.is_fresh(time.monotonic()):
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(
+        self,
+        key: Any,
+        value: Any,
+        ttl: float | None = None,
+        meta: dict[str, Any] | None = None,
+        size: int = 0,
+    ) -> None:
+        """Insert or replace an entry, evicting least-recently-used entries past the bounds."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        now = time.monotonic()
+        self._remove(key)
+        self._data[key] = CacheEntry(
+            value, now + ttl, now + ttl + self.stale_ttl, meta or {}, size
+        )
+        self.bytes += size
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes
+        ):
+            _, evicted = self._data.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+    def _remove(self, key: Any) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def touch(self, key: Any, ttl: float | None = None) -> None:
+        """Extend an entry's lifetime (e.g. after a 304 Not Modified revalidation)."""
+        entry = self._data.get(key)
+        if entry is None:
+            return
+        now = time.monotonic()
+        ttl = self.ttl if ttl is None else ttl
+        entry.expires_at = now + ttl
+        entry.stale_until = now + ttl + self.stale_ttl
+        self._data.move_to_end(key)
+
+    def invalidate(self, key: Any) -> None:
+        self._remove(key)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key into one in-flight task.
+    The task is shielded, so a cancelled caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._calls: dict[Any, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: Any, fn) -> Any:
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: Any, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Retrieve the exception so it is not reported as unhandled if every caller went away
+        if not task.cancelled():
+            task.exception()
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def get_cache_stats() -> dict[str, dict[str, Any]]:
+    """Hit/miss counters for every registered cache."""
+    return {name: cache.stats() for name, cache in _caches.items()}
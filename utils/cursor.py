@@ -0,0 +1,100 @@
+"""
+Opaque keyset-pagination cursors for datagroom_query_dataset.
+A cursor records the sort key and _id of the last row returned, the offset of the next row, the
+total matched when it was issued, and a fingerprint of the query so it cannot be replayed against
+different filters or sort.
+"""
+
+import base64
+import datetime
+import hashlib
+import json
+from typing import Any
+
+from utils.filter_compiler import field_value
+from utils.gateway_views import canonical_filters
+
+CURSOR_VERSION = 1
+
+
+def tag_value(value: Any) -> Any:
+    """Encode BSON-only values (datetime, ObjectId) so they survive the JSON round trip."""
+    if isinstance(value, datetime.datetime):
+        return {"$date": value.isoformat()}
+    if type(value).__name__ == "ObjectId":
+        return {"$oid": str(value)}
+    return value
+
+
+def untag_value(value: Any) -> Any:
+    """Reverse tag_value (ObjectId values require bson, i.e. the Mongo backend)."""
+    if isinstance(value, dict) and len(value) == 1:
+        if "$date" in value:
+            return datetime.datetime.fromisoformat(value["$date"])
+        if "$oid" in value:
+            from bson import ObjectId
+
+            return ObjectId(value["$oid"])
+    return value
+
+
+def keyset_sorters(sort: dict | None) -> list[dict]:
+    """Sort used for keyset paging: the requested sort with _id as the tie-breaker."""
+    if sort:
+        return [sort, {"field": "_id", "direction": sort.get("direction", "asc")}]
+    return [{"field": "_id", "direction": "asc"}]
+
+
+def last_key(rows: list[dict], sort: dict | None) -> tuple[Any, Any] | None:
+    """(sort value, _id) of the last row, or None if rows carry no _id."""
+    if not rows or rows[-1].get("_id") is None:
+        return None
+    last = rows[-1]
+    return (field_value(last, sort["field"]) if sort else None, last["_id"])
+
+
+def query_fingerprint(dataset_name: str, filters: list[dict] | None, sort: dict | None) -> str:
+    """Short hash identifying the query a cursor belongs to."""
+    canonical = json.dumps(
+        {
+            "dataset": dataset_name,
+            "filters": canonical_filters(filters),
+            "sort": [sort.get("field"), sort.get("direction")] if sort else None,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def encode_cursor(
+    fingerprint: str, last_value: Any, last_id: Any, next_offset: int, total: int | None = None
+) -> str:
+    """Build an opaque cursor token."""
+    payload = {
+        "v": CURSOR_VERSION,
+        "q": fingerprint,
+        "k": tag_value(last_value),
+        "id": tag_value(last_id),
+        "o": next_offset,
+        "t": total,
+    }
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, fingerprint: str) -> dict[str, Any]:
+    """Decode a cursor token; raises ValueError if it is malformed or for a different query."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(payload, dict) or payload.get("v") != CURSOR_VERSION:
+        raise ValueError("Invalid cursor")
+    if payload.get("q") != fingerprint:
+        raise ValueError(
+            "cursor does not match this query (dataset, filters and sort must be unchanged)"
+        )
+    return payload
@@ -61,6 +61,31 @@ class DatabaseConnectionError(DatagroomError):
         self.name = "DatabaseConnectionError"
 
 
+class GatewayUnavailableError(DatagroomError):
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(
+            f"Datagroom Gateway unavailable: {message}",
+            code="GATEWAY_UNAVAILABLE",
+            status_code=503,
+        )
+        self.name = "GatewayUnavailableError"
+        # Seconds after which a new request may succeed (None if unknown)
+        self.retry_after = retry_after
+
+
+class OverloadedError(DatagroomError):
+    def __init__(self, message: str, retry_after: float | None = None):
+        hint = f"; retry after {retry_after:g}s" if retry_after is not None else ""
+        super().__init__(
+            f"Server overloaded: {message}{hint}",
+            code="OVERLOADED",
+            status_code=429,
+        )
+        self.name = "OverloadedError"
+        # Seconds after which a new request is likely to be admitted (None if unknown)
+        self.retry_after = retry_after
+
+
 def format_error(error: BaseException | Any) -> str:
     """Format error for MCP tool response (matches TS formatError)."""
     if isinstance(error, DatagroomError):
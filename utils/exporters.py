@@ -0,0 +1,196 @@
+"""
+Chunked file writers for datagroom_export_dataset (NDJSON, CSV, Parquet).
+Each writer receives one page of rows at a time and never holds more than that page.
+CSV and Parquet fix their columns from the first chunk; columns first seen later are
+dropped and counted so the export can report them.
+"""
+
+import csv
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any
+
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+
+
+def _cell_text(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str, ensure_ascii=False)
+    return value
+
+
+def _column_union(rows: list[dict[str, Any]]) -> list[str]:
+    columns: dict[str, None] = {}
+    for row in rows:
+        columns.update(dict.fromkeys(row))
+    return list(columns)
+
+
+class ChunkWriter(ABC):
+    """Base writer: write_chunk() per page, close() once at the end."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.rows_written = 0
+        self.dropped_columns: set[str] = set()
+        self.coerced_values = 0
+
+    @abstractmethod
+    def write_chunk(self, rows: list[dict[str, Any]]) -> None: ...
+
+    @abstractmethod
+    def close(self) -> None: ...
+
+
+class NdjsonWriter(ChunkWriter):
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._file = open(path, "w", encoding="utf-8", newline="\n")
+
+    def write_chunk(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        self._file.write(
+            "".join(json.dumps(row, default=str, ensure_ascii=False) + "\n" for row in rows)
+        )
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class CsvWriter(ChunkWriter):
+    def __init__(self, path: Path, columns: list[str] | None = None):
+        super().__init__(path)
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._columns = columns
+        self._writer: csv.DictWriter | None = None
+
+    def write_chunk(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        if self._writer is None:
+            self._columns = self._columns or _column_union(rows)
+            self._writer = csv.DictWriter(
+                self._file, fieldnames=self._columns, extrasaction="ignore"
+            )
+            self._writer.writeheader()
+        known = set(self._columns)
+        for row in rows:
+            self.dropped_columns.update(k for k in row if k not in known)
+        self._writer.writerows(
+            {col: _cell_text(row.get(col)) for col in self._columns} for row in rows
+        )
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _arrow_kind(values: list[Any]) -> str:
+    """Column kind from the first chunk: int, float, bool or string."""
+    kinds = set()
+    for v in values:
+        if v is None:
+            continue
+        if isinstance(v, bool):
+            kinds.add("bool")
+        elif isinstance(v, int):
+            kinds.add("int")
+        elif isinstance(v, float):
+            kinds.add("float")
+        else:
+            kinds.add("string")
+    if kinds == {"bool"}:
+        return "bool"
+    if kinds == {"int"}:
+        return "int"
+    if kinds and kinds <= {"int", "float"}:
+        return "float"
+    return "string"
+
+
+class ParquetWriter(ChunkWriter):
+    """Writes one row group per chunk (requires pyarrow)."""
+
+    def __init__(self, path: Path, columns: list[str] | None = None):
+        super().__init__(path)
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            raise RuntimeError(
+                "pyarrow is not installed; pip install pyarrow (required for parquet export)"
+            )
+        self._columns = columns
+        self._kinds: dict[str, str] = {}
+        self._writer: Any = None
+        self._schema: Any = None
+
+    def _coerce(self, value: Any, kind: str) -> Any:
+        if value is None:
+            return None
+        if kind == "string":
+            return value if isinstance(value, str) else str(_cell_text(value))
+        ok = (
+            isinstance(value, bool)
+            if kind == "bool"
+            else isinstance(value, (int, float)) and not isinstance(value, bool)
+        )
+        if kind == "int" and isinstance(value, float):
+            ok = False
+        if not ok:
+            self.coerced_values += 1
+            return None
+        return value
+
+    def _open(self, kinds: dict[str, str]) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        types = {
+            "int": pa.int64(),
+            "float": pa.float64(),
+            "bool": pa.bool_(),
+            "string": pa.string(),
+        }
+        self._columns = list(kinds)
+        self._kinds = kinds
+        self._schema = pa.schema([(col, types[kind]) for col, kind in kinds.items()])
+        self._writer = pq.ParquetWriter(str(self.path), self._schema)
+
+    def write_chunk(self, rows: list[dict[str, Any]]) -> None:
+        if not rows:
+            return
+        import pyarrow as pa
+
+        if self._writer is None:
+            columns = self._columns or _column_union(rows)
+            self._open({col: _arrow_kind([row.get(col) for row in rows]) for col in columns})
+        known = set(self._columns)
+        for row in rows:
+            self.dropped_columns.update(k for k in row if k not in known)
+        arrays = {
+            col: [self._coerce(row.get(col), self._kinds[col]) for row in rows]
+            for col in self._columns
+        }
+        self._writer.write_table(pa.Table.from_pydict(arrays, schema=self._schema))
+        self.rows_written += len(rows)
+
+    def close(self) -> None:
+        if self._writer is None:
+            # No rows: a valid file with the known columns (typed as strings) and no row groups
+            self._open(dict.fromkeys(self._columns or [], "string"))
+        self._writer.close()
+
+
+def open_writer(fmt: str, path: Path, columns: list[str] | None = None) -> ChunkWriter:
+    """Writer for an export format."""
+    if fmt == "ndjson":
+        return NdjsonWriter(path)
+    if fmt == "csv":
+        return CsvWriter(path, columns)
+    if fmt == "parquet":
+        return ParquetWriter(path, columns)
+    raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
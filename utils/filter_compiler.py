@@ -0,0 +1,331 @@
+"""
+Local evaluation of schemas.Filter lists with the same semantics as convert_filters_to_mongo
+(MongoDB query semantics): type-bracketed comparisons, array fields match if any element does,
+eq/in null also match missing fields, regex is case-insensitive, dotted fields are nested paths.
+Filters compile once into predicates (precompiled regexes, hashed in/nin sets) and evaluate a
+batch of rows column by column, each filter only visiting rows the previous ones kept.
+filters_cover decides when a complete cached result for one filter list contains every row of
+another, so the narrower query can be answered locally.
+"""
+
+import datetime
+import json
+import operator
+import re
+from typing import Any, Callable
+
+from schemas import Filter
+
+_MISSING = object()
+
+Predicate = Callable[[Any], bool]
+
+
+class _Elements(list):
+    """Values of a path reached through an array: each is matched alone, never as one array."""
+
+    __slots__ = ()
+
+
+def _bracket(value: Any) -> int:
+    """MongoDB BSON type order (comparisons only match within a bracket)."""
+    if value is None or value is _MISSING:
+        return 0
+    kind = type(value)
+    if kind is bool:
+        return 6
+    if kind is int or kind is float:
+        return 1
+    if kind is str:
+        return 2
+    if kind is dict:
+        return 3
+    if kind is list:
+        return 4
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return 7
+    if isinstance(value, bool):
+        return 6
+    if isinstance(value, (int, float)):
+        return 1
+    return 5  # ObjectId and other BSON scalars
+
+
+def _eq_key(value: Any) -> tuple[int, Any]:
+    """Hashable equality key: 1 == 1.0, but True != 1 and "1" != 1 (as in MongoDB)."""
+    bracket = _bracket(value)
+    if bracket in (3, 4):
+        return bracket, json.dumps(value, separators=(",", ":"), default=str)
+    if bracket == 5:
+        return bracket, str(value)
+    return bracket, None if bracket == 0 else value
+
+
+def _resolve(row: dict[str, Any], path: tuple[str, ...]) -> Any:
+    """
+    Value at a dotted path; arrays along the path contribute every element's value (a
+    document element without the field contributes a missing value, which matches null).
+    """
+    values = [row]
+    for part in path:
+        found = []
+        for value in values:
+            if value is _MISSING or isinstance(value, dict):
+                found.append(_MISSING if value is _MISSING else value.get(part, _MISSING))
+            elif isinstance(value, list):
+                found.extend(v.get(part, _MISSING) for v in value if isinstance(v, dict))
+        if all(v is _MISSING for v in found):
+            return _MISSING
+        values = found
+    if len(values) == 1:
+        return values[0]
+    # Reached through an array: match against every element; a nested array matches both as a
+    # whole and by its elements (flattened once)
+    flat = _Elements()
+    for value in values:
+        flat.append(value)
+        if isinstance(value, list):
+            flat.extend(value)
+    return flat
+
+
+def field_value(row: dict[str, Any], field: str) -> Any:
+    """Value at a dotted field path, as filters and sorting see it (None when missing)."""
+    value = _resolve(row, tuple(field.split(".")))
+    if value is _MISSING:
+        return None
+    return list(value) if type(value) is _Elements else value
+
+
+def _membership(values: list[Any]) -> Predicate:
+    """Field (or any element) equals one of values; null also matches a missing field."""
+    if values and all(type(v) is str for v in values):
+        strings = frozenset(values)
+
+        def _in_strings(v: Any) -> bool:
+            if type(v) is str:
+                return v in strings
+            if isinstance(v, list):
+                return any(type(e) is str and e in strings for e in v)
+            return False
+
+        return _in_strings
+    keys = frozenset(_eq_key(v) for v in values)
+    null_key = _eq_key(None)
+    match_missing = null_key in keys
+
+    def _in_keys(v: Any) -> bool:
+        if v is _MISSING:
+            return match_missing
+        if type(v) is not _Elements and _eq_key(v) in keys:
+            return True
+        if isinstance(v, list):
+            return any(_eq_key(e) in keys for e in v)
+        return False
+
+    return _in_keys
+
+
+_COMPARATORS = {"gt": operator.gt, "gte": operator.ge, "lt": operator.lt, "lte": operator.le}
+
+
+def _range(field: str, op: str, bound: Any) -> Predicate:
+    if isinstance(bound, (dict, list)):
+        raise ValueError(f"'{op}' filter on '{field}' needs a scalar value")
+    if bound is None:
+        # gte/lte null match null or missing fields; gt/lt null match nothing
+        return _membership([None]) if op in ("gte", "lte") else (lambda v: False)
+    compare = _COMPARATORS[op]
+    bracket = _bracket(bound)
+
+    def _one(v: Any) -> bool:
+        if _bracket(v) != bracket:
+            return False
+        try:
+            return compare(v, bound)
+        except TypeError:
+            return False
+
+    def _any(v: Any) -> bool:
+        if isinstance(v, list):
+            return any(_one(e) for e in v)
+        return _one(v)
+
+    return _any
+
+
+def _regex(field: str, pattern: Any) -> Predicate:
+    try:
+        compiled = re.compile(str(pattern), re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid regex for field '{field}': {e}") from e
+    search = compiled.search
+
+    def _matches(v: Any) -> bool:
+        if type(v) is str:
+            return search(v) is not None
+        if isinstance(v, list):
+            return any(type(e) is str and search(e) is not None for e in v)
+        return False
+
+    return _matches
+
+
+def _negate(predicate: Predicate) -> Predicate:
+    return lambda v: not predicate(v)
+
+
+def _as_list(value: Any) -> list[Any]:
+    return value if isinstance(value, list) else [value]
+
+
+def _filter_values(f: Filter) -> list[Any]:
+    """Values an eq/ne/in/nin filter compares against (eq/ne take a list value as one value)."""
+    return [f.value] if f.type in ("eq", "ne") else _as_list(f.value)
+
+
+def compile_predicate(f: Filter) -> Predicate:
+    """Predicate over a resolved field value for one filter."""
+    if f.type in ("eq", "in"):
+        return _membership(_filter_values(f))
+    if f.type in ("ne", "nin"):
+        return _negate(_membership(_filter_values(f)))
+    if f.type == "regex":
+        return _regex(f.field, f.value)
+    return _range(f.field, f.type, f.value)
+
+
+# Cheap, selective filters first; AND is commutative so evaluation order is free
+_COST = {"eq": 0, "in": 0, "gt": 1, "gte": 1, "lt": 1, "lte": 1, "ne": 2, "nin": 2, "regex": 3}
+
+
+def _to_filter(f: Filter | dict) -> Filter:
+    return f if isinstance(f, Filter) else Filter(**f)
+
+
+class CompiledFilter:
+    """A filter list compiled once and evaluated against single rows or batches."""
+
+    __slots__ = ("_steps",)
+
+    def __init__(self, filters: list[Filter] | list[dict] | None):
+        parsed = sorted((_to_filter(f) for f in filters or []), key=lambda f: _COST[f.type])
+        self._steps = [(tuple(f.field.split(".")), compile_predicate(f)) for f in parsed]
+
+    def matches(self, row: dict[str, Any]) -> bool:
+        return all(predicate(_resolve(row, path)) for path, predicate in self._steps)
+
+    def _surviving(self, rows: list[dict[str, Any]]) -> list[int]:
+        alive = range(len(rows))
+        for path, predicate in self._steps:
+            if len(path) == 1:
+                key = path[0]
+                column = [rows[i].get(key, _MISSING) for i in alive]
+            else:
+                column = [_resolve(rows[i], path) for i in alive]
+            alive = [i for i, v in zip(alive, column) if predicate(v)]
+            if not alive:
+                break
+        return list(alive)
+
+    def mask(self, rows: list[dict[str, Any]]) -> list[bool]:
+        """Per-row match flags for a batch."""
+        result = [False] * len(rows)
+        for i in self._surviving(rows):
+            result[i] = True
+        return result
+
+    def filter(self, rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Matching rows of a batch, in order."""
+        return [rows[i] for i in self._surviving(rows)]
+
+
+def compile_filters(filters: list[Filter] | list[dict] | None) -> CompiledFilter:
+    """Compile a filter list (Filter models or dicts); raises ValueError for a bad regex."""
+    return CompiledFilter(filters)
+
+
+def _sort_value(value: Any, descending: bool) -> tuple[int, Any]:
+    if isinstance(value, list):
+        # MongoDB sorts arrays by their smallest element ascending, largest descending
+        if not value:
+            return -1, 0
+        keys = [_sort_value(e, descending) for e in value]
+        return max(keys) if descending else min(keys)
+    bracket = _bracket(value)
+    if bracket == 0:
+        return 0, 0
+    if bracket in (3, 5):
+        return bracket, _eq_key(value)[1]
+    if bracket == 7 and not isinstance(value, datetime.datetime):
+        return bracket, datetime.datetime.combine(value, datetime.time())
+    return bracket, value
+
+
+def sort_rows(rows: list[dict[str, Any]], sorters: list[dict] | None) -> list[dict[str, Any]]:
+    """Sort rows in place by {field, direction} sorters with MongoDB type ordering."""
+    for s in reversed([s for s in sorters or [] if s.get("field")]):
+        path = tuple(s["field"].split("."))
+        descending = s.get("direction") == "desc"
+        rows.sort(
+            key=lambda row: _sort_value(_resolve(row, path), descending),
+            reverse=descending,
+        )
+    return rows
+
+
+# --- Superset coverage --------------------------------------------------------------
+
+_LOWER = ("gt", "gte")
+_UPPER = ("lt", "lte")
+
+
+def _range_implies(b: Filter, a: Filter) -> bool:
+    """Range b (alone) implies range a: same direction, comparable bounds, b at least as tight."""
+    if b.value is None or a.value is None or _bracket(b.value) != _bracket(a.value):
+        return False
+    if _bracket(b.value) not in (1, 2, 7):
+        return False
+    if b.type in _LOWER and a.type in _LOWER:
+        tighter = operator.gt if (a.type == "gt" and b.type == "gte") else operator.ge
+        return tighter(b.value, a.value)
+    if b.type in _UPPER and a.type in _UPPER:
+        tighter = operator.lt if (a.type == "lt" and b.type == "lte") else operator.le
+        return tighter(b.value, a.value)
+    return False
+
+
+def _implies(b: Filter, a: Filter) -> bool:
+    """Every row matching filter b also matches filter a (conservative: False when unsure)."""
+    if b.field != a.field:
+        return False
+    if b.type == a.type and _eq_key(b.value) == _eq_key(a.value):
+        return True
+    if b.type in ("eq", "in"):
+        values = _filter_values(b)
+        if a.type in ("ne", "nin") or any(isinstance(v, (dict, list)) for v in values):
+            return False
+        # b pins the field (or one of its elements) to a value; a must accept each one
+        predicate = compile_predicate(a)
+        return all(predicate(v) for v in values)
+    if b.type in ("ne", "nin") and a.type in ("ne", "nin"):
+        excluded = {_eq_key(v) for v in _filter_values(b)}
+        return all(_eq_key(v) in excluded for v in _filter_values(a))
+    if b.type in _COMPARATORS and a.type in _COMPARATORS:
+        return _range_implies(b, a)
+    return False
+
+
+def filters_cover(
+    superset: list[Filter] | list[dict] | None,
+    filters: list[Filter] | list[dict] | None,
+) -> bool:
+    """
+    True if every row matching `filters` also matches `superset`, i.e. a complete result for
+    `superset` can answer `filters` by local filtering. Each superset filter must be implied
+    by a single filter of the narrower list.
+    """
+    narrower = [_to_filter(f) for f in filters or []]
+    return all(
+        any(_implies(b, a) for b in narrower) for a in (_to_filter(f) for f in superset or [])
+    )
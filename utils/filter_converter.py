@@ -1,6 +1,6 @@
 """
 Convert structured filter array to MongoDB query object (matches TS filterConverter.ts).
-Used only if we ever query MongoDB directly; Gateway accepts filters as-is.
+Used by the direct Mongo backend (db/queries.py); Gateway accepts filters as-is.
 """
 
 from schemas import Filter
@@ -35,13 +35,11 @@ def convert_filters_to_mongo(filters: list[Filter]) -> dict:
     query: dict = {}
     for f in filters:
         field, ftype, value = f.field, f.type, f.value
-        if field in query:
-            existing = query[field]
-            if isinstance(existing, dict) and not isinstance(existing, list):
-                if "$and" not in query:
-                    query["$and"] = [{field: existing}]
-                query["$and"].append({field: _build_filter_condition(ftype, value)})
-                del query[field]
+        if field in query or any(field in c for c in query.get("$and", [])):
+            # Repeated field: every condition on it goes into $and
+            if field in query:
+                query.setdefault("$and", []).append({field: query.pop(field)})
+            query["$and"].append({field: _build_filter_condition(ftype, value)})
         else:
             query[field] = (
                 value if ftype == "eq" else _build_filter_condition(ftype, value)
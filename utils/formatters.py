@@ -1,37 +1,94 @@
 """
 Formatting utilities for tool responses (matches TS formatters.ts).
+Markdown tables can be rendered against a byte budget: wide cells are cut to a character limit
+and rows are added only while they fit, so large results stay small enough for the client.
 """
 
-from typing import Any
+import json
+from typing import Any, NamedTuple
 
 from schemas import Filter
 
+# response_format values of the row-returning tools
+RESPONSE_FORMATS = ("markdown", "json")
 
-def _format_cell_value(value: Any) -> str:
-    """Format a single cell value for markdown table."""
+
+def _cell_text(value: Any) -> str:
     if value is None:
         return ""
     if isinstance(value, (dict, list)):
-        import json
-
         return json.dumps(value)
-    if isinstance(value, str) and "|" in value:
-        return value.replace("|", "\\|")
     return str(value)
 
 
-def format_markdown_table(data: list[dict[str, Any]]) -> str:
-    """Format data as a markdown table."""
-    if not data or len(data) == 0:
-        return "No data"
-    columns = list(data[0].keys())
-    header = "| " + " | ".join(columns) + " |"
-    separator = "| " + " | ".join("---" for _ in columns) + " |"
-    rows = [
-        "| " + " | ".join(_format_cell_value(row.get(col)) for col in columns) + " |"
-        for row in data
+def _escape_cell(text: str) -> str:
+    """Keep a cell on one line and inside its column."""
+    if "|" in text:
+        text = text.replace("|", "\\|")
+    if "\n" in text or "\r" in text:
+        text = text.replace("\r\n", " ").replace("\n", " ").replace("\r", " ")
+    return text
+
+
+def _format_cell_value(value: Any) -> str:
+    """Format a single cell value for markdown table."""
+    return _escape_cell(_cell_text(value))
+
+
+def table_columns(data: list[dict[str, Any]]) -> list[str]:
+    """Union of the rows' keys in first-seen order (columns missing from row 1 are kept)."""
+    return list(dict.fromkeys(key for row in data for key in row))
+
+
+class RenderedTable(NamedTuple):
+    text: str
+    rows_rendered: int
+    cells_truncated: int
+
+
+def render_markdown_table(
+    data: list[dict[str, Any]],
+    max_bytes: int | None = None,
+    max_cell_chars: int | None = None,
+) -> RenderedTable:
+    """
+    Render rows as a markdown table within max_bytes (UTF-8), cutting cells longer than
+    max_cell_chars. Rows are rendered in order until the next one would exceed the budget;
+    the header is always kept. None disables a limit.
+    """
+    if not data:
+        return RenderedTable("No data", 0, 0)
+    columns = table_columns(data)
+    lines = [
+        "| " + " | ".join(_escape_cell(str(c)) for c in columns) + " |",
+        "| " + " | ".join("---" for _ in columns) + " |",
     ]
-    return "\n".join([header, separator] + rows)
+    used = sum(len(line.encode("utf-8")) + 1 for line in lines)
+    truncated = 0
+    rendered = 0
+    for row in data:
+        cells = []
+        cut = 0
+        for col in columns:
+            text = _cell_text(row.get(col))
+            if max_cell_chars is not None and len(text) > max_cell_chars:
+                text = text[: max(max_cell_chars - 1, 0)] + "…"
+                cut += 1
+            cells.append(_escape_cell(text))
+        line = "| " + " | ".join(cells) + " |"
+        size = len(line.encode("utf-8")) + 1
+        if max_bytes is not None and used + size > max_bytes:
+            break
+        lines.append(line)
+        used += size
+        rendered += 1
+        truncated += cut
+    return RenderedTable("\n".join(lines), rendered, truncated)
+
+
+def format_markdown_table(data: list[dict[str, Any]]) -> str:
+    """Format data as a markdown table (every row and cell)."""
+    return render_markdown_table(data).text
 
 
 def format_query_summary(
@@ -41,6 +98,8 @@ def format_query_summary(
     filters: list[Filter],
     offset: int,
     has_more: bool,
+    next_offset: int | None = None,
+    warning: str | None = None,
 ) -> str:
     """Format query summary with statistics and filters."""
     lines = [
@@ -51,6 +110,10 @@ def format_query_summary(
         f"**Offset**: {offset:,}",
         f"**Has More**: {'Yes' if has_more else 'No'}",
     ]
+    if next_offset is not None:
+        lines.append(f"**Next Offset**: {next_offset:,}")
+    if warning:
+        lines.append(f"**Warning**: {warning}")
     if filters:
         lines.extend(["", "**Applied Filters**:"])
         for f in filters:
@@ -61,8 +124,6 @@ def format_query_summary(
                 else (str(val) if not isinstance(val, (dict, list)) else str(val))
             )
             try:
-                import json
-
                 if isinstance(val, (dict, list)):
                     value_str = json.dumps(val)
             except Exception:
@@ -75,8 +136,9 @@ def format_aggregation_results(
     dataset_name: str,
     results: list[dict[str, Any]],
     group_by: str | None = None,
+    percentile: float | None = None,
 ) -> str:
-    """Format aggregation results as markdown."""
+    """Format aggregation results as markdown (approximate results with their error bounds)."""
     lines = [f"# Aggregation Results: {dataset_name}", ""]
     if group_by:
         lines.extend([f"**Grouped by**: `{group_by}`", ""])
@@ -97,6 +159,12 @@ def format_aggregation_results(
         headers.append("Min")
     if "max" in first:
         headers.append("Max")
+    if "approx_distinct" in first:
+        headers.append("Distinct (approx)")
+    if "median" in first:
+        headers.append("Median")
+    if "percentile" in first:
+        headers.append(f"P{percentile:g}" if percentile is not None else "Percentile")
     header_row = "| " + " | ".join(headers) + " |"
     separator_row = "| " + " | ".join("---" for _ in headers) + " |"
     lines.append(header_row)
@@ -120,5 +188,60 @@ def format_aggregation_results(
             row.append(_format_cell_value(result.get("min")))
         if "max" in result:
             row.append(_format_cell_value(result.get("max")))
+        for key in ("approx_distinct", "median", "percentile"):
+            if key in result:
+                row.append(_format_cell_value(result.get(key)))
         lines.append("| " + " | ".join(row) + " |")
+    # Worst bound across groups; exact groups report 0
+    bounds: dict[str, float] = {}
+    for result in results:
+        for key, bound in (result.get("error_bounds") or {}).items():
+            bounds[key] = max(bounds.get(key, 0.0), bound)
+    if bounds:
+        notes = [
+            f"{key} ±{bound:.1%} {'of the count' if key == 'approx_distinct' else 'in rank'}"
+            if bound
+            else f"{key} exact"
+            for key, bound in bounds.items()
+        ]
+        lines.extend(["", f"**Error Bounds**: {'; '.join(notes)}"])
+    return "\n".join(lines)
+
+
+def format_schema_summary(
+    dataset_name: str, columns: list[str], total_rows: int | None = None
+) -> str:
+    """Format a schema as its column list (definitions and sample rows stay structured)."""
+    lines = [f"# Schema: {dataset_name}", ""]
+    if total_rows is not None:
+        lines.append(f"**Total Rows**: {total_rows:,}")
+    names = ", ".join(f"`{name}`" for name in columns) or "none"
+    lines.append(f"**Columns** ({len(columns)}): {names}")
+    lines.append("Column definitions and sample rows are in the structured content.")
+    return "\n".join(lines)
+
+
+def format_column_profile(profile: dict[str, Any]) -> str:
+    """Format a DatasetProfile (as a dict) as a markdown table, one row per column."""
+    lines = [
+        f"## Column Profile ({profile['sampled_rows']:,} of {profile['total_rows']:,} rows sampled)",
+        "",
+        "| Column | Type | Nulls | Distinct | Min | Max | Top Values |",
+        "| --- | --- | --- | --- | --- | --- | --- |",
+    ]
+    for column in profile["columns"]:
+        distinct = column["approx_distinct"]
+        top = ", ".join(
+            f"{_format_cell_value(tv['value'])} ({tv['count']})" for tv in column["top_values"]
+        )
+        row = [
+            column["name"],
+            column["type"],
+            f"{column['null_ratio']:.1%}",
+            f"~{distinct:,}" if column["distinct_error"] else f"{distinct:,}",
+            _format_cell_value(column["min"]),
+            _format_cell_value(column["max"]),
+            top,
+        ]
+        lines.append("| " + " | ".join(_format_cell_value(c) for c in row) + " |")
     return "\n".join(lines)
@@ -0,0 +1,127 @@
+"""
+Process-wide Gateway HTTP client (connection pooling, keep-alive, optional HTTP/2).
+Opened and closed by the app lifespan in main._create_app; created lazily if a tool runs outside it.
+"""
+
+import logging
+import time
+from typing import Any
+
+import httpx
+
+from config import config
+from utils.metrics import record_gateway_request
+
+logger = logging.getLogger(__name__)
+
+_client: httpx.AsyncClient | None = None
+_in_flight = 0
+_requests_total = 0
+
+
+def _build_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    """Build the pooled AsyncClient from config (transport replaces the network, e.g. a stub app)."""
+    limits = httpx.Limits(
+        max_connections=config["gateway_max_connections"],
+        max_keepalive_connections=config["gateway_max_keepalive_connections"],
+        keepalive_expiry=config["gateway_keepalive_expiry"],
+    )
+    timeout = httpx.Timeout(
+        config["gateway_timeout"],
+        connect=config["gateway_connect_timeout"],
+        pool=config["gateway_pool_timeout"],
+    )
+    http2 = config["gateway_http2"]
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("GATEWAY_HTTP2 is set but 'h2' is not installed; using HTTP/1.1")
+            http2 = False
+    return httpx.AsyncClient(
+        base_url=config["datagram_gateway_url"],
+        limits=limits,
+        timeout=timeout,
+        http2=http2,
+        transport=transport,
+    )
+
+
+async def open_gateway_client(
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> httpx.AsyncClient:
+    """Create the shared Gateway client (idempotent)."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client(transport)
+        logger.info(
+            "Gateway client ready (max_connections=%s, keepalive=%s, http2=%s)",
+            config["gateway_max_connections"],
+            config["gateway_max_keepalive_connections"],
+            config["gateway_http2"],
+        )
+    return _client
+
+
+def get_gateway_client() -> httpx.AsyncClient:
+    """Return the shared Gateway client, creating it if the lifespan has not run."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+async def close_gateway_client() -> None:
+    """Close the shared Gateway client and release pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+        logger.info("Gateway client closed")
+
+
+async def send_gateway_request(method: str, endpoint: str, **kwargs: Any) -> httpx.Response:
+    """Send a request through the shared client, tracking in-flight counts and latency metrics."""
+    global _in_flight, _requests_total
+    client = get_gateway_client()
+    _in_flight += 1
+    _requests_total += 1
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, endpoint, **kwargs)
+    except Exception:
+        record_gateway_request(endpoint, started, "error")
+        raise
+    finally:
+        _in_flight -= 1
+    record_gateway_request(endpoint, started, response.status_code, len(response.content))
+    return response
+
+
+def get_pool_stats() -> dict[str, Any]:
+    """Connection-pool statistics for sizing (connections, idle, in-flight, configured limits)."""
+    stats: dict[str, Any] = {
+        "open": _client is not None and not _client.is_closed,
+        "http2": config["gateway_http2"],
+        "max_connections": config["gateway_max_connections"],
+        "max_keepalive_connections": config["gateway_max_keepalive_connections"],
+        "in_flight": _in_flight,
+        "requests_total": _requests_total,
+        "connections": 0,
+        "idle_connections": 0,
+        "active_connections": 0,
+        "queued_requests": 0,
+    }
+    if not stats["open"]:
+        return stats
+    # httpx does not expose pool stats publicly; read them from the httpcore pool when present
+    pool = getattr(getattr(_client, "_transport", None), "_pool", None)
+    connections = list(getattr(pool, "connections", None) or [])
+    idle = sum(1 for c in connections if c.is_idle())
+    stats["connections"] = len(connections)
+    stats["idle_connections"] = idle
+    stats["active_connections"] = len(connections) - idle
+    stats["queued_requests"] = sum(
+        1 for r in (getattr(pool, "_requests", None) or []) if r.is_queued()
+    )
+    return stats
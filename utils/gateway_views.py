@@ -0,0 +1,347 @@
+"""
+Cached access to the Gateway viewViaPost endpoint (filtered, sorted, paged rows).
+Results are cached under a canonical key of dataset, filters, sort, page and per_page,
+and concurrent identical requests share one in-flight Gateway call. A cached page 1 that holds
+every matching row also answers narrower filters locally (utils/filter_compiler.py).
+A fields projection is sent in the request body and rows are trimmed to it (utils/projection.py).
+iter_view_pages streams every page of a result with a bounded prefetch window.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator
+from urllib.parse import quote
+
+from config import config
+from utils.authenticated_request import raise_for_gateway_status, send_authenticated_request
+from utils.cache import SingleFlight, TTLCache
+from utils.filter_compiler import compile_filters, filters_cover, sort_rows
+from utils.json_codec import loads
+from utils.projection import project_rows
+from utils.timing import phase
+
+_view_cache = TTLCache(
+    "query",
+    max_entries=config["query_cache_max_entries"],
+    ttl=config["query_cache_ttl"],
+    max_bytes=config["query_cache_max_bytes"],
+)
+_single_flight = SingleFlight()
+
+# Cached results known to hold every matching row, per dataset (cache key -> filters)
+COMPLETE_VIEWS_PER_DATASET = 16
+_complete_views: dict[str, OrderedDict[str, list[dict]]] = {}
+_superset_hits = 0
+
+
+def view_endpoint(dataset_name: str) -> str:
+    """Gateway viewViaPost endpoint for a dataset."""
+    return f"/ds/viewViaPost/{quote(dataset_name, safe='')}/default/mcp"
+
+
+def _canonical_value(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def canonical_filters(filters: list[dict] | None) -> list[dict]:
+    """
+    Normalize a filter list so equivalent queries compare equal: filters are AND-ed,
+    so order does not matter, and in/nin value lists are treated as sets.
+    """
+    normalized = []
+    for f in filters or []:
+        ftype = f.get("type")
+        value = f.get("value")
+        if ftype in ("in", "nin") and isinstance(value, list):
+            unique = {_canonical_value(v): v for v in value}
+            value = [unique[k] for k in sorted(unique)]
+        normalized.append({"field": f.get("field"), "type": ftype, "value": value})
+    normalized.sort(key=_canonical_value)
+    return normalized
+
+
+def view_cache_key(
+    dataset_name: str,
+    filters: list[dict] | None,
+    sorters: list[dict] | None,
+    page: int,
+    per_page: int,
+    fields: list[str] | None = None,
+) -> str:
+    """Canonical hash of a viewViaPost request."""
+    request = {
+        "dataset": dataset_name,
+        "filters": canonical_filters(filters),
+        "sorters": [
+            {"field": s.get("field"), "direction": s.get("direction")} for s in sorters or []
+        ],
+        "page": page,
+        "per_page": per_page,
+    }
+    if fields is not None:
+        request["fields"] = sorted(fields)
+    canonical = _canonical_value(request)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def view_ttl(dataset_name: str) -> float:
+    """Cache TTL for view results of a dataset (QUERY_CACHE_DATASET_TTLS overrides)."""
+    return config["query_cache_dataset_ttls"].get(dataset_name, config["query_cache_ttl"])
+
+
+def _remember_complete(
+    dataset_name: str, key: str, filters: list[dict] | None, page: int, result: dict[str, Any]
+) -> None:
+    total = result.get("total")
+    if page != 1 or total is None or len(result.get("data") or []) < total:
+        return
+    views = _complete_views.setdefault(dataset_name, OrderedDict())
+    views[key] = canonical_filters(filters)
+    views.move_to_end(key)
+    while len(views) > COMPLETE_VIEWS_PER_DATASET:
+        views.popitem(last=False)
+
+
+def _answer_from_superset(
+    dataset_name: str,
+    filters: list[dict] | None,
+    sorters: list[dict] | None,
+    page: int,
+    per_page: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any] | None:
+    """
+    Page of a query computed from a cached complete result whose filters are implied.
+    Only whole-row results are tracked, so any projection can be cut from them.
+    """
+    global _superset_hits
+    views = _complete_views.get(dataset_name)
+    if not views:
+        return None
+    try:
+        for key, superset in reversed(list(views.items())):
+            if not filters_cover(superset, filters):
+                continue
+            cached = _view_cache.get(key)
+            if cached is None:
+                views.pop(key, None)
+                continue
+            rows = sort_rows(compile_filters(filters).filter(cached.get("data") or []), sorters)
+            _superset_hits += 1
+            start = (page - 1) * per_page
+            return {
+                "total": len(rows),
+                "data": project_rows(rows[start : start + per_page], fields),
+            }
+    except ValueError:
+        # Filters the local evaluator rejects are left to the Gateway to judge
+        return None
+    return None
+
+
+async def fetch_view_page(
+    dataset_name: str,
+    filters: list[dict] | None = None,
+    sorters: list[dict] | None = None,
+    page: int = 1,
+    per_page: int = 100,
+    use_cache: bool = True,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Fetch one page from viewViaPost ({"total": ..., "data": [...]}).
+    With fields, only those columns (plus _id) are requested and returned.
+    The returned dict may be shared with the cache and other callers; do not mutate it.
+    """
+    body = {
+        "filters": filters or [],
+        "sorters": sorters or [],
+        "page": page,
+        "per_page": per_page,
+    }
+    if fields is not None:
+        body["fields"] = fields
+    key = view_cache_key(dataset_name, filters, sorters, page, per_page, fields)
+    if use_cache:
+        cached = _view_cache.get(key)
+        if cached is not None:
+            return cached
+        local = _answer_from_superset(dataset_name, filters, sorters, page, per_page, fields)
+        if local is not None:
+            return local
+
+    async def _fetch() -> dict[str, Any]:
+        response = await send_authenticated_request(view_endpoint(dataset_name), "POST", body)
+        raise_for_gateway_status(response)
+        with phase("json_decode"):
+            result = loads(response.content)
+        if fields is not None:
+            # Trim whatever the Gateway did not project itself
+            result["data"] = project_rows(result.get("data") or [], fields)
+        if use_cache:
+            _view_cache.set(key, result, ttl=view_ttl(dataset_name), size=len(response.content))
+            if fields is None:
+                _remember_complete(dataset_name, key, filters, page, result)
+        return result
+
+    return await _single_flight.do(key, _fetch)
+
+
+async def fetch_view_window(
+    dataset_name: str,
+    filters: list[dict] | None,
+    sorters: list[dict] | None,
+    offset: int,
+    limit: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Rows [offset, offset+limit) with exact offset semantics. The Gateway only pages in
+    multiples of per_page, so the (at most two) pages of size `limit` covering the window
+    are fetched concurrently and sliced.
+    """
+    first_page = offset // limit + 1
+    last_page = (offset + limit - 1) // limit + 1
+    pages = await asyncio.gather(
+        *(
+            fetch_view_page(dataset_name, filters, sorters, page=p, per_page=limit, fields=fields)
+            for p in range(first_page, last_page + 1)
+        )
+    )
+    start = offset - (first_page - 1) * limit
+    rows = [row for page in pages for row in page.get("data") or []]
+    return {"total": pages[0].get("total") or 0, "data": rows[start : start + limit]}
+
+
+def _keyset_ranges(
+    sort: dict | None, sorters: list[dict], last_value: Any, last_id: Any
+) -> list[tuple[list[dict], list[dict]]]:
+    """
+    (extra filters, sorters) of the ranges that follow (last_value, last_id), in sort order.
+    The Gateway only ANDs filters, so "after" is split into ranges that are read in sequence:
+    the rest of the boundary value's tie run (paged by _id, however long it is), then the values
+    past it. Null and missing values sort first (last when descending) and gt/lt never match
+    them, so they are a range of their own ("eq null" matches both).
+    """
+    desc = (sort or {}).get("direction") == "desc"
+    after_id = {"field": "_id", "type": "lt" if desc else "gt", "value": last_id}
+    if not sort:
+        return [([after_id], sorters)]
+    field = sort["field"]
+    by_id = [{"field": "_id", "direction": "desc" if desc else "asc"}]
+    ties = ([{"field": field, "type": "eq", "value": last_value}, after_id], by_id)
+    if last_value is None:
+        if desc:
+            return [ties]
+        return [ties, ([{"field": field, "type": "ne", "value": None}], sorters)]
+    past = ([{"field": field, "type": "lt" if desc else "gt", "value": last_value}], sorters)
+    if desc:
+        return [ties, past, ([{"field": field, "type": "eq", "value": None}], by_id)]
+    return [ties, past]
+
+
+async def fetch_view_after(
+    dataset_name: str,
+    filters: list[dict] | None,
+    sort: dict | None,
+    sorters: list[dict],
+    last_value: Any,
+    last_id: Any,
+    limit: int,
+    fields: list[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Keyset page: up to `limit` rows ordered after (last_value, last_id), so the cost does not
+    grow with depth. fields must include _id and the sort field (utils.projection.fetch_fields).
+    The first page of each range in _keyset_ranges is fetched concurrently (at most three
+    Gateway calls) and the ranges are concatenated in order.
+    Returns {"total": rows remaining from this page on, "data": [...]}.
+    """
+    pages = await asyncio.gather(
+        *(
+            fetch_view_page(
+                dataset_name,
+                [*(filters or []), *extra],
+                range_sorters,
+                page=1,
+                per_page=limit,
+                fields=fields,
+            )
+            for extra, range_sorters in _keyset_ranges(sort, sorters, last_value, last_id)
+        )
+    )
+    rows = [row for page in pages for row in page.get("data") or []]
+    return {"total": sum(page.get("total") or 0 for page in pages), "data": rows[:limit]}
+
+
+async def iter_view_pages(
+    dataset_name: str,
+    filters: list[dict] | None = None,
+    sorters: list[dict] | None = None,
+    per_page: int = 1000,
+    concurrency: int = 4,
+    use_cache: bool = False,
+    fields: list[str] | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Yield every page of a filtered view in order. Page 1 is fetched first to learn the total;
+    later pages are fetched up to `concurrency` at a time, so at most that many pages are held.
+    """
+    first = await fetch_view_page(
+        dataset_name,
+        filters,
+        sorters,
+        page=1,
+        per_page=per_page,
+        use_cache=use_cache,
+        fields=fields,
+    )
+    yield first
+    last_page = math.ceil((first.get("total") or 0) / per_page)
+    pending: deque[asyncio.Future] = deque()
+    next_page = 2
+    try:
+        while next_page <= last_page or pending:
+            while next_page <= last_page and len(pending) < max(concurrency, 1):
+                pending.append(
+                    asyncio.ensure_future(
+                        fetch_view_page(
+                            dataset_name,
+                            filters,
+                            sorters,
+                            page=next_page,
+                            per_page=per_page,
+                            use_cache=use_cache,
+                            fields=fields,
+                        )
+                    )
+                )
+                next_page += 1
+            page = await pending.popleft()
+            yield page
+            if not page.get("data"):
+                # Dataset shrank while scanning; nothing further to read
+                break
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+
+def get_single_flight_stats() -> dict[str, int]:
+    """Requests coalesced onto an in-flight Gateway call, and calls currently in flight."""
+    return {
+        "coalesced": _single_flight.coalesced,
+        "in_flight": _single_flight.in_flight(),
+    }
+
+
+def get_superset_stats() -> dict[str, int]:
+    """Queries answered from a cached complete superset, and complete results tracked."""
+    return {
+        "hits": _superset_hits,
+        "complete_views": sum(len(views) for views in _complete_views.values()),
+    }
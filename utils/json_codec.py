@@ -0,0 +1,81 @@
+"""
+JSON decoding of Gateway responses and encoding of tool output.
+Uses orjson when it is installed (optional: pip install orjson) and the standard library
+otherwise. dumps_pretty() is byte-identical to json.dumps(value, indent=2): orjson's output is
+ASCII-escaped afterwards, and values it would format differently (floats in exponent notation,
+NaN/Infinity, non-str keys, other types) are encoded by the standard library instead.
+"""
+
+import json
+import re
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+# json.dumps(ensure_ascii=True) escapes everything outside printable ASCII
+_NON_ASCII = re.compile(r"[^\x00-\x7e]")
+
+
+def loads(data: bytes | str) -> Any:
+    """Parse JSON text (bytes are decoded as UTF-8)."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # NaN/Infinity or integers beyond 64 bits, which json accepts
+    return json.loads(data)
+
+
+def dumps(value: Any) -> str:
+    """Compact JSON text (unknown types as str, non-ASCII kept as is)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _escape(match: re.Match) -> str:
+    code = ord(match.group())
+    if code < 0x10000:
+        return f"\\u{code:04x}"
+    code -= 0x10000
+    return f"\\u{0xD800 | (code >> 10):04x}\\u{0xDC00 | (code & 0x3FF):04x}"
+
+
+def _orjson_safe(value: Any) -> bool:
+    """True if orjson formats every value exactly like json.dumps (plain JSON types only)."""
+    stack = [value]
+    pop, extend = stack.pop, stack.extend
+    while stack:
+        v = pop()
+        t = type(v)
+        if t is str or t is int or t is bool or v is None:
+            continue
+        if t is float:
+            # repr() switches to exponent notation outside [1e-4, 1e16); orjson differs there
+            if v and not 1e-4 <= abs(v) < 1e16:
+                return False
+        elif t is dict:
+            extend(v.values())
+        elif t is list:
+            extend(v)
+        else:
+            return False
+    return True
+
+
+def dumps_pretty(value: Any) -> str:
+    """Same text as json.dumps(value, indent=2), encoded with orjson where that is exact."""
+    if orjson is not None and _orjson_safe(value):
+        try:
+            text = orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+        except orjson.JSONEncodeError:
+            pass  # non-str keys or integers beyond 64 bits
+        else:
+            return text if text.isascii() and "\x7f" not in text else _NON_ASCII.sub(_escape, text)
+    return json.dumps(value, indent=2)
@@ -0,0 +1,316 @@
+"""
+Prometheus metrics for the /metrics route (text exposition format, no client library needed).
+Recorded as they happen (a bisect and a few dict updates per observation):
+- Tool call latency, status and response size per tool (ToolMetricsMiddleware).
+- Gateway request latency, status and response size per endpoint template (utils/gateway_client.py).
+- Admission wait time (utils/admission.py).
+Read from the existing stats when scraped: cache hit ratios, connection-pool utilization, in-flight
+and queued calls, circuit breaker and retry counters.
+"""
+
+import re
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Iterable
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Gateway endpoint templates (path prefix -> label); anything else is "other"
+_ENDPOINT_TEMPLATES = (
+    ("/ds/viewViaPost/", "viewViaPost"),
+    ("/ds/view/columns/", "view/columns"),
+    ("/ds/dsList/", "dsList"),
+)
+_LABEL_ESCAPES = re.compile(r'[\\"\n]')
+_ESCAPED = {"\\": "\\\\", '"': '\\"', "\n": "\\n"}
+
+_metrics: list["_Metric"] = []
+
+
+def endpoint_template(endpoint: str) -> str:
+    for prefix, name in _ENDPOINT_TEMPLATES:
+        if endpoint.startswith(prefix):
+            return name
+    return "other"
+
+
+def _labels(names: tuple[str, ...], values: Iterable[Any], extra: str = "") -> str:
+    pairs = [
+        f'{name}="{_LABEL_ESCAPES.sub(lambda m: _ESCAPED[m.group()], str(value))}"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return f"{value:g}" if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        _metrics.append(self)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class CounterMetric(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, help_text, label_names)
+        self.values: Counter[tuple] = Counter()
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        self.values[labels] += amount
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+            for labels, value in self.values.items()
+        ]
+
+
+class GaugeMetric(CounterMetric):
+    kind = "gauge"
+
+    def dec(self, *labels: Any, amount: float = 1) -> None:
+        self.values[labels] -= amount
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help_text, label_names)
+        self.buckets = buckets
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: Any) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self) -> list[str]:
+        lines = []
+        for labels, (counts, total) in self.series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{_number(bound) if bound != "+Inf" else bound}"'
+                lines.append(
+                    f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}"
+                )
+            suffix = _labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{suffix} {total:g}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+TOOL_LATENCY = Histogram(
+    "datagroom_tool_duration_seconds", "MCP tool call latency.", ("tool", "status")
+)
+TOOL_RESPONSE_BYTES = Histogram(
+    "datagroom_tool_response_bytes",
+    "Size of the text content returned by MCP tools.",
+    ("tool",),
+    BYTES_BUCKETS,
+)
+TOOL_IN_FLIGHT = GaugeMetric("datagroom_tool_in_flight", "MCP tool calls running.", ("tool",))
+GATEWAY_LATENCY = Histogram(
+    "datagroom_gateway_request_duration_seconds",
+    "Gateway HTTP request latency (each attempt).",
+    ("endpoint", "status"),
+)
+GATEWAY_RESPONSE_BYTES = Histogram(
+    "datagroom_gateway_response_bytes",
+    "Size of Gateway response bodies.",
+    ("endpoint",),
+    BYTES_BUCKETS,
+)
+ADMISSION_WAIT = Histogram(
+    "datagroom_admission_wait_seconds", "Time Gateway calls waited for an admission slot."
+)
+
+
+def record_gateway_request(
+    endpoint: str, started: float, status: int | str, size: int | None = None
+) -> None:
+    """Record one Gateway attempt (status is the HTTP status or "error" for transport errors)."""
+    template = endpoint_template(endpoint)
+    GATEWAY_LATENCY.observe(time.perf_counter() - started, template, status)
+    if size is not None:
+        GATEWAY_RESPONSE_BYTES.observe(size, template)
+
+
+def create_tool_metrics_middleware():
+    """FastMCP middleware timing every tool call (fastmcp is imported here, not at module load)."""
+    from fastmcp.server.middleware import Middleware
+
+    class ToolMetricsMiddleware(Middleware):
+        async def on_call_tool(self, context, call_next):
+            tool = context.message.name
+            TOOL_IN_FLIGHT.inc(tool)
+            started = time.perf_counter()
+            status = "error"
+            try:
+                result = await call_next(context)
+                status = "ok"
+            finally:
+                TOOL_LATENCY.observe(time.perf_counter() - started, tool, status)
+                TOOL_IN_FLIGHT.dec(tool)
+            size = sum(len(getattr(block, "text", "").encode("utf-8")) for block in result.content)
+            TOOL_RESPONSE_BYTES.observe(size, tool)
+            return result
+
+    return ToolMetricsMiddleware()
+
+
+def _family(name: str, kind: str, help_text: str, samples: list[tuple[str, Any]]) -> list[str]:
+    """Lines for a metric read from stats: samples are (label string, value)."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(
+        f"{name}{labels} {_number(value)}" for labels, value in samples if value is not None
+    )
+    return lines
+
+
+def _collected() -> list[str]:
+    """Series read from the caches, connection pool, admission and resilience stats."""
+    from utils.admission import get_admission_stats
+    from utils.cache import get_cache_stats
+    from utils.gateway_client import get_pool_stats
+    from utils.gateway_views import get_single_flight_stats
+    from utils.resilience import get_resilience_stats
+
+    caches = get_cache_stats()
+    cache = [(_labels(("cache",), (name,)), stats) for name, stats in caches.items()]
+    pool = get_pool_stats()
+    admission = get_admission_stats()
+    resilience = get_resilience_stats()
+    breaker = resilience["breaker"]
+    max_connections = pool["max_connections"] or 0
+    lines: list[str] = []
+    for key, kind, help_text in (
+        ("hits", "counter", "Cache lookups answered with a fresh entry."),
+        ("stale_hits", "counter", "Cache lookups answered with a stale entry."),
+        ("misses", "counter", "Cache lookups that missed."),
+        ("evictions", "counter", "Cache entries evicted."),
+        ("hit_ratio", "gauge", "Share of cache lookups answered from the cache."),
+        ("entries", "gauge", "Entries held by the cache."),
+        ("bytes", "gauge", "Bytes held by the cache (size-bounded caches)."),
+    ):
+        suffix = "_total" if kind == "counter" else ""
+        lines += _family(
+            f"datagroom_cache_{key}{suffix}",
+            kind,
+            help_text,
+            [(labels, stats[key]) for labels, stats in cache],
+        )
+    lines += _family(
+        "datagroom_gateway_pool_connections",
+        "gauge",
+        "Pooled Gateway connections by state.",
+        [
+            ('{state="active"}', pool["active_connections"]),
+            ('{state="idle"}', pool["idle_connections"]),
+        ],
+    )
+    lines += _family(
+        "datagroom_gateway_pool_utilization",
+        "gauge",
+        "Active Gateway connections over GATEWAY_MAX_CONNECTIONS.",
+        [("", pool["active_connections"] / max_connections if max_connections else 0.0)],
+    )
+    lines += _family(
+        "datagroom_gateway_pool_queued_requests",
+        "gauge",
+        "Requests waiting for a pooled connection.",
+        [("", pool["queued_requests"])],
+    )
+    lines += _family(
+        "datagroom_gateway_in_flight",
+        "gauge",
+        "Gateway requests in flight.",
+        [("", pool["in_flight"])],
+    )
+    lines += _family(
+        "datagroom_gateway_coalesced_total",
+        "counter",
+        "Requests served by joining an identical in-flight Gateway call.",
+        [("", get_single_flight_stats()["coalesced"])],
+    )
+    lines += _family(
+        "datagroom_admission_in_flight",
+        "gauge",
+        "Gateway calls holding an admission slot.",
+        [("", admission["in_flight"])],
+    )
+    lines += _family(
+        "datagroom_admission_queue_depth",
+        "gauge",
+        "Gateway calls waiting for an admission slot.",
+        [("", admission["queue_depth"])],
+    )
+    lines += _family(
+        "datagroom_admission_rejected_total",
+        "counter",
+        "Gateway calls rejected by admission control.",
+        [
+            ('{reason="queue_full"}', admission["rejected_queue_full"]),
+            ('{reason="timeout"}', admission["rejected_timeout"]),
+        ],
+    )
+    lines += _family(
+        "datagroom_gateway_circuit_open",
+        "gauge",
+        "1 while the Gateway circuit breaker is open or half-open.",
+        [("", int(breaker["state"] != "closed"))],
+    )
+    lines += _family(
+        "datagroom_gateway_breaker_rejected_total",
+        "counter",
+        "Gateway calls failed fast by the circuit breaker.",
+        [("", breaker["rejected"])],
+    )
+    lines += _family(
+        "datagroom_gateway_retries_total",
+        "counter",
+        "Gateway call retries.",
+        [("", resilience["retries"])],
+    )
+    lines += _family(
+        "datagroom_gateway_hedges_total",
+        "counter",
+        "Hedged Gateway requests sent.",
+        [("", resilience["hedges"])],
+    )
+    return lines
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: list[str] = []
+    for metric in _metrics:
+        lines += metric.header()
+        lines += metric.render()
+    lines += _collected()
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,141 @@
+"""
+Column profiler for datagroom_get_schema.
+Profiles a bounded row sample column by column: each column's values are extracted once and
+reduced in a single pass into a type histogram, null count, min/max (within the column's
+dominant type), top-k values and a distinct count. Memory per column is bounded (a Misra-Gries
+heavy-hitters summary and a HyperLogLog sketch), so larger samples cost time, not memory.
+"""
+
+import json
+from collections import Counter
+from typing import Any
+
+from schemas import ColumnProfile, DatasetProfile, ValueCount
+from utils.sketches import HyperLogLog
+from utils.type_inference import infer_column_type, infer_type
+
+_MISSING = object()
+_ORDERED_TYPES = ("number", "string", "date")
+SAMPLE_VALUES = 5
+# Heavy-hitter slots per requested top value (top-k counts are exact below this many distinct values)
+TOP_K_CAPACITY_FACTOR = 20
+
+
+def _value_key(value: Any) -> Any:
+    """Hashable key that keeps True, 1 and "1" apart and folds 1 with 1.0."""
+    if isinstance(value, (dict, list)):
+        return "j", json.dumps(value, sort_keys=True, default=str)
+    if isinstance(value, bool):
+        return "b", value
+    if isinstance(value, (int, float)):
+        return "n", value
+    if isinstance(value, str):
+        return "s", value
+    return "o", str(value)
+
+
+class _FrequentValues:
+    """Misra-Gries heavy hitters: counts are exact while at most `capacity` values are seen."""
+
+    __slots__ = ("capacity", "counts", "exact")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: dict[Any, list] = {}  # key -> [first value seen, count]
+        self.exact = True
+
+    def add(self, key: Any, value: Any) -> None:
+        slot = self.counts.get(key)
+        if slot is not None:
+            slot[1] += 1
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = [value, 1]
+        else:
+            self.exact = False
+            for k in [k for k, s in self.counts.items() if s[1] == 1]:
+                del self.counts[k]
+            for s in self.counts.values():
+                s[1] -= 1
+
+    def top(self, k: int) -> list[ValueCount]:
+        """Most frequent values; once approximate, counts are lower bounds and singletons are noise."""
+        floor = 1 if self.exact else 2
+        ranked = sorted(self.counts.values(), key=lambda s: s[1], reverse=True)[:k]
+        return [ValueCount(value=value, count=count) for value, count in ranked if count >= floor]
+
+
+def profile_column(name: str, values: list[Any], top_k: int = 5) -> ColumnProfile:
+    """
+    Profile one column's values (_MISSING or None count as null) in bounded memory:
+    top values come from a heavy-hitters summary and the distinct count from HyperLogLog.
+    """
+    type_counts: Counter[str] = Counter()
+    frequent = _FrequentValues(max(top_k * TOP_K_CAPACITY_FACTOR, 64))
+    hll = HyperLogLog()
+    # (type, python type) -> [min, max, count]; mixed representations are never compared
+    bounds: dict[tuple[str, type], list[Any]] = {}
+    samples: list[Any] = []
+    sample_keys: set[Any] = set()
+    nulls = 0
+    for value in values:
+        if value is None or value is _MISSING:
+            nulls += 1
+            continue
+        kind = infer_type(value)
+        type_counts[kind] += 1
+        key = _value_key(value)
+        frequent.add(key, value)
+        hll.add(value)
+        if len(samples) < SAMPLE_VALUES and key not in sample_keys:
+            sample_keys.add(key)
+            samples.append(value)
+        if kind in _ORDERED_TYPES:
+            slot = bounds.get((kind, type(value)))
+            if slot is None:
+                bounds[(kind, type(value))] = [value, value, 1]
+                continue
+            slot[2] += 1
+            if value < slot[0]:
+                slot[0] = value
+            elif value > slot[1]:
+                slot[1] = value
+    column_type = infer_column_type(type_counts)
+    # The most frequent representation of the column type wins (e.g. ISO strings over datetimes)
+    candidates = [b for (kind, _), b in bounds.items() if kind == column_type]
+    low, high, _ = max(candidates, key=lambda b: b[2]) if candidates else (None, None, 0)
+    present = len(values) - nulls
+    distinct = len(frequent.counts) if frequent.exact else min(hll.estimate(), present)
+    return ColumnProfile(
+        name=name,
+        type=column_type,
+        type_counts=dict(type_counts),
+        null_count=nulls,
+        null_ratio=round(nulls / len(values), 4) if values else 0.0,
+        min=low,
+        max=high,
+        top_values=frequent.top(top_k),
+        approx_distinct=distinct,
+        distinct_error=0.0 if frequent.exact else round(hll.relative_error, 4),
+        sample_values=samples,
+    )
+
+
+def profile_rows(
+    rows: list[dict[str, Any]],
+    columns: list[str] | None = None,
+    total_rows: int | None = None,
+    top_k: int = 5,
+) -> DatasetProfile:
+    """
+    Profile every column of a row sample: the given column names first, then any other field
+    seen in the rows.
+    """
+    names = list(dict.fromkeys([*(columns or []), *(k for row in rows for k in row)]))
+    return DatasetProfile(
+        total_rows=len(rows) if total_rows is None else total_rows,
+        sampled_rows=len(rows),
+        columns=[
+            profile_column(name, [row.get(name, _MISSING) for row in rows], top_k)
+            for name in names
+        ],
+    )
@@ -0,0 +1,96 @@
+"""
+Column projection (fields=) for the data tools.
+The requested fields are pushed down to the backend (Gateway request body, Mongo projection)
+together with the fields the server needs itself (_id and sort keys for paging); rows are then
+trimmed to the requested fields plus _id before formatting. Dotted fields select nested values
+as in a MongoDB projection.
+"""
+
+from typing import Any
+
+MAX_FIELDS = 200
+
+
+def normalize_fields(fields: list[str] | None) -> list[str] | None:
+    """Validated, de-duplicated field list; None (or empty) means whole rows."""
+    if not fields:
+        return None
+    if not isinstance(fields, list) or len(fields) > MAX_FIELDS:
+        raise ValueError(f"fields must be a list of at most {MAX_FIELDS} field names")
+    normalized = []
+    for field in fields:
+        if not isinstance(field, str) or not field.strip():
+            raise ValueError("fields must contain non-empty field names")
+        normalized.append(field.strip())
+    return list(dict.fromkeys(normalized))
+
+
+def fetch_fields(fields: list[str] | None, *required: str | None) -> list[str] | None:
+    """Fields to request from the backend: the projection plus _id and any required fields."""
+    if fields is None:
+        return None
+    return list(dict.fromkeys([*fields, "_id", *(f for f in required if f)]))
+
+
+def _tree(fields: list[str]) -> dict[str, Any]:
+    """Path tree of a projection; an empty dict marks a field kept whole."""
+    tree: dict[str, Any] = {}
+    for field in sorted(fields, key=lambda f: f.count(".")):
+        node = tree
+        parts = field.split(".")
+        for i, part in enumerate(parts):
+            child = node.get(part)
+            if child is not None and not child:
+                break  # an ancestor is already kept whole
+            if i == len(parts) - 1:
+                node[part] = {}
+            else:
+                node = node.setdefault(part, {"": None})
+    return tree
+
+
+def _project(value: Any, tree: dict[str, Any]) -> Any:
+    if isinstance(value, list):
+        return [_project(v, tree) for v in value if isinstance(v, (dict, list))]
+    out = {}
+    for key, sub in tree.items():
+        if key == "" or key not in value:
+            continue
+        if sub:
+            child = value[key]
+            if isinstance(child, (dict, list)):
+                out[key] = _project(child, sub)
+        else:
+            out[key] = value[key]
+    return out
+
+
+def mongo_projection(fields: list[str] | None) -> dict[str, int] | None:
+    """MongoDB projection document (fields nested under a kept parent are dropped)."""
+    if fields is None:
+        return None
+    projection: dict[str, int] = {}
+
+    def _walk(tree: dict[str, Any], prefix: str) -> None:
+        for key, sub in tree.items():
+            if key == "":
+                continue
+            if sub:
+                _walk(sub, f"{prefix}{key}.")
+            else:
+                projection[f"{prefix}{key}"] = 1
+
+    _walk(_tree(fields), "")
+    return projection
+
+
+def project_rows(rows: list[dict[str, Any]], fields: list[str] | None) -> list[dict[str, Any]]:
+    """Rows trimmed to _id plus the requested fields (rows are returned as-is without fields)."""
+    if fields is None:
+        return rows
+    tree = _tree(["_id", *fields])
+    if all(not sub for sub in tree.values()):
+        # Flat projection: a plain key lookup per field
+        keys = list(tree)
+        return [{k: row[k] for k in keys if k in row} for row in rows]
+    return [_project(row, tree) for row in rows]
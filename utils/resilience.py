@@ -0,0 +1,306 @@
+"""
+Resilience layer for Gateway calls (used by utils/authenticated_request.py).
+- Timeout budgets: a call to an endpoint (list, columns, view) must finish, all attempts and
+  backoff included, within GATEWAY_ENDPOINT_TIMEOUTS; each attempt gets the remaining budget,
+  as its httpx timeout and as a hard deadline on the whole attempt.
+- Retries: idempotent calls (GETs and the read-only viewViaPost/columns/dsList endpoints) are
+  retried on connection errors, timeouts, 429 and 502/503/504, with exponential backoff and full
+  jitter; a Retry-After header is honored when the budget allows it.
+- Circuit breaker: GATEWAY_BREAKER_FAILURES consecutive failures open the circuit and calls fail
+  fast with GatewayUnavailableError; after GATEWAY_BREAKER_RESET seconds one probe call decides
+  whether it closes again.
+- Hedging (GATEWAY_HEDGE): an idempotent attempt still running after the endpoint's recent p95
+  latency gets a second copy; the first good response wins and the other is cancelled.
+- Admission: an optional admit(endpoint) context manager (utils/admission.admitted) is held
+  around each attempt and hedged copy, so no slot is held while a retry backs off.
+"""
+
+import asyncio
+import contextlib
+import email.utils
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, AsyncContextManager, Callable
+
+import httpx
+
+from config import config
+from utils.error_handlers import GatewayUnavailableError
+from utils.gateway_client import send_gateway_request
+from utils.timing import phase
+
+logger = logging.getLogger(__name__)
+
+# (endpoint prefix, budget/latency class); the rest is "other"
+_ENDPOINTS = (
+    ("/ds/viewViaPost/", "view"),
+    ("/ds/view/columns/", "columns"),
+    ("/ds/dsList/", "list"),
+)
+# POST endpoints that only read, so repeating them is safe
+_READ_ONLY = frozenset(("view", "columns", "list"))
+_RETRY_STATUSES = frozenset((429, 502, 503, 504))
+# Statuses that count against the circuit breaker (429 is back-pressure, not ill health)
+_FAILURE_STATUSES = frozenset((502, 503, 504))
+LATENCY_WINDOW = 200
+# Hedging waits for this many latency samples of an endpoint before firing hedges
+HEDGE_MIN_SAMPLES = 20
+
+# Context manager factory held around each attempt, e.g. utils.admission.admitted
+Admit = Callable[[str], AsyncContextManager[Any]]
+
+
+def endpoint_class(endpoint: str) -> str:
+    for prefix, name in _ENDPOINTS:
+        if endpoint.startswith(prefix):
+            return name
+    return "other"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker: closed -> open -> half-open (one probe) -> closed."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self.opens = 0
+        self.rejected = 0
+
+    def before_call(self) -> None:
+        """Raise GatewayUnavailableError while open (or while a half-open probe is running)."""
+        if self.state == "closed":
+            return
+        now = time.monotonic()
+        if self.state == "open":
+            wait = self.opened_at + self.reset_timeout - now
+            if wait > 0:
+                self.rejected += 1
+                raise GatewayUnavailableError(
+                    f"circuit open after {self.failures} consecutive failures; "
+                    f"retry in {wait:.0f}s",
+                    retry_after=wait,
+                )
+            self.state = "half_open"
+        elif now - self.probe_started < self.reset_timeout:
+            self.rejected += 1
+            raise GatewayUnavailableError("circuit half-open, probe in progress", retry_after=1.0)
+        # This call is the probe (a stuck probe is replaced after reset_timeout)
+        self.probe_started = now
+
+    def record_success(self) -> None:
+        if self.state != "closed":
+            logger.info("Gateway circuit closed")
+        self.state = "closed"
+        self.failures = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state == "half_open" or (
+            self.state == "closed" and self.failures >= self.failure_threshold
+        ):
+            if self.state == "closed":
+                logger.warning("Gateway circuit opened after %d failures", self.failures)
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self.opens += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "opens": self.opens,
+            "rejected": self.rejected,
+        }
+
+
+class LatencyWindow:
+    """Latencies (seconds) of the last LATENCY_WINDOW successful attempts to one endpoint."""
+
+    def __init__(self):
+        self.samples: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def quantile(self, q: float) -> float | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+_breaker = CircuitBreaker(config["gateway_breaker_failures"], config["gateway_breaker_reset"])
+_latency: dict[str, LatencyWindow] = {}
+_counters = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "budget_exhausted": 0}
+
+
+def _retry_after(response: httpx.Response | None) -> float | None:
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get("retry-after") if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number attempt + 1."""
+    cap = min(config["gateway_retry_max_backoff"], config["gateway_retry_backoff"] * 2**attempt)
+    return random.uniform(0, cap)
+
+
+async def _send(
+    name: str, method: str, endpoint: str, kwargs: dict[str, Any], admit: Admit | None
+) -> httpx.Response:
+    async with admit(endpoint) if admit is not None else contextlib.nullcontext():
+        with phase("gateway"):
+            started = time.perf_counter()
+            response = await send_gateway_request(method, endpoint, **kwargs)
+    if response.status_code < 500:
+        _latency.setdefault(name, LatencyWindow()).add(time.perf_counter() - started)
+    return response
+
+
+def _good(task: asyncio.Task) -> bool:
+    return task.exception() is None and task.result().status_code not in _RETRY_STATUSES
+
+
+async def _send_hedged(
+    name: str, method: str, endpoint: str, kwargs: dict[str, Any], admit: Admit | None
+) -> httpx.Response:
+    """Send, and send a second copy if the first is slower than the endpoint's p95."""
+    window = _latency.get(name)
+    if window is None or len(window.samples) < HEDGE_MIN_SAMPLES:
+        return await _send(name, method, endpoint, kwargs, admit)
+    delay = max(window.quantile(0.95) or 0.0, config["gateway_hedge_min_delay"])
+    first = asyncio.ensure_future(_send(name, method, endpoint, kwargs, admit))
+    tasks = {first}
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=delay)
+        if done:
+            return first.result()
+        _counters["hedges"] += 1
+        tasks.add(asyncio.ensure_future(_send(name, method, endpoint, kwargs, admit)))
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if _good(task):
+                    if task is not first:
+                        _counters["hedge_wins"] += 1
+                    return task.result()
+        # Neither copy succeeded: report the original attempt's outcome
+        return first.result()
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+async def gateway_request(
+    method: str, endpoint: str, *, admit: Admit | None = None, **kwargs: Any
+) -> httpx.Response:
+    """
+    Send a Gateway request with the endpoint's timeout budget, retries (idempotent calls only),
+    circuit breaker and optional hedging; admit(endpoint), if given, is held around each
+    attempt. Returns the last response (which may be an error status) or raises the last
+    transport error; raises GatewayUnavailableError while the circuit is open.
+    """
+    name = endpoint_class(endpoint)
+    idempotent = method.upper() in ("GET", "HEAD", "OPTIONS") or name in _READ_ONLY
+    attempts = 1 + (max(config["gateway_retries"], 0) if idempotent else 0)
+    send = _send_hedged if config["gateway_hedge"] and idempotent else _send
+    budget = config["gateway_endpoint_timeouts"].get(name, config["gateway_timeout"])
+    deadline = time.monotonic() + budget
+    _counters["calls"] += 1
+    for attempt in range(attempts):
+        _breaker.before_call()
+        remaining = deadline - time.monotonic()
+        kwargs["timeout"] = httpx.Timeout(
+            remaining,
+            connect=min(config["gateway_connect_timeout"], remaining),
+            pool=min(config["gateway_pool_timeout"], remaining),
+        )
+        response: httpx.Response | None = None
+        try:
+            # httpx times each phase (connect, every read) separately; bound the whole attempt
+            response = await asyncio.wait_for(
+                send(name, method, endpoint, kwargs, admit), remaining
+            )
+        except asyncio.TimeoutError:
+            _breaker.record_failure()
+            _counters["budget_exhausted"] += 1
+            error: Exception = httpx.TimeoutException(
+                f"Gateway {name} call exceeded its {budget:g}s budget"
+            )
+            break
+        except httpx.TransportError as e:
+            _breaker.record_failure()
+            error = e
+        else:
+            if response.status_code in _FAILURE_STATUSES:
+                _breaker.record_failure()
+            else:
+                _breaker.record_success()
+            if response.status_code not in _RETRY_STATUSES:
+                return response
+        if attempt + 1 == attempts:
+            break
+        delay = _backoff(attempt)
+        requested = _retry_after(response)
+        if requested is not None:
+            delay = max(delay, requested)
+        if time.monotonic() + delay >= deadline:
+            _counters["budget_exhausted"] += 1
+            break
+        _counters["retries"] += 1
+        logger.info(
+            "Retrying Gateway %s %s in %.2fs (%s)",
+            method,
+            endpoint,
+            delay,
+            response.status_code if response is not None else type(error).__name__,
+        )
+        await asyncio.sleep(delay)
+    if response is not None:
+        return response
+    raise error
+
+
+def reset_resilience() -> None:
+    """Start over with a closed breaker, zero counters and no latency history (benchmarks)."""
+    global _breaker
+    _breaker = CircuitBreaker(config["gateway_breaker_failures"], config["gateway_breaker_reset"])
+    _latency.clear()
+    for name in _counters:
+        _counters[name] = 0
+
+
+def get_resilience_stats() -> dict[str, Any]:
+    """Breaker state, retry/hedge counters and recent latency per endpoint class."""
+    latency = {}
+    for name, window in _latency.items():
+        p50, p95 = window.quantile(0.5), window.quantile(0.95)
+        latency[name] = {
+            "samples": len(window.samples),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+        }
+    return {
+        "breaker": _breaker.stats(),
+        **_counters,
+        "hedging": config["gateway_hedge"],
+        "latency": latency,
+    }
@@ -0,0 +1,202 @@
+"""
+Random sampling for datagroom_sample_dataset.
+Uniform: random pages of the _id-ordered view are fetched concurrently and reduced with a seeded
+reservoir, so a given seed reproduces the same sample while the data is unchanged.
+Stratified: per-stratum populations are counted, the sample is allocated across strata
+(proportionally or equally) and every stratum is sampled in parallel.
+"""
+
+import asyncio
+import math
+import random
+from typing import Any, Awaitable, Callable, Iterable
+
+from config import config
+
+ALLOCATIONS = ("proportional", "equal")
+# Strata beyond this many (by population) are sampled together as one "other" stratum
+MAX_STRATA = 100
+
+# (filters, skip, limit) -> {"total": ..., "data": [...]} in _id order
+PageFetcher = Callable[[list[dict], int, int], Awaitable[dict[str, Any]]]
+# (filters, n, rng, known total or None) -> (total, rows)
+Sampler = Callable[[list[dict], int, random.Random, int | None], Awaitable[tuple[int, list[dict]]]]
+
+
+class Stratum:
+    """One stratum: the rows matching `filters`, `population` of them."""
+
+    __slots__ = ("value", "other", "filters", "population", "rows")
+
+    def __init__(self, value: Any, filters: list[dict], population: int, other: bool = False):
+        self.value = value
+        self.other = other
+        self.filters = filters
+        self.population = population
+        self.rows: list[dict[str, Any]] = []
+
+
+def reservoir_sample(rows: Iterable[dict[str, Any]], k: int, rng: random.Random) -> list[dict]:
+    """k rows chosen uniformly from a stream of unknown length (Algorithm R), in random order."""
+    reservoir: list[dict[str, Any]] = []
+    for i, row in enumerate(rows):
+        if i < k:
+            reservoir.append(row)
+        else:
+            j = rng.randrange(i + 1)
+            if j < k:
+                reservoir[j] = row
+    rng.shuffle(reservoir)
+    return reservoir
+
+
+async def random_pages(
+    fetch: PageFetcher,
+    filters: list[dict],
+    total: int,
+    rng: random.Random,
+) -> list[dict[str, Any]]:
+    """Rows of up to SAMPLE_MAX_PAGES distinct random pages (every page if the view is small)."""
+    page_size = config["sample_page_size"]
+    pages = math.ceil(total / page_size)
+    if pages == 0:
+        return []
+    chosen = rng.sample(range(pages), min(config["sample_max_pages"], pages))
+    responses = await asyncio.gather(
+        *(fetch(filters, page * page_size, page_size) for page in chosen)
+    )
+    return [row for response in responses for row in response.get("data") or []]
+
+
+async def page_sample(
+    fetch: PageFetcher,
+    filters: list[dict],
+    n: int,
+    rng: random.Random,
+    total: int | None = None,
+) -> tuple[int, list[dict[str, Any]]]:
+    """Uniform sample of n rows via a reservoir over random pages; returns (total, rows)."""
+    if total is None:
+        total = (await fetch(filters, 0, 1)).get("total") or 0
+    if total == 0 or n == 0:
+        return total, []
+    return total, reservoir_sample(await random_pages(fetch, filters, total, rng), n, rng)
+
+
+def allocate(populations: list[int], n: int, allocation: str) -> list[int]:
+    """
+    Split n sample rows across strata, never more than a stratum holds.
+    proportional: by population, with at least one row per stratum when n allows;
+    equal: the same number per stratum. Capped leftovers go to strata with room.
+    """
+    counts = [0] * len(populations)
+    remaining = min(n, sum(populations))
+    active = [i for i, population in enumerate(populations) if population > 0]
+    if allocation == "proportional" and remaining >= len(active):
+        for i in active:
+            counts[i] = 1
+        remaining -= len(active)
+    weights = populations if allocation == "proportional" else [1] * len(populations)
+    while remaining > 0 and active:
+        weight = sum(weights[i] for i in active)
+        shares = {i: remaining * weights[i] / weight for i in active}
+        quota = {i: int(shares[i]) for i in active}
+        # Largest remainder method for the rows left after flooring
+        by_remainder = sorted(
+            active, key=lambda i: (shares[i] - quota[i], populations[i]), reverse=True
+        )
+        for i in by_remainder[: remaining - sum(quota.values())]:
+            quota[i] += 1
+        for i in active:
+            take = min(quota[i], populations[i] - counts[i])
+            counts[i] += take
+            remaining -= take
+        active = [i for i in active if counts[i] < populations[i]]
+    return counts
+
+
+def is_stratum_value(value: Any) -> bool:
+    """Scalar values get their own stratum; arrays and objects fall into "other"."""
+    return value is None or isinstance(value, (str, int, float, bool))
+
+
+def build_strata(
+    field: str,
+    filters: list[dict],
+    value_counts: list[tuple[Any, int]],
+    total: int,
+) -> list[Stratum]:
+    """
+    Strata for the largest MAX_STRATA scalar values, plus an "other" stratum (nin those values)
+    holding the remaining rows, if any.
+    """
+    ranked = sorted(
+        ((v, c) for v, c in value_counts if is_stratum_value(v) and c > 0),
+        key=lambda vc: vc[1],
+        reverse=True,
+    )[:MAX_STRATA]
+    strata = [
+        Stratum(value, [*filters, {"field": field, "type": "eq", "value": value}], count)
+        for value, count in ranked
+    ]
+    rest = total - sum(s.population for s in strata)
+    if rest > 0:
+        other = {"field": field, "type": "nin", "value": [s.value for s in strata]}
+        strata.append(Stratum(None, [*filters, other], rest, other=True))
+    return strata
+
+
+async def pilot_value_counts(
+    fetch: PageFetcher,
+    field: str,
+    filters: list[dict],
+    total: int,
+    rng: random.Random,
+) -> list[tuple[Any, int]]:
+    """
+    Stratum populations when the backend cannot group: values are discovered from a pilot of
+    random pages, then each value's population is counted exactly (in parallel).
+    """
+    pilot = await random_pages(fetch, filters, total, rng)
+    seen: dict[tuple[str, Any], Any] = {}
+    frequency: dict[tuple[str, Any], int] = {}
+    for row in pilot:
+        value = row.get(field)
+        if is_stratum_value(value):
+            key = (type(value).__name__, value)
+            seen[key] = value
+            frequency[key] = frequency.get(key, 0) + 1
+    values = [seen[k] for k in sorted(frequency, key=frequency.get, reverse=True)[:MAX_STRATA]]
+    semaphore = asyncio.Semaphore(max(config["sample_concurrency"], 1))
+
+    async def _count(value: Any) -> int:
+        async with semaphore:
+            response = await fetch([*filters, {"field": field, "type": "eq", "value": value}], 0, 1)
+        return response.get("total") or 0
+
+    counts = await asyncio.gather(*(_count(v) for v in values))
+    return list(zip(values, counts))
+
+
+async def sample_strata(
+    strata: list[Stratum],
+    n: int,
+    allocation: str,
+    rng: random.Random,
+    sampler: Sampler,
+) -> None:
+    """Allocate n rows across strata and sample every stratum in parallel (fills Stratum.rows)."""
+    quotas = allocate([s.population for s in strata], n, allocation)
+    # Seeds drawn up front in stratum order keep results reproducible under any scheduling
+    seeds = [rng.getrandbits(64) for _ in strata]
+    semaphore = asyncio.Semaphore(max(config["sample_concurrency"], 1))
+
+    async def _sample(stratum: Stratum, quota: int, seed: int) -> None:
+        if quota == 0:
+            return
+        async with semaphore:
+            _, stratum.rows = await sampler(
+                stratum.filters, quota, random.Random(seed), stratum.population
+            )
+
+    await asyncio.gather(*(_sample(s, q, seed) for s, q, seed in zip(strata, quotas, seeds)))
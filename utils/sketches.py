@@ -0,0 +1,241 @@
+"""
+Mergeable probabilistic sketches over column values.
+HyperLogLog estimates the number of distinct values in fixed memory (2**precision one-byte
+registers); it counts exactly from a small hash set until that set outgrows HLL_EXACT_LIMIT.
+KLLSketch estimates quantiles from a hierarchy of compactors (Karnin, Lang, Liberty 2016).
+Sketches of separate row batches merge into the sketch of all rows, without changing the
+sketch merged in, so cached partial sketches can be reused.
+"""
+
+import hashlib
+import json
+import math
+from typing import Any, Iterable
+
+# 2**12 registers: 4 KiB per sketch, ~1.6% standard error
+HLL_PRECISION = 12
+# Distinct values counted exactly (as 64-bit hashes) before switching to registers
+HLL_EXACT_LIMIT = 256
+# KLL accuracy parameter: ~1.3% normalized rank error at k=200
+KLL_K = 200
+
+
+def value_hash(value: Any) -> int:
+    """Stable 64-bit hash of a JSON-like value (equal values hash equally across processes)."""
+    if isinstance(value, str):
+        data = b"s" + value.encode("utf-8", "surrogatepass")
+    elif isinstance(value, bool) or value is None:
+        data = b"b" + repr(value).encode()
+    elif isinstance(value, (int, float)):
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)  # 1 and 1.0 are the same value
+        data = b"n" + repr(value).encode()
+    else:
+        data = b"j" + json.dumps(value, sort_keys=True, separators=(",", ":"), default=str).encode()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter (Flajolet et al.) with linear counting for small ranges."""
+
+    __slots__ = ("precision", "registers", "hashes")
+
+    def __init__(self, precision: int = HLL_PRECISION, registers: bytes | None = None):
+        if not 4 <= precision <= 18:
+            raise ValueError("HyperLogLog precision must be between 4 and 18")
+        self.precision = precision
+        if registers is not None and len(registers) != 1 << precision:
+            raise ValueError("HyperLogLog registers do not match the precision")
+        # Exact mode keeps the hashes themselves; registers are allocated on overflow
+        self.registers = bytearray(registers) if registers is not None else None
+        self.hashes: set[int] | None = set() if registers is None else None
+
+    def _spill(self) -> None:
+        """Leave exact mode: fold the collected hashes into registers."""
+        hashes = self.hashes or ()
+        self.hashes = None
+        self.registers = bytearray(1 << self.precision)
+        for h in hashes:
+            self.add_hash(h)
+
+    def add_hash(self, h: int) -> None:
+        if self.hashes is not None:
+            self.hashes.add(h)
+            if len(self.hashes) > HLL_EXACT_LIMIT:
+                self._spill()
+            return
+        shift = 64 - self.precision
+        index = h >> shift
+        rank = shift - (h & ((1 << shift) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def add(self, value: Any) -> None:
+        self.add_hash(value_hash(value))
+
+    def update(self, values: Iterable[Any]) -> None:
+        """Add a batch of values (register updates inlined for speed)."""
+        hashes = map(value_hash, values)
+        if self.hashes is not None:
+            for h in hashes:
+                self.hashes.add(h)
+                if len(self.hashes) > HLL_EXACT_LIMIT:
+                    self._spill()
+                    break
+            else:
+                return
+        shift = 64 - self.precision
+        mask = (1 << shift) - 1
+        registers = self.registers
+        for h in hashes:
+            index = h >> shift
+            rank = shift - (h & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold another sketch of the same precision into this one (in place)."""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        if other.hashes is not None:
+            for h in other.hashes:
+                self.add_hash(h)
+            return self
+        if self.hashes is not None:
+            self._spill()
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    @property
+    def exact(self) -> bool:
+        return self.hashes is not None
+
+    def estimate(self) -> int:
+        if self.hashes is not None:
+            return len(self.hashes)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / math.fsum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of estimate() relative to the true count (0 while exact)."""
+        if self.hashes is not None:
+            return 0.0
+        return 1.04 / math.sqrt(1 << self.precision)
+
+    def to_bytes(self) -> bytes:
+        if self.hashes is not None:
+            self._spill()
+        return bytes([self.precision]) + bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        return cls(data[0], data[1:])
+
+
+class KLLSketch:
+    """
+    KLL quantile sketch over numbers. Level h holds items of weight 2**h; a full level is
+    sorted and every other item is promoted, so about k items per level are kept and the rank
+    error stays near normalized_rank_error() regardless of the stream length. The promoted half
+    alternates between compactions instead of being drawn at random, so the same batches merged
+    in the same order always give the same answer.
+    """
+
+    __slots__ = ("k", "levels", "count", "min", "max", "_offset")
+
+    def __init__(self, k: int = KLL_K):
+        self.k = k
+        self.levels: list[list[float]] = [[]]
+        self.count = 0
+        self.min: float | None = None
+        self.max: float | None = None
+        self._offset = 0
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * (2 / 3) ** depth)), 2)
+
+    def _compress(self) -> None:
+        for level, items in enumerate(self.levels):
+            if len(items) < self._capacity(level):
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            items.sort()
+            # An odd item out stays at this level
+            keep = [items.pop()] if len(items) % 2 else []
+            self.levels[level + 1].extend(items[self._offset :: 2])
+            self._offset ^= 1
+            self.levels[level] = keep
+            break
+
+    def _size(self) -> int:
+        return sum(map(len, self.levels))
+
+    def _max_size(self) -> int:
+        return sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def update(self, values: Iterable[float]) -> None:
+        """Add a batch of numbers."""
+        batch = list(values)
+        if not batch:
+            return
+        self.count += len(batch)
+        low, high = min(batch), max(batch)
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.levels[0].extend(batch)
+        while self._size() >= self._max_size():
+            self._compress()
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Fold another sketch into this one (in place; `other` is not modified)."""
+        if other.count == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.count += other.count
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        while self._size() >= self._max_size():
+            self._compress()
+        return self
+
+    @property
+    def exact(self) -> bool:
+        """True while nothing has been compacted (every item kept with weight 1)."""
+        return all(not items for items in self.levels[1:])
+
+    def quantile(self, q: float) -> float | None:
+        """Nearest-rank q-quantile (0 <= q <= 1): smallest value with at least q of the weight."""
+        if self.count == 0:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        weighted = sorted(
+            (item, 1 << level) for level, items in enumerate(self.levels) for item in items
+        )
+        target = q * sum(weight for _, weight in weighted)
+        seen = 0
+        for item, weight in weighted:
+            seen += weight
+            if seen >= target:
+                return item
+        return self.max
+
+    def normalized_rank_error(self) -> float:
+        """Rank error of quantile() as a fraction of the row count (0 while exact)."""
+        if self.exact:
+            return 0.0
+        # Empirical constant for KLL sketches (as used by Apache DataSketches)
+        return 2.296 / self.k**0.9723
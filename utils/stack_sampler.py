@@ -0,0 +1,57 @@
+"""
+On-demand sampling profiler for the running server (used by the /admin/profile route).
+A background thread reads every thread's current Python stack every `interval` seconds for a
+time-boxed window and counts identical stacks. The result is in the collapsed ("folded") format
+read by flamegraph.pl, speedscope and inferno: one "thread;outer;...;inner count" line per stack.
+No tracing hooks are installed, so the server runs at full speed while (and after) sampling.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+_lock = threading.Lock()
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack(frame: FrameType | None) -> list[str]:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def sample_stacks(seconds: float, interval: float) -> Counter[str]:
+    """Sample all threads but the sampler for `seconds`; folded stack -> sample count."""
+    if not _lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already being captured")
+    try:
+        own = threading.get_ident()
+        counts: Counter[str] = Counter()
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = _stack(frame)
+                if stack:
+                    counts[";".join([names.get(ident, str(ident)), *stack])] += 1
+            time.sleep(interval)
+        return counts
+    finally:
+        _lock.release()
+
+
+def collapsed(counts: Counter[str]) -> str:
+    """Folded stacks, most frequent first."""
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
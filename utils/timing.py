@@ -0,0 +1,78 @@
+"""
+Per-call phase timing for tool invocations.
+ToolTimingMiddleware starts a recorder for each tool call; code on the call's path wraps its work in
+phase(name) (validation, admission, gateway, json_decode, filters, formatting, serialization). When
+the call ends one structured log line ("tool_timing {...}") is written with the total and the time
+and count per phase; with DEBUG_TIMINGS the same breakdown is added to structured_content under
+"timings". Phases of concurrent work (e.g. parallel Gateway pages) are summed, so a phase can
+exceed the wall time of the call. Outside a tool call phase() only costs a context-variable lookup.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from config import config
+from utils.json_codec import dumps
+
+logger = logging.getLogger(__name__)
+
+# phase name -> [seconds, count] for the tool call running in this context
+_phases: ContextVar[dict[str, list] | None] = ContextVar("tool_phases", default=None)
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Add the time spent in the block to the current tool call's phase name."""
+    phases = _phases.get()
+    if phases is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        entry = phases.get(name)
+        if entry is None:
+            entry = phases[name] = [0.0, 0]
+        entry[0] += time.perf_counter() - started
+        entry[1] += 1
+
+
+def _breakdown(total: float, phases: dict[str, list]) -> dict[str, Any]:
+    return {
+        "total_ms": round(total * 1000, 2),
+        "phases": {
+            name: {"ms": round(seconds * 1000, 2), "count": count}
+            for name, (seconds, count) in phases.items()
+        },
+    }
+
+
+def create_tool_timing_middleware():
+    """FastMCP middleware recording phase timings per tool call (fastmcp is imported here)."""
+    from fastmcp.server.middleware import Middleware
+
+    class ToolTimingMiddleware(Middleware):
+        async def on_call_tool(self, context, call_next):
+            phases: dict[str, list] = {}
+            token = _phases.set(phases)
+            started = time.perf_counter()
+            status = "error"
+            try:
+                result = await call_next(context)
+                status = "ok"
+            finally:
+                _phases.reset(token)
+                timings = _breakdown(time.perf_counter() - started, phases)
+                logger.info(
+                    "tool_timing %s",
+                    dumps({"tool": context.message.name, "status": status, **timings}),
+                )
+            if config["debug_timings"] and isinstance(result.structured_content, dict):
+                result.structured_content["timings"] = timings
+            return result
+
+    return ToolTimingMiddleware()
@@ -0,0 +1,65 @@
+"""
+Type inference for dataset columns (matches TS typeInference.ts).
+Types: string, number, boolean, date, array, object; null/missing values are 'null' and do not
+count towards a column's type.
+"""
+
+import datetime
+import json
+import re
+from typing import Any, Iterable
+
+_DATE_PREFIX = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _is_date_string(value: str) -> bool:
+    if not _DATE_PREFIX.match(value):
+        return False
+    try:
+        datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return False
+    return True
+
+
+def infer_type(value: Any) -> str:
+    """Infer the data type of a single value."""
+    if value is None:
+        return "null"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return "date"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, (int, float)):
+        return "number"
+    if isinstance(value, str) and _is_date_string(value):
+        return "date"
+    return "string"
+
+
+def infer_column_type(type_counts: dict[str, int]) -> str:
+    """Most common non-null type of a column ('unknown' if every value is null)."""
+    counts = {t: c for t, c in type_counts.items() if t != "null" and c > 0}
+    if not counts:
+        return "unknown"
+    return max(counts.items(), key=lambda tc: tc[1])[0]
+
+
+def extract_sample_values(values: Iterable[Any], limit: int = 5) -> list[Any]:
+    """First `limit` distinct non-null values."""
+    seen: set[str] = set()
+    unique: list[Any] = []
+    for value in values:
+        if value is None:
+            continue
+        key = json.dumps(value, sort_keys=True, default=str)
+        if key not in seen:
+            seen.add(key)
+            unique.append(value)
+            if len(unique) >= limit:
+                break
+    return unique